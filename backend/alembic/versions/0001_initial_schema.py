@@ -0,0 +1,85 @@
+"""Initial schema
+
+Databases created by the old create_all() startup already have these
+tables, so they are only created when missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'episodes' not in existing:
+        op.create_table(
+            'episodes',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('youtube_id', sa.String(length=20)),
+            sa.Column('youtube_url', sa.String(length=500)),
+            sa.Column('original_title', sa.String(length=500)),
+            sa.Column('original_description', sa.Text()),
+            sa.Column('title', sa.String(length=500)),
+            sa.Column('speaker', sa.String(length=200)),
+            sa.Column('speech_date', sa.String(length=50)),
+            sa.Column('venue', sa.String(length=300)),
+            sa.Column('topic', sa.String(length=300)),
+            sa.Column('summary', sa.Text()),
+            sa.Column('audio_url', sa.String(length=500)),
+            sa.Column('audio_duration', sa.Float()),
+            sa.Column('thumbnail_url', sa.String(length=500)),
+            sa.Column('crop_start', sa.Float()),
+            sa.Column('crop_end', sa.Float(), nullable=True),
+            sa.Column('intro_audio_url', sa.String(length=500), nullable=True),
+            sa.Column('outro_audio_url', sa.String(length=500), nullable=True),
+            sa.Column('use_ai_intro', sa.String(length=50)),
+            sa.Column('status', sa.Enum('DRAFT', 'PUBLISHED', name='episodestatus')),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+            sa.Column('published_at', sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index('ix_episodes_id', 'episodes', ['id'])
+        op.create_index('ix_episodes_youtube_id', 'episodes', ['youtube_id'])
+
+    if 'extraction_jobs' not in existing:
+        op.create_table(
+            'extraction_jobs',
+            sa.Column('id', sa.String(length=36), primary_key=True),
+            sa.Column('youtube_id', sa.String(length=20)),
+            sa.Column(
+                'status',
+                sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', name='jobstatus')
+            ),
+            sa.Column('audio_url', sa.String(length=500), nullable=True),
+            sa.Column('thumbnail_url', sa.String(length=500), nullable=True),
+            sa.Column('duration', sa.Float(), nullable=True),
+            sa.Column('waveform_data', sa.Text(), nullable=True),
+            sa.Column('detected_start_silence', sa.Float()),
+            sa.Column('detected_end_silence', sa.Float()),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index('ix_extraction_jobs_youtube_id', 'extraction_jobs', ['youtube_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('extraction_jobs')
+    op.drop_table('episodes')
+    sa.Enum(name='jobstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='episodestatus').drop(op.get_bind(), checkfirst=True)
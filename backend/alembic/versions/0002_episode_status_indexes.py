@@ -0,0 +1,33 @@
+"""Composite indexes for episode listing and the feed
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_episodes_status_published_at', 'episodes', ['status', 'published_at']
+    )
+    op.create_index(
+        'ix_episodes_status_created_at', 'episodes', ['status', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_episodes_status_created_at', table_name='episodes')
+    op.drop_index('ix_episodes_status_published_at', table_name='episodes')
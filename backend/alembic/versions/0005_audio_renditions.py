@@ -0,0 +1,32 @@
+"""Encoded audio renditions on episodes and extraction jobs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('episodes', sa.Column('renditions', sa.Text(), nullable=True))
+    op.add_column('extraction_jobs', sa.Column('renditions', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('extraction_jobs') as batch_op:
+        batch_op.drop_column('renditions')
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.drop_column('renditions')
@@ -0,0 +1,32 @@
+"""Thumbnail variants on episodes and extraction jobs
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('episodes', sa.Column('thumbnails', sa.Text(), nullable=True))
+    op.add_column('extraction_jobs', sa.Column('thumbnails', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('extraction_jobs') as batch_op:
+        batch_op.drop_column('thumbnails')
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.drop_column('thumbnails')
@@ -0,0 +1,67 @@
+"""Bulk imports and their items
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'bulk_imports',
+        sa.Column('id', sa.String(length=36), primary_key=True),
+        sa.Column(
+            'status',
+            sa.Enum('EXPANDING', 'RUNNING', 'COMPLETED', 'FAILED', name='bulkstatus')
+        ),
+        sa.Column('source_urls', sa.Text()),
+        sa.Column('publish', sa.Boolean()),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_table(
+        'bulk_items',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('bulk_id', sa.String(length=36), sa.ForeignKey('bulk_imports.id')),
+        sa.Column('position', sa.Integer()),
+        sa.Column('youtube_url', sa.String(length=500)),
+        sa.Column('youtube_id', sa.String(length=20)),
+        sa.Column(
+            'status',
+            sa.Enum(
+                'QUEUED', 'ANALYZING', 'EXTRACTING', 'COMPLETED', 'FAILED', 'SKIPPED',
+                name='bulkitemstatus'
+            )
+        ),
+        sa.Column('analysis', sa.Text(), nullable=True),
+        sa.Column('job_id', sa.String(length=36), nullable=True),
+        sa.Column('episode_id', sa.Integer(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_bulk_items_bulk_id', 'bulk_items', ['bulk_id'])
+    op.create_index('ix_bulk_items_youtube_id', 'bulk_items', ['youtube_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bulk_items_youtube_id', table_name='bulk_items')
+    op.drop_index('ix_bulk_items_bulk_id', table_name='bulk_items')
+    op.drop_table('bulk_items')
+    op.drop_table('bulk_imports')
+    sa.Enum(name='bulkitemstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='bulkstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,44 @@
+"""Claims and leases on extraction jobs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('extraction_jobs', sa.Column('youtube_url', sa.String(length=500), nullable=True))
+    op.add_column('extraction_jobs', sa.Column('claimed_by', sa.String(length=255), nullable=True))
+    op.add_column(
+        'extraction_jobs', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column(
+        'extraction_jobs',
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0')
+    )
+    op.create_index(
+        'ix_extraction_jobs_status_created_at', 'extraction_jobs', ['status', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_extraction_jobs_status_created_at', table_name='extraction_jobs')
+    with op.batch_alter_table('extraction_jobs') as batch_op:
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('claimed_by')
+        batch_op.drop_column('youtube_url')
@@ -0,0 +1,46 @@
+"""Priority classes and tenants on extraction jobs
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    priority = sa.Enum('INTERACTIVE', 'BULK', name='jobpriority')
+    priority.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        'extraction_jobs',
+        sa.Column('priority', priority, nullable=False, server_default='INTERACTIVE')
+    )
+    op.add_column('extraction_jobs', sa.Column('tenant', sa.String(length=100), nullable=True))
+    op.drop_index('ix_extraction_jobs_status_created_at', table_name='extraction_jobs')
+    op.create_index(
+        'ix_extraction_jobs_status_priority_created_at', 'extraction_jobs',
+        ['status', 'priority', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_extraction_jobs_status_priority_created_at', table_name='extraction_jobs')
+    op.create_index(
+        'ix_extraction_jobs_status_created_at', 'extraction_jobs', ['status', 'created_at']
+    )
+    with op.batch_alter_table('extraction_jobs') as batch_op:
+        batch_op.drop_column('tenant')
+        batch_op.drop_column('priority')
+    sa.Enum(name='jobpriority').drop(op.get_bind(), checkfirst=True)
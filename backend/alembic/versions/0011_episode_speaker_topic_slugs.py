@@ -0,0 +1,68 @@
+"""Speaker and topic slugs for the sub-feeds
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Optional, Sequence, Union
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _slugify(value: Optional[str]) -> Optional[str]:
+    # A copy of app.models.episode.slugify as of this revision
+    if not value:
+        return None
+    ascii_value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r"[^a-z0-9]+", "-", ascii_value.lower()).strip("-")
+    return slug[:200] or None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.add_column(sa.Column('speaker_slug', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('topic_slug', sa.String(length=200), nullable=True))
+
+    bind = op.get_bind()
+    episodes = sa.table(
+        'episodes',
+        sa.column('speaker', sa.String),
+        sa.column('topic', sa.String),
+        sa.column('speaker_slug', sa.String),
+        sa.column('topic_slug', sa.String),
+    )
+    # One update per distinct name rather than per episode
+    for name in ('speaker', 'topic'):
+        column, slug_column = episodes.c[name], episodes.c[f'{name}_slug']
+        for (value,) in bind.execute(sa.select(column).where(column.isnot(None)).distinct()).all():
+            bind.execute(episodes.update().where(column == value).values({slug_column: _slugify(value)}))
+
+    op.create_index(
+        'ix_episodes_speaker_slug_status_published_at', 'episodes',
+        ['speaker_slug', 'status', 'published_at']
+    )
+    op.create_index(
+        'ix_episodes_topic_slug_status_published_at', 'episodes',
+        ['topic_slug', 'status', 'published_at']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_episodes_topic_slug_status_published_at', table_name='episodes')
+    op.drop_index('ix_episodes_speaker_slug_status_published_at', table_name='episodes')
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.drop_column('topic_slug')
+        batch_op.drop_column('speaker_slug')
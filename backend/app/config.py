@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -19,6 +20,53 @@ class Settings(BaseSettings):
 
     # Database (use absolute path for Railway)
     database_url: str = "sqlite:////app/data/speech2pod.db"
+    # Run Alembic migrations when the app starts; turn off on replicas when a
+    # release step runs `alembic upgrade head` instead
+    migrate_on_startup: bool = True
+    # Connections request handlers may hold at once (async engine)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    # SQLite: WAL journal with writes through one connection per process
+    # (turn off on network filesystems, where WAL is unsafe), how long a
+    # write waits for the lock, and how much of the file to memory-map
+    sqlite_wal: bool = True
+    sqlite_busy_timeout: float = 30.0
+    sqlite_mmap_size_mb: int = 256
+
+    # Extraction jobs: "local" runs them in the API process, "worker" leaves
+    # them to `python -m app.worker` processes, which may be on other machines
+    extraction_runner: str = "local"
+    # Jobs one process runs at once (the API in local mode, or each worker).
+    # Interactive jobs (started from the UI) go ahead of bulk imports and
+    # have slots of their own that bulk jobs never take (at most
+    # worker_concurrency - 1).
+    worker_concurrency: int = 2
+    interactive_reserved_slots: int = 1
+    worker_poll_interval: float = 5.0
+    # A running job's claim lasts this long and is renewed every third of
+    # it; a job whose node stops renewing is run again, up to max attempts
+    job_lease_seconds: int = 120
+    job_max_attempts: int = 3
+    # Delay before retrying a job whose video another node is processing
+    job_retry_delay: int = 60
+
+    # Requests that start heavy work (/api/analyze, /api/extract): each client
+    # address gets client_rate_per_minute a minute per endpoint, in bursts of
+    # up to client_rate_burst (0 = no limit), with the buckets in the process
+    # or, to share them between replicas, in the "database". Past
+    # admission_max_in_flight at once (an extraction counts until its job
+    # ends; 0 = no cap) requests get 429 and /ready reports saturation.
+    client_rate_per_minute: float = 10.0
+    client_rate_burst: int = 5
+    rate_limit_backend: str = "memory"
+    admission_max_in_flight: int = 16
+    # Proxies in front of the API that append to X-Forwarded-For (1 on
+    # Railway); clients are told apart by the address the outermost one saw
+    trusted_proxy_hops: int = 0
+
+    # Routers this replica serves, comma-separated ("" = all, "none" = only
+    # /health): analyze, extract, episodes, feed, metrics, bulk
+    api_routers: str = ""
 
     # Cloudflare R2
     r2_account_id: str = ""
@@ -37,11 +85,73 @@ class Settings(BaseSettings):
     podcast_email: str = "podcast@example.com"
     podcast_image_url: str = ""
     podcast_base_url: str = ""  # Base URL for the feed (e.g., https://your-app.railway.app)
+    # Publish the feed to R2 as static_feed_key whenever published episodes
+    # change, once per burst of changes static_feed_debounce seconds apart;
+    # /feed.xml then redirects to the R2 (r2_public_url) copy
+    static_feed: bool = False
+    static_feed_key: str = "feed.xml"
+    static_feed_debounce: float = 5.0
 
     # Audio Processing
-    audio_bitrate: str = "192k"
+    # Episode encoding, one of ENCODING_PROFILES in services/audio.py:
+    # mp3-stereo (CBR at audio_bitrate), speech-mp3, speech-aac, speech-opus
+    encoding_profile: str = "speech-mp3"
+    # Extra profiles encoded in the same FFmpeg run (comma-separated)
+    encoding_renditions: str = ""
+    # Rendition the feed enclosure points at ("" = encoding_profile)
+    feed_profile: str = ""
+    audio_bitrate: str = "192k"  # mp3-stereo and re-encoded concatenation
+    # Intro/outro clips encoded to match each profile ("" = <temp dir>/speech2pod-clips)
+    clip_cache_dir: str = ""
     audio_sample_rate: int = 44100
     loudness_target: float = -16.0  # LUFS
+    # Encode long files as parallel segments (1 = single FFmpeg process)
+    encode_workers: int = 1
+    segment_min_duration: float = 1200.0  # seconds
+    # Silence detection: None adapts the threshold to each recording's noise floor
+    silence_threshold_db: Optional[float] = None
+    # Also trim applause found at the start and end (it is always reported)
+    trim_applause: bool = False
+    # Shorten interior silence/applause longer than gap_threshold to gap_max_duration
+    # (seconds). Not applied by the streaming pipeline.
+    compress_gaps: bool = False
+    gap_threshold: float = 3.0
+    gap_max_duration: float = 1.5
+
+    # Worker scratch space for downloads and encodes ("" = <temp dir>/speech2pod-scratch).
+    # Put it on fast local disk.
+    scratch_dir: str = ""
+    # Disk one job may use; reserved when the job is admitted
+    scratch_job_quota_mb: int = 4096
+    # Jobs are held while admitting one more would leave less than this free
+    scratch_min_free_mb: int = 1024
+    # Seconds a held job waits for space before failing
+    scratch_wait_timeout: float = 1800.0
+
+    # Downloaded source audio is kept here between jobs ("" = <temp dir>/
+    # speech2pod-downloads), so retries resume and re-processing does not
+    # download again; least recently used entries go beyond the budget
+    # (0 = download into the job's scratch directory instead)
+    download_cache_dir: str = ""
+    download_cache_mb: int = 20480
+
+    # YouTube download: keep the native stream, prefer Opus then AAC
+    youtube_audio_format: str = "bestaudio[acodec=opus]/bestaudio[ext=m4a]/bestaudio/best"
+    # yt-dlp player clients to download with, in order of preference; the
+    # best performing recently is tried first and failing ones are skipped
+    youtube_player_clients: str = "android,web_embedded,ios"
+
+    # Pipe download -> encode -> upload instead of running them one after another.
+    # Silence is detected and reported but not trimmed in this mode, and only
+    # encoding_profile is produced (speech-aac cannot stream; it falls back).
+    streaming_pipeline: bool = False
+
+    # Bulk/playlist ingestion (POST /api/bulk)
+    bulk_analyze_workers: int = 4  # metadata + Claude calls in flight
+    bulk_extract_workers: int = 1  # extraction jobs in flight
+    bulk_domain_rate: float = 20.0  # requests per minute to any one domain
+    bulk_max_items: int = 1000  # videos per import, after expanding playlists
+    bulk_job_timeout: int = 7200  # seconds an item waits for its extraction job
 
     # Future: AI Voice (extensibility)
     elevenlabs_api_key: str = ""
@@ -1,6 +1,10 @@
-from sqlalchemy import create_engine
+from functools import lru_cache
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 from app.config import get_settings
 
 settings = get_settings()
@@ -12,27 +16,157 @@ if settings.database_url.startswith("postgres://"):
 else:
     database_url = settings.database_url
 
+is_sqlite = make_url(database_url).get_backend_name() == "sqlite"
+# WAL lets readers run alongside the one writer; writes then go through a
+# single connection per process (see SQLiteSession)
+sqlite_wal = is_sqlite and settings.sqlite_wal
+
+
+def configure_sqlite(engine: Engine, writer: bool = False) -> None:
+    """
+    Tune every new SQLite connection of an engine (sync, or an async
+    engine's sync_engine). The writer starts its transactions with BEGIN
+    IMMEDIATE, taking the write lock up front so it waits in busy_timeout
+    rather than failing with "database is locked" on its first write.
+    """
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout * 1000)}")
+        cursor.execute(f"PRAGMA mmap_size = {settings.sqlite_mmap_size_mb * 1024 * 1024}")
+        if settings.sqlite_wal:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            # Durable at checkpoints; a power cut can lose the last commits,
+            # never corrupt the database
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.close()
+        if writer:
+            # Leave BEGIN to us (see below) instead of the sqlite3 module
+            dbapi_connection.isolation_level = None
+
+    if writer:
+        @event.listens_for(engine, "begin")
+        def begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+class SQLiteSession(Session):
+    """
+    Sends flushes and INSERT/UPDATE/DELETE statements to the writer engine
+    in info["writer"], and reads to the session's own engine.
+
+    The writer pool has a single connection, so writers in this process
+    queue for it instead of contending for SQLite's lock, while reads use
+    the other connections concurrently. Processes on the same box queue
+    on the lock itself, for up to sqlite_busy_timeout.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            return self.info["writer"]
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
 engine = create_engine(
     database_url,
     pool_pre_ping=True,
     # SQLite specific settings
-    connect_args={"check_same_thread": False} if "sqlite" in database_url else {}
+    connect_args={"check_same_thread": False} if is_sqlite else {}
 )
+if is_sqlite:
+    configure_sqlite(engine)
+
+# Sync sessions are for background jobs and scripts, which run in threads
+if sqlite_wal:
+    write_engine = create_engine(
+        database_url,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.sqlite_busy_timeout,
+        connect_args={"check_same_thread": False},
+    )
+    configure_sqlite(write_engine, writer=True)
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine,
+        class_=SQLiteSession, info={"writer": write_engine}
+    )
+else:
+    write_engine = engine
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async drivers for request handlers, so a query doesn't block the event loop
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """The same database with its asyncio driver (asyncpg / aiosqlite)."""
+    parsed = make_url(url)
+    parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.get_backend_name()])
+    if "sslmode" in parsed.query:
+        # asyncpg calls libpq's sslmode "ssl"
+        parsed = parsed.update_query_dict({"ssl": parsed.query["sslmode"]}).difference_update_query(["sslmode"])
+    return parsed.render_as_string(hide_password=False)
+
+
+# Created on first use (app.database.async_engine, get_db): replicas and
+# workers that never open an async session skip sqlalchemy.ext.asyncio and
+# its driver at startup
+ASYNC_ATTRIBUTES = ("async_engine", "async_write_engine", "AsyncSessionLocal")
+
+
+@lru_cache()
+def _async_database() -> dict:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        async_database_url(database_url),
+        pool_pre_ping=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+    )
+    if is_sqlite:
+        configure_sqlite(async_engine.sync_engine)
+
+    # Objects stay loaded after commit: async sessions can't lazy-load on access
+    if sqlite_wal:
+        # Waiting for the writer connection awaits; it doesn't block the loop
+        async_write_engine = create_async_engine(
+            async_database_url(database_url),
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=settings.sqlite_busy_timeout,
+        )
+        configure_sqlite(async_write_engine.sync_engine, writer=True)
+        session_factory = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False,
+            sync_session_class=SQLiteSession, info={"writer": async_write_engine.sync_engine}
+        )
+    else:
+        async_write_engine = async_engine
+        session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    return dict(zip(ASYNC_ATTRIBUTES, (async_engine, async_write_engine, session_factory)))
+
+
+def __getattr__(name: str):
+    if name in ASYNC_ATTRIBUTES:
+        return _async_database()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with _async_database()["AsyncSessionLocal"]() as db:
         yield db
-    finally:
-        db.close()
 
 
 def init_db():
-    """Initialize database tables"""
-    from app.models import episode  # noqa
-    Base.metadata.create_all(bind=engine)
+    """Bring the database schema up to date with Alembic migrations"""
+    from pathlib import Path
+    from alembic import command
+    from alembic.config import Config
+
+    alembic_cfg = Config(str(Path(__file__).parent.parent / "alembic.ini"))
+    command.upgrade(alembic_cfg, "head")
@@ -1,8 +1,55 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import asyncio
 import os
 
-app = FastAPI(title="Speech2Pod")
+from app.config import get_settings
+
+# Routers that write to worker scratch space
+SCRATCH_ROUTERS = {"extract", "episodes", "bulk"}
+
+
+def enabled_routers() -> list:
+    """The routers this replica serves (Settings.api_routers)."""
+    from app.routers import ROUTER_MODULES
+
+    names = [name.strip() for name in get_settings().api_routers.split(",") if name.strip()]
+    if names == ["none"]:
+        return []
+    unknown = [name for name in names if name not in ROUTER_MODULES]
+    if unknown:
+        print(f"Ignoring unknown API_ROUTERS entries: {', '.join(unknown)}")
+    return [name for name in names if name in ROUTER_MODULES] or list(ROUTER_MODULES)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Bring the schema up to date, clean scratch space and refresh the
+    static feed before serving.
+    """
+    if get_settings().migrate_on_startup:
+        from app.database import init_db
+        await asyncio.to_thread(init_db)
+
+    if SCRATCH_ROUTERS & set(app.state.routers):
+        # Remove scratch directories left behind by workers that died mid-job
+        from app.services.scratch import get_scratch_space
+        await asyncio.to_thread(get_scratch_space().sweep)
+
+    if get_settings().static_feed and "episodes" in app.state.routers:
+        # Bring the static feed up to date with changes made elsewhere
+        # (a migration, another replica); a no-op when nothing changed
+        from app.services.feed import get_feed_publisher
+        get_feed_publisher().schedule()
+
+    yield
+
+
+app = FastAPI(title="Speech2Pod", lifespan=lifespan)
+app.state.routers = []
 
 # CORS - allow Vercel and vilas.live domains
 frontend_url = os.getenv("FRONTEND_URL", "")
@@ -29,20 +76,33 @@ app.add_middleware(
 async def health():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    """
+    Readiness for the load balancer: 503 while this replica has as many
+    analyze/extract requests in flight as it admits (it would refuse new
+    ones), with the load and, where jobs run here, the scheduler's slots.
+    """
+    from app.services.admission import get_admission_control
+
+    status = get_admission_control().status()
+    if "extract" in app.state.routers and get_settings().extraction_runner == "local":
+        from app.services.scheduler import get_job_scheduler
+        status["jobs"] = get_job_scheduler().stats()
+    return JSONResponse(status, status_code=503 if status["status"] == "saturated" else 200)
+
 @app.get("/")
 async def root():
     return {"name": "Speech2Pod", "status": "running"}
 
-# Load routers after health endpoint is defined
+# Load routers after health endpoint is defined. Services import yt-dlp,
+# boto3, anthropic, numpy and feedgen on first use, not here.
 try:
-    from app.database import init_db
-    init_db()
-
-    from app.routers import analyze_router, extract_router, episodes_router, feed_router
-    app.include_router(analyze_router)
-    app.include_router(extract_router)
-    app.include_router(episodes_router)
-    app.include_router(feed_router)
+    from app.routers import load_router
+
+    for name in enabled_routers():
+        app.include_router(load_router(name))
+        app.state.routers.append(name)
 except Exception as e:
     print(f"Error loading routers: {e}")
     import traceback
@@ -1,3 +1,5 @@
 from app.models.episode import Episode, ExtractionJob
+from app.models.bulk import BulkImport, BulkItem
+from app.models.ratelimit import RateLimitBucket
 
-__all__ = ["Episode", "ExtractionJob"]
+__all__ = ["Episode", "ExtractionJob", "BulkImport", "BulkItem", "RateLimitBucket"]
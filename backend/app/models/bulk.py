@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy.sql import func
+import enum
+
+from app.database import Base
+
+
+class BulkStatus(str, enum.Enum):
+    EXPANDING = "expanding"  # resolving playlist/channel URLs to videos
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BulkItemStatus(str, enum.Enum):
+    QUEUED = "queued"
+    ANALYZING = "analyzing"
+    EXTRACTING = "extracting"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # already an episode, or a duplicate in the batch
+
+
+BULK_ITEM_DONE = (BulkItemStatus.COMPLETED, BulkItemStatus.FAILED, BulkItemStatus.SKIPPED)
+
+
+class BulkImport(Base):
+    """A batch of videos going through analyze, extract and create-episode."""
+    __tablename__ = "bulk_imports"
+
+    id = Column(String(36), primary_key=True)  # UUID
+    status = Column(SQLEnum(BulkStatus), default=BulkStatus.EXPANDING)
+    # JSON list of the URLs as submitted (videos, playlists, channels)
+    source_urls = Column(Text)
+    publish = Column(Boolean, default=False)
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class BulkItem(Base):
+    """One video of a bulk import."""
+    __tablename__ = "bulk_items"
+
+    id = Column(Integer, primary_key=True)
+    bulk_id = Column(String(36), ForeignKey("bulk_imports.id"), index=True)
+    position = Column(Integer)
+    youtube_url = Column(String(500))
+    youtube_id = Column(String(20), index=True)
+    status = Column(SQLEnum(BulkItemStatus), default=BulkItemStatus.QUEUED)
+    # JSON AnalyzeResponse, kept so the episode can be created after extraction
+    analysis = Column(Text, nullable=True)
+    job_id = Column(String(36), nullable=True)
+    episode_id = Column(Integer, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
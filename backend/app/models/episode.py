@@ -1,7 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index, Enum as SQLEnum
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from datetime import datetime
+from typing import Optional
 import enum
+import json
+import re
+import unicodedata
 
 from app.database import Base
 
@@ -18,6 +23,20 @@ class JobStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+class JobPriority(str, enum.Enum):
+    INTERACTIVE = "interactive"  # started from the UI
+    BULK = "bulk"  # bulk imports and backfills
+
+
+def slugify(value: Optional[str]) -> Optional[str]:
+    """URL form of a speaker or topic: "José Díaz, Jr." -> "jose-diaz-jr"."""
+    if not value:
+        return None
+    ascii_value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r"[^a-z0-9]+", "-", ascii_value.lower()).strip("-")
+    return slug[:200] or None
+
+
 class Episode(Base):
     __tablename__ = "episodes"
 
@@ -36,11 +55,19 @@ class Episode(Base):
     venue = Column(String(300))
     topic = Column(String(300))
     summary = Column(Text)
+    # slugify(speaker) and slugify(topic), kept in step by _set_slug: the
+    # speaker and topic feeds look episodes up by these
+    speaker_slug = Column(String(200), nullable=True)
+    topic_slug = Column(String(200), nullable=True)
 
     # Audio
     audio_url = Column(String(500))
     audio_duration = Column(Float)  # seconds
     thumbnail_url = Column(String(500))
+    # JSON {variant: url} of the artwork sizes; thumbnail_url is "artwork"
+    thumbnails = Column(Text, nullable=True)
+    # JSON {profile: {url, content_type, bytes}} of every encoded rendition
+    renditions = Column(Text, nullable=True)
 
     # Crop settings
     crop_start = Column(Float, default=0.0)
@@ -59,6 +86,20 @@ class Episode(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     published_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # Feed: published episodes by published_at; listing: by created_at
+        Index("ix_episodes_status_published_at", "status", "published_at"),
+        Index("ix_episodes_status_created_at", "status", "created_at"),
+        # Speaker and topic feeds
+        Index("ix_episodes_speaker_slug_status_published_at", "speaker_slug", "status", "published_at"),
+        Index("ix_episodes_topic_slug_status_published_at", "topic_slug", "status", "published_at"),
+    )
+
+    @validates("speaker", "topic")
+    def _set_slug(self, key, value):
+        setattr(self, f"{key}_slug", slugify(value))
+        return value
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -74,6 +115,8 @@ class Episode(Base):
             "audio_url": self.audio_url,
             "audio_duration": self.audio_duration,
             "thumbnail_url": self.thumbnail_url,
+            "thumbnails": json.loads(self.thumbnails) if self.thumbnails else None,
+            "renditions": json.loads(self.renditions) if self.renditions else None,
             "crop_start": self.crop_start,
             "crop_end": self.crop_end,
             "intro_audio_url": self.intro_audio_url,
@@ -91,17 +134,40 @@ class ExtractionJob(Base):
 
     id = Column(String(36), primary_key=True)  # UUID
     youtube_id = Column(String(20), index=True)
+    youtube_url = Column(String(500), nullable=True)
     status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING)
 
+    # Scheduling: interactive jobs go ahead of bulk ones, and jobs of one
+    # class are shared between tenants (see app.services.scheduler)
+    priority = Column(
+        SQLEnum(JobPriority), nullable=False,
+        default=JobPriority.INTERACTIVE, server_default=JobPriority.INTERACTIVE.name
+    )
+    tenant = Column(String(100), nullable=True)
+
+    # Claim: the node running the job holds it until lease_expires_at and
+    # renews it while it runs (see app.services.jobqueue)
+    claimed_by = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Results
     audio_url = Column(String(500), nullable=True)
     thumbnail_url = Column(String(500), nullable=True)
+    thumbnails = Column(Text, nullable=True)  # JSON {variant: url}
     duration = Column(Float, nullable=True)
     waveform_data = Column(Text, nullable=True)  # JSON array of amplitude values
+    # JSON {profile: {url, content_type, bytes}}; audio_url is the primary one
+    renditions = Column(Text, nullable=True)
 
     # Silence detection
     detected_start_silence = Column(Float, default=0.0)
     detected_end_silence = Column(Float, default=0.0)
+    # JSON [{start, end, kind}] of every silence/applause run, source timeline
+    detected_segments = Column(Text, nullable=True)
+
+    # Per-stage timings: JSON {stage: {seconds, bytes, cpu_seconds, max_rss_bytes}}
+    stage_timings = Column(Text, nullable=True)
 
     # Error info
     error_message = Column(Text, nullable=True)
@@ -109,3 +175,8 @@ class ExtractionJob(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Claiming: the oldest active jobs of a class first
+        Index("ix_extraction_jobs_status_priority_created_at", "status", "priority", "created_at"),
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Float, Index, String
+
+from app.database import Base
+
+
+class RateLimitBucket(Base):
+    """A client's token bucket, when rate limits are shared through the database."""
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(255), primary_key=True)  # endpoint:client address
+    tokens = Column(Float, nullable=False)
+    # Unix time of the last update; also the compare-and-set version
+    updated_at = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_rate_limit_buckets_updated_at", "updated_at"),
+    )
@@ -1,11 +1,32 @@
-from app.routers.analyze import router as analyze_router
-from app.routers.extract import router as extract_router
-from app.routers.episodes import router as episodes_router
-from app.routers.feed import router as feed_router
+from importlib import import_module
+
+# Router name -> module, imported on first access so a replica only loads
+# the routers it serves (see Settings.api_routers)
+ROUTER_MODULES = {
+    "analyze": "app.routers.analyze",
+    "extract": "app.routers.extract",
+    "episodes": "app.routers.episodes",
+    "feed": "app.routers.feed",
+    "metrics": "app.routers.metrics",
+    "bulk": "app.routers.bulk",
+}
 
 __all__ = [
     "analyze_router",
     "extract_router",
     "episodes_router",
-    "feed_router"
+    "feed_router",
+    "metrics_router",
+    "bulk_router"
 ]
+
+
+def load_router(name: str):
+    """Import a router module by its short name and return its APIRouter."""
+    return import_module(ROUTER_MODULES[name]).router
+
+
+def __getattr__(name: str):
+    if name.endswith("_router") and name[:-len("_router")] in ROUTER_MODULES:
+        return load_router(name[:-len("_router")])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
 
-from app.services.youtube import YouTubeService
+from app.services.youtube import YouTubeService, YouTubeMetadata
 from app.services.ai import AIService
+from app.services.admission import AdmissionRejected, client_address, get_admission_control
 
 router = APIRouter(prefix="/api", tags=["analyze"])
 
@@ -33,9 +35,10 @@ class AnalyzeResponse(BaseModel):
 
 
 @router.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_video(request: AnalyzeRequest):
+async def analyze_video(request: AnalyzeRequest, http_request: Request):
     """
     Analyze a YouTube URL and generate podcast metadata.
+    Refused with 429 when the client or the server is over its limits.
     """
     # Extract video ID
     video_id = YouTubeService.extract_video_id(request.url)
@@ -43,14 +46,33 @@ async def analyze_video(request: AnalyzeRequest):
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
 
     try:
-        # Get YouTube metadata
-        yt_metadata = YouTubeService.get_metadata(request.url)
-    except Exception as e:
+        admission = await get_admission_control().admit("analyze", client_address(http_request))
+    except AdmissionRejected as e:
         raise HTTPException(
-            status_code=400,
-            detail=f"Failed to fetch YouTube video: {str(e)}"
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
         )
 
+    # yt-dlp and Claude block, so they run off the event loop
+    try:
+        try:
+            # Get YouTube metadata
+            yt_metadata = await asyncio.to_thread(YouTubeService.get_metadata, request.url)
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Failed to fetch YouTube video: {str(e)}"
+            )
+
+        return await asyncio.to_thread(generate_analysis, yt_metadata, request.url)
+    finally:
+        admission.release()
+
+
+def generate_analysis(yt_metadata: YouTubeMetadata, url: str) -> AnalyzeResponse:
+    """
+    Generate podcast metadata for a fetched video with Claude, falling back
+    to the YouTube fields if that fails. Blocking; also used by bulk imports.
+    """
     try:
         # Generate AI metadata
         print(f"Calling AI service for video: {yt_metadata.title}")
@@ -60,7 +82,7 @@ async def analyze_video(request: AnalyzeRequest):
             description=yt_metadata.description,
             uploader=yt_metadata.uploader,
             upload_date=yt_metadata.upload_date,
-            youtube_url=request.url,
+            youtube_url=url,
         )
         print(f"AI returned: speaker={generated.speaker}, venue={generated.venue}")
     except Exception as e:
@@ -0,0 +1,367 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+import json
+import time
+import uuid
+
+from app.config import get_settings
+from app.database import get_db, SessionLocal
+from app.models.bulk import BulkImport, BulkItem, BulkStatus, BulkItemStatus, BULK_ITEM_DONE
+from app.models.episode import Episode, EpisodeStatus, ExtractionJob, JobPriority, JobStatus
+from app.routers.analyze import generate_analysis
+from app.routers.extract import process_extraction
+from app.services.events import get_job_events, TERMINAL_STATUSES
+from app.services.feed import get_feed_publisher
+from app.services.ratelimit import DomainRateLimiter, domain_of
+from app.services.youtube import YouTubeService
+
+router = APIRouter(prefix="/api", tags=["bulk"])
+
+# Claude calls are rate limited like any other domain
+ANTHROPIC_API_URL = "https://api.anthropic.com"
+# Seconds between checks on an extraction job run by a worker
+JOB_POLL_SECONDS = 5
+
+
+class BulkRequest(BaseModel):
+    # Video, playlist or channel URLs; playlists and channels are expanded
+    urls: List[str]
+    publish: bool = False
+
+
+class BulkItemResponse(BaseModel):
+    position: int
+    youtube_url: str
+    youtube_id: Optional[str] = None
+    status: str
+    job_id: Optional[str] = None
+    episode_id: Optional[int] = None
+    error_message: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    bulk_id: str
+    status: str
+    total: int
+    counts: Dict[str, int]
+    progress: float  # finished items / total
+    error_message: Optional[str] = None
+    created_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    items: Optional[List[BulkItemResponse]] = None
+
+
+class BulkScheduler:
+    """
+    Runs bulk imports. Each video is analyzed (YouTube metadata and Claude)
+    on one bounded pool and extracted on another, then saved as an episode,
+    so later items are analyzed while earlier ones encode. Every request to
+    YouTube or Claude waits its turn in a per-domain rate limiter.
+    Extraction jobs are bulk priority, so they give way to the UI's.
+
+    Imports run in this process; items in flight when it stops are not
+    picked up again.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self._analyze_pool = ThreadPoolExecutor(
+            max_workers=settings.bulk_analyze_workers, thread_name_prefix="bulk-analyze"
+        )
+        self._extract_pool = ThreadPoolExecutor(
+            max_workers=settings.bulk_extract_workers, thread_name_prefix="bulk-extract"
+        )
+        self._limiter = DomainRateLimiter(settings.bulk_domain_rate)
+
+    def start(self, bulk_id: str, urls: List[str]) -> None:
+        self._analyze_pool.submit(self._expand, bulk_id, urls)
+
+    def _expand(self, bulk_id: str, urls: List[str]) -> None:
+        """Resolve the submitted URLs to videos and queue them."""
+        db = SessionLocal()
+        try:
+            bulk = db.get(BulkImport, bulk_id)
+            limit = get_settings().bulk_max_items
+            video_urls = []
+            for url in urls:
+                if len(video_urls) >= limit:
+                    break
+                if not YouTubeService.extract_video_id(url):
+                    self._limiter.acquire(url)
+                video_urls += YouTubeService.expand_url(url, limit - len(video_urls))
+
+            # Videos that already have an episode, or appear twice, are skipped
+            video_ids = [YouTubeService.extract_video_id(url) for url in video_urls]
+            existing = {
+                row[0] for row in
+                db.query(Episode.youtube_id).filter(Episode.youtube_id.in_([v for v in video_ids if v]))
+            }
+            seen = set()
+            items = []
+            for position, (url, video_id) in enumerate(zip(video_urls, video_ids)):
+                item = BulkItem(
+                    bulk_id=bulk_id, position=position, youtube_url=url, youtube_id=video_id,
+                    status=BulkItemStatus.QUEUED
+                )
+                if video_id in existing:
+                    item.status, item.error_message = BulkItemStatus.SKIPPED, "Already an episode"
+                elif video_id in seen:
+                    item.status, item.error_message = BulkItemStatus.SKIPPED, "Duplicate in this import"
+                seen.add(video_id)
+                items.append(item)
+
+            db.add_all(items)
+            bulk.status = BulkStatus.RUNNING
+            db.commit()
+
+            queued = [item.id for item in items if item.status == BulkItemStatus.QUEUED]
+            print(f"Bulk import {bulk_id}: {len(items)} videos, {len(queued)} to process")
+            for item_id in queued:
+                self._analyze_pool.submit(self._analyze, item_id)
+            if not queued:
+                self._finish_if_done(db, bulk_id)
+
+        except Exception as e:
+            db.rollback()
+            bulk = db.get(BulkImport, bulk_id)
+            bulk.status = BulkStatus.FAILED
+            bulk.error_message = f"Could not expand URLs: {e}"
+            bulk.completed_at = datetime.now(timezone.utc)
+            db.commit()
+        finally:
+            db.close()
+
+    def _analyze(self, item_id: int) -> None:
+        """Fetch metadata and generate the episode fields, then queue extraction."""
+        db = SessionLocal()
+        try:
+            item = db.get(BulkItem, item_id)
+            item.status = BulkItemStatus.ANALYZING
+            db.commit()
+
+            self._limiter.acquire(item.youtube_url)
+            yt_metadata = YouTubeService.get_metadata(item.youtube_url)
+            self._limiter.acquire(ANTHROPIC_API_URL)
+            analysis = generate_analysis(yt_metadata, item.youtube_url)
+
+            job_id = str(uuid.uuid4())
+            # Each import is a tenant, so concurrent imports share bulk slots
+            db.add(ExtractionJob(
+                id=job_id, youtube_id=analysis.youtube_id, youtube_url=item.youtube_url,
+                status=JobStatus.PENDING, priority=JobPriority.BULK, tenant=item.bulk_id
+            ))
+            item.youtube_id = analysis.youtube_id
+            item.analysis = analysis.model_dump_json()
+            item.job_id = job_id
+            item.status = BulkItemStatus.EXTRACTING
+            db.commit()
+            get_job_events().publish(job_id, JobStatus.PENDING.value)
+
+            self._extract_pool.submit(self._extract, item_id)
+        except Exception as e:
+            self._fail(db, item_id, e)
+        finally:
+            db.close()
+
+    def _extract(self, item_id: int) -> None:
+        """Run the extraction job and save the result as an episode."""
+        db = SessionLocal()
+        try:
+            item = db.get(BulkItem, item_id)
+            if item is None:
+                return
+            settings = get_settings()
+            if settings.extraction_runner == "local":
+                self._limiter.acquire(item.youtube_url)
+                process_extraction(item.job_id, item.youtube_url, settings.database_url)
+
+            # A worker, here or on another node, may hold the job
+            job = self._wait_for_job(db, item.job_id, settings.bulk_job_timeout)
+            if job.status != JobStatus.COMPLETED:
+                raise RuntimeError(job.error_message or "Extraction failed")
+
+            bulk = db.get(BulkImport, item.bulk_id)
+            episode = _episode_from(json.loads(item.analysis), item.youtube_url, job, bulk.publish)
+            db.add(episode)
+            db.flush()
+            item.episode_id = episode.id
+            item.status = BulkItemStatus.COMPLETED
+            db.commit()
+            if bulk.publish:
+                get_feed_publisher().schedule()
+        except Exception as e:
+            self._fail(db, item_id, e)
+        else:
+            self._finish_if_done(db, item.bulk_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _wait_for_job(db: Session, job_id: str, timeout: float) -> ExtractionJob:
+        """
+        Poll an extraction job until it completes or fails. Raises
+        TimeoutError if it is still running after timeout seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = db.get(ExtractionJob, job_id, populate_existing=True)
+            if job is None:
+                raise RuntimeError(f"Extraction job {job_id} no longer exists")
+            if job.status.value in TERMINAL_STATUSES:
+                return job
+            db.rollback()
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Extraction job {job_id} still {job.status.value} after {timeout:.0f}s"
+                )
+            time.sleep(min(JOB_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+
+    @staticmethod
+    def _fail(db: Session, item_id: int, error: Exception) -> None:
+        print(f"Bulk item {item_id} failed: {error}")
+        db.rollback()
+        item = db.get(BulkItem, item_id)
+        if item is None:
+            return
+        item.status = BulkItemStatus.FAILED
+        item.error_message = str(error)
+        db.commit()
+        BulkScheduler._finish_if_done(db, item.bulk_id)
+
+    @staticmethod
+    def _finish_if_done(db: Session, bulk_id: str) -> None:
+        remaining = db.query(BulkItem).filter(
+            BulkItem.bulk_id == bulk_id,
+            BulkItem.status.notin_(BULK_ITEM_DONE)
+        ).count()
+        if remaining:
+            return
+
+        bulk = db.get(BulkImport, bulk_id)
+        if bulk.status == BulkStatus.RUNNING:
+            bulk.status = BulkStatus.COMPLETED
+            bulk.completed_at = datetime.now(timezone.utc)
+            db.commit()
+            print(f"Bulk import {bulk_id} completed")
+
+
+@lru_cache()
+def get_bulk_scheduler() -> BulkScheduler:
+    return BulkScheduler()
+
+
+def _episode_from(analysis: dict, youtube_url: str, job: ExtractionJob, publish: bool) -> Episode:
+    """An episode from an analysis and its finished extraction job, as the UI would save it."""
+    generated = analysis["generated_metadata"]
+    status = EpisodeStatus.PUBLISHED if publish else EpisodeStatus.DRAFT
+    return Episode(
+        youtube_id=analysis["youtube_id"],
+        youtube_url=youtube_url,
+        original_title=analysis["original_title"],
+        original_description=analysis["description"],
+        title=generated["suggested_title"],
+        speaker=generated["speaker"],
+        speech_date=generated["date"],
+        venue=generated["venue"],
+        topic=generated["topic"],
+        summary=generated["summary"],
+        audio_url=job.audio_url,
+        audio_duration=job.duration,
+        thumbnail_url=job.thumbnail_url or analysis["thumbnail_url"],
+        thumbnails=job.thumbnails,
+        renditions=job.renditions,
+        crop_start=0.0,
+        status=status,
+        published_at=datetime.now(timezone.utc) if publish else None
+    )
+
+
+@router.post("/bulk", response_model=BulkResponse)
+async def start_bulk_import(request: BulkRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Import many videos at once: each URL may be a video, a playlist or a
+    channel. Every video is analyzed, extracted and saved as an episode
+    (a draft unless publish is set). Poll GET /bulk/{bulk_id} for progress.
+    """
+    settings = get_settings()
+    urls = [url.strip() for url in request.urls if url.strip()]
+    if not urls:
+        raise HTTPException(status_code=400, detail="No URLs given")
+    if len(urls) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.bulk_max_items} URLs per import"
+        )
+    invalid = [url for url in urls if domain_of(url) != "youtube.com"]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Not YouTube URLs: {', '.join(invalid[:5])}")
+
+    bulk = BulkImport(
+        id=str(uuid.uuid4()),
+        status=BulkStatus.EXPANDING,
+        source_urls=json.dumps(urls),
+        publish=request.publish
+    )
+    db.add(bulk)
+    await db.commit()
+    await db.refresh(bulk)
+
+    get_bulk_scheduler().start(bulk.id, urls)
+    return await _bulk_response(db, bulk, include_items=False)
+
+
+@router.get("/bulk/{bulk_id}", response_model=BulkResponse)
+async def get_bulk_import(bulk_id: str, items: bool = True, db: AsyncSession = Depends(get_db)):
+    """Progress of a bulk import: item counts by status, and every item unless items=false."""
+    bulk = await db.get(BulkImport, bulk_id)
+    if not bulk:
+        raise HTTPException(status_code=404, detail="Bulk import not found")
+    return await _bulk_response(db, bulk, include_items=items)
+
+
+async def _bulk_response(db: AsyncSession, bulk: BulkImport, include_items: bool) -> BulkResponse:
+    counts = {
+        status.value: count for status, count in await db.execute(
+            select(BulkItem.status, func.count(BulkItem.id))
+            .where(BulkItem.bulk_id == bulk.id)
+            .group_by(BulkItem.status)
+        )
+    }
+    total = sum(counts.values())
+    done = sum(counts.get(status.value, 0) for status in BULK_ITEM_DONE)
+
+    item_list = None
+    if include_items:
+        item_list = [
+            BulkItemResponse(
+                position=item.position,
+                youtube_url=item.youtube_url,
+                youtube_id=item.youtube_id,
+                status=item.status.value,
+                job_id=item.job_id,
+                episode_id=item.episode_id,
+                error_message=item.error_message,
+            )
+            for item in await db.scalars(
+                select(BulkItem).where(BulkItem.bulk_id == bulk.id).order_by(BulkItem.position)
+            )
+        ]
+
+    return BulkResponse(
+        bulk_id=bulk.id,
+        status=bulk.status.value,
+        total=total,
+        counts=counts,
+        progress=round(done / total, 3) if total else 0.0,
+        error_message=bulk.error_message,
+        created_at=bulk.created_at.isoformat() if bulk.created_at else None,
+        completed_at=bulk.completed_at.isoformat() if bulk.completed_at else None,
+        items=item_list,
+    )
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
-from typing import Optional, List
-from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Any, Tuple
+from sqlalchemy import String, and_, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
+from urllib.parse import urlparse
+import asyncio
+import base64
+import json
+import os
 
 from app.database import get_db
-from app.models.episode import Episode, EpisodeStatus
+from app.models.episode import Episode, EpisodeStatus, slugify
+from app.services.audio import AudioService, get_encoding_profile
+from app.services.feed import get_feed_publisher
+from app.services.scratch import get_scratch_space, ScratchSpaceFull
+from app.services.storage import StorageService
 
 router = APIRouter(prefix="/api", tags=["episodes"])
 
+# Read size when downloading audio to the scratch directory
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
 
 class EpisodeCreate(BaseModel):
     youtube_id: str
@@ -24,6 +37,8 @@ class EpisodeCreate(BaseModel):
     audio_url: str
     audio_duration: float
     thumbnail_url: str
+    thumbnails: Optional[Dict[str, str]] = None
+    renditions: Optional[Dict[str, Dict[str, Any]]] = None
     crop_start: float = 0.0
     crop_end: Optional[float] = None
     status: str = "draft"  # draft or published
@@ -39,6 +54,8 @@ class EpisodeUpdate(BaseModel):
     audio_url: Optional[str] = None
     audio_duration: Optional[float] = None
     thumbnail_url: Optional[str] = None
+    thumbnails: Optional[Dict[str, str]] = None
+    renditions: Optional[Dict[str, Dict[str, Any]]] = None
     crop_start: Optional[float] = None
     crop_end: Optional[float] = None
     status: Optional[str] = None
@@ -61,6 +78,8 @@ class EpisodeResponse(BaseModel):
     audio_url: str
     audio_duration: float
     thumbnail_url: str
+    thumbnails: Optional[Dict[str, str]]
+    renditions: Optional[Dict[str, Dict[str, Any]]]
     crop_start: float
     crop_end: Optional[float]
     intro_audio_url: Optional[str]
@@ -72,8 +91,17 @@ class EpisodeResponse(BaseModel):
     published_at: Optional[str]
 
 
+class EpisodePage(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
 @router.post("/episodes", response_model=EpisodeResponse)
-async def create_episode(episode: EpisodeCreate, db: Session = Depends(get_db)):
+async def create_episode(episode: EpisodeCreate, db: AsyncSession = Depends(get_db)):
     """Create a new episode (draft or published)."""
     status = EpisodeStatus.PUBLISHED if episode.status == "published" else EpisodeStatus.DRAFT
 
@@ -91,6 +119,8 @@ async def create_episode(episode: EpisodeCreate, db: Session = Depends(get_db)):
         audio_url=episode.audio_url,
         audio_duration=episode.audio_duration,
         thumbnail_url=episode.thumbnail_url,
+        thumbnails=json.dumps(episode.thumbnails) if episode.thumbnails else None,
+        renditions=json.dumps(episode.renditions) if episode.renditions else None,
         crop_start=episode.crop_start,
         crop_end=episode.crop_end,
         status=status,
@@ -98,34 +128,97 @@ async def create_episode(episode: EpisodeCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_episode)
-    db.commit()
-    db.refresh(db_episode)
+    await db.commit()
+    await db.refresh(db_episode)
+    if status == EpisodeStatus.PUBLISHED:
+        get_feed_publisher().schedule()
 
     return _episode_to_response(db_episode)
 
 
-@router.get("/episodes", response_model=List[EpisodeResponse])
+@router.get("/episodes", response_model=EpisodePage)
 async def list_episodes(
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    speaker: Optional[str] = None,
+    topic: Optional[str] = None,
+    q: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all episodes, optionally filtered by status."""
-    query = db.query(Episode)
+    """
+    List episodes newest first, one page at a time.
+
+    - status: "published" or "draft"
+    - speaker / topic: exact match ignoring case, accents and punctuation
+    - q: substring search over title, speaker and topic
+    - fields: comma-separated columns to return (default: all)
+    - cursor: next_cursor from the previous page
+    """
+    columns = _parse_fields(fields)
+    query = select(*[getattr(Episode, name) for name in columns])
 
     if status:
         if status == "published":
-            query = query.filter(Episode.status == EpisodeStatus.PUBLISHED)
+            query = query.where(Episode.status == EpisodeStatus.PUBLISHED)
         elif status == "draft":
-            query = query.filter(Episode.status == EpisodeStatus.DRAFT)
-
-    episodes = query.order_by(Episode.created_at.desc()).all()
-    return [_episode_to_response(ep) for ep in episodes]
+            query = query.where(Episode.status == EpisodeStatus.DRAFT)
+
+    # By the indexed slugs; a value with no slug ("") matches nothing
+    if speaker:
+        query = query.where(Episode.speaker_slug == (slugify(speaker) or ""))
+    if topic:
+        query = query.where(Episode.topic_slug == (slugify(topic) or ""))
+    if q:
+        pattern = f"%{q.strip()}%"
+        query = query.where(or_(
+            Episode.title.ilike(pattern),
+            Episode.speaker.ilike(pattern),
+            Episode.topic.ilike(pattern),
+        ))
+
+    # SQLite keeps created_at as text, CURRENT_TIMESTAMP defaults without
+    # fractional seconds and values set from Python with them, and sorts by
+    # that text: the cursor carries and compares the stored text itself
+    sqlite = db.bind.dialect.name == "sqlite"
+    created_at_key = type_coerce(Episode.created_at, String) if sqlite else Episode.created_at
+    if sqlite:
+        query = query.add_columns(created_at_key.label("created_at_key"))
+
+    if cursor:
+        created_at, last_id = _decode_cursor(cursor)
+        if not sqlite:
+            created_at = datetime.fromisoformat(created_at)
+        query = query.where(or_(
+            created_at_key < created_at,
+            and_(created_at_key == created_at, Episode.id < last_id),
+        ))
+
+    rows = (await db.execute(
+        query.order_by(Episode.created_at.desc(), Episode.id.desc())
+        .limit(limit + 1)
+    )).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(
+            last.created_at_key if sqlite else last.created_at.isoformat(), last.id
+        )
+
+    items = [
+        {name: _serialize_field(name, getattr(row, name)) for name in columns}
+        for row in rows
+    ]
+    return EpisodePage(items=items, next_cursor=next_cursor)
 
 
 @router.get("/episodes/{episode_id}", response_model=EpisodeResponse)
-async def get_episode(episode_id: int, db: Session = Depends(get_db)):
+async def get_episode(episode_id: int, db: AsyncSession = Depends(get_db)):
     """Get a single episode by ID."""
-    episode = db.query(Episode).filter(Episode.id == episode_id).first()
+    episode = await db.get(Episode, episode_id)
     if not episode:
         raise HTTPException(status_code=404, detail="Episode not found")
     return _episode_to_response(episode)
@@ -135,14 +228,15 @@ async def get_episode(episode_id: int, db: Session = Depends(get_db)):
 async def update_episode(
     episode_id: int,
     update: EpisodeUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an episode."""
-    episode = db.query(Episode).filter(Episode.id == episode_id).first()
+    episode = await db.get(Episode, episode_id)
     if not episode:
         raise HTTPException(status_code=404, detail="Episode not found")
 
     update_data = update.model_dump(exclude_unset=True)
+    was_published = episode.status == EpisodeStatus.PUBLISHED
 
     # Handle status change
     if "status" in update_data:
@@ -154,60 +248,163 @@ async def update_episode(
         else:
             episode.status = EpisodeStatus.DRAFT
 
+    for name in ("renditions", "thumbnails"):
+        if name in update_data:
+            value = update_data.pop(name)
+            setattr(episode, name, json.dumps(value) if value else None)
+
+    # Variants of the old artwork no longer apply to a new thumbnail_url
+    if "thumbnail_url" in update_data and "thumbnails" not in update.model_fields_set:
+        episode.thumbnails = None
+
+    # Files assembled with the old intro/outro no longer apply
+    if {"intro_audio_url", "outro_audio_url"} & update_data.keys() and episode.renditions:
+        renditions = json.loads(episode.renditions)
+        for entry in renditions.values():
+            entry.pop("assembled", None)
+        episode.renditions = json.dumps(renditions)
+
     # Update other fields
     for field, value in update_data.items():
         setattr(episode, field, value)
 
-    db.commit()
-    db.refresh(episode)
+    await db.commit()
+    await db.refresh(episode)
+    if was_published or episode.status == EpisodeStatus.PUBLISHED:
+        get_feed_publisher().schedule()
 
     return _episode_to_response(episode)
 
 
 @router.delete("/episodes/{episode_id}")
-async def delete_episode(episode_id: int, db: Session = Depends(get_db)):
+async def delete_episode(episode_id: int, db: AsyncSession = Depends(get_db)):
     """Delete an episode."""
-    episode = db.query(Episode).filter(Episode.id == episode_id).first()
+    episode = await db.get(Episode, episode_id)
     if not episode:
         raise HTTPException(status_code=404, detail="Episode not found")
 
-    db.delete(episode)
-    db.commit()
+    was_published = episode.status == EpisodeStatus.PUBLISHED
+    await db.delete(episode)
+    await db.commit()
+    if was_published:
+        get_feed_publisher().schedule()
 
     return {"message": "Episode deleted"}
 
 
 @router.post("/episodes/{episode_id}/publish", response_model=EpisodeResponse)
-async def publish_episode(episode_id: int, db: Session = Depends(get_db)):
+async def publish_episode(episode_id: int, db: AsyncSession = Depends(get_db)):
     """Publish a draft episode."""
-    episode = db.query(Episode).filter(Episode.id == episode_id).first()
+    episode = await db.get(Episode, episode_id)
     if not episode:
         raise HTTPException(status_code=404, detail="Episode not found")
 
     episode.status = EpisodeStatus.PUBLISHED
     episode.published_at = datetime.now(timezone.utc)
 
-    db.commit()
-    db.refresh(episode)
+    await db.commit()
+    await db.refresh(episode)
+    get_feed_publisher().schedule()
 
     return _episode_to_response(episode)
 
 
 @router.post("/episodes/{episode_id}/unpublish", response_model=EpisodeResponse)
-async def unpublish_episode(episode_id: int, db: Session = Depends(get_db)):
+async def unpublish_episode(episode_id: int, db: AsyncSession = Depends(get_db)):
     """Unpublish an episode (move to draft)."""
-    episode = db.query(Episode).filter(Episode.id == episode_id).first()
+    episode = await db.get(Episode, episode_id)
     if not episode:
         raise HTTPException(status_code=404, detail="Episode not found")
 
+    was_published = episode.status == EpisodeStatus.PUBLISHED
     episode.status = EpisodeStatus.DRAFT
 
-    db.commit()
-    db.refresh(episode)
+    await db.commit()
+    await db.refresh(episode)
+    if was_published:
+        get_feed_publisher().schedule()
 
     return _episode_to_response(episode)
 
 
+@router.post("/episodes/{episode_id}/assemble", response_model=EpisodeResponse)
+async def assemble_episode(episode_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Put the intro/outro clips around every rendition of the episode's
+    audio. The speech is joined by stream copy, not re-encoded. The
+    result is stored as each rendition's "assembled" file, which the feed
+    uses from then on.
+    """
+    episode = await db.get(Episode, episode_id)
+    if not episode:
+        raise HTTPException(status_code=404, detail="Episode not found")
+    if not episode.intro_audio_url and not episode.outro_audio_url:
+        raise HTTPException(status_code=400, detail="Episode has no intro or outro audio")
+    if not episode.audio_url:
+        raise HTTPException(status_code=400, detail="No audio available")
+
+    # Episodes from before encoding profiles have a single mp3-stereo file
+    renditions = json.loads(episode.renditions) if episode.renditions else {
+        "mp3-stereo": {"url": episode.audio_url, "content_type": "audio/mpeg"}
+    }
+
+    import httpx
+    try:
+        with get_scratch_space().job(f"assemble-{episode.id}", wait=False) as temp_dir:
+            audio_service = AudioService()
+            storage = StorageService()
+
+            async with httpx.AsyncClient() as client:
+                clips = {}
+                for role, url in (("intro", episode.intro_audio_url), ("outro", episode.outro_audio_url)):
+                    if url:
+                        clips[role] = await _download(client, url, temp_dir, role)
+
+                for name, entry in renditions.items():
+                    profile = get_encoding_profile(name)
+                    speech_path = await _download(client, entry["url"], temp_dir, f"speech-{name}")
+                    entry["bytes"] = os.path.getsize(speech_path)
+
+                    output_path = await asyncio.to_thread(
+                        audio_service.assemble_episode,
+                        speech_path,
+                        profile,
+                        clips.get("intro"),
+                        clips.get("outro"),
+                        os.path.join(temp_dir, f"assembled-{name}.{profile.extension}"),
+                    )
+                    url = await asyncio.to_thread(
+                        storage.upload_audio,
+                        output_path, f"episode-{episode.id}-{name}", profile.extension, profile.content_type
+                    )
+                    entry["assembled"] = {"url": url, "bytes": os.path.getsize(output_path)}
+    except ScratchSpaceFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    episode.renditions = json.dumps(renditions)
+    await db.commit()
+    await db.refresh(episode)
+    if episode.status == EpisodeStatus.PUBLISHED:
+        get_feed_publisher().schedule()
+
+    return _episode_to_response(episode)
+
+
+async def _download(client: "httpx.AsyncClient", url: str, temp_dir: str, name: str) -> str:
+    """
+    Download a file into temp_dir, keeping the URL's extension. Streamed
+    to disk, so a long speech is never held in memory.
+    """
+    extension = os.path.splitext(urlparse(url).path)[1]
+    path = os.path.join(temp_dir, f"{name}{extension}")
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        with open(path, 'wb') as f:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                f.write(chunk)
+    return path
+
+
 def _episode_to_response(episode: Episode) -> EpisodeResponse:
     """Convert Episode model to response schema."""
     return EpisodeResponse(
@@ -224,6 +421,8 @@ def _episode_to_response(episode: Episode) -> EpisodeResponse:
         audio_url=episode.audio_url,
         audio_duration=episode.audio_duration,
         thumbnail_url=episode.thumbnail_url,
+        thumbnails=json.loads(episode.thumbnails) if episode.thumbnails else None,
+        renditions=json.loads(episode.renditions) if episode.renditions else None,
         crop_start=episode.crop_start,
         crop_end=episode.crop_end,
         intro_audio_url=episode.intro_audio_url,
@@ -234,3 +433,56 @@ def _episode_to_response(episode: Episode) -> EpisodeResponse:
         updated_at=episode.updated_at.isoformat() if episode.updated_at else None,
         published_at=episode.published_at.isoformat() if episode.published_at else None,
     )
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Resolve a fields= projection to column names.
+    id and created_at are always included because the cursor needs them.
+    """
+    allowed = list(EpisodeResponse.model_fields)
+    if not fields:
+        return allowed
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    for required in ("created_at", "id"):
+        if required not in names:
+            names.append(required)
+    return names
+
+
+def _serialize_field(name: str, value: Any) -> Any:
+    """Serialize a single column the same way _episode_to_response does."""
+    if name == "status":
+        return value.value if value else None
+    if name == "use_ai_intro":
+        return value or "none"
+    if name in ("renditions", "thumbnails"):
+        return json.loads(value) if value else None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if name == "created_at":
+        return ""
+    return value
+
+
+def _encode_cursor(created_at: str, episode_id: int) -> str:
+    raw = f"{created_at}|{episode_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, episode_id = raw.rsplit("|", 1)
+        datetime.fromisoformat(created_at)
+        return created_at, int(episode_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
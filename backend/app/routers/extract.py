@@ -1,18 +1,38 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
-from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Iterator
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
-import tempfile
+import asyncio
+import contextvars
+import time
 import os
 import json
 from datetime import datetime, timezone
+from dataclasses import asdict
+from concurrent.futures import Future, ThreadPoolExecutor
 
-from app.database import get_db
-from app.models.episode import ExtractionJob, JobStatus
+from app.config import get_settings
+from app.database import get_db, AsyncSessionLocal
+from app.models.episode import ExtractionJob, JobPriority, JobStatus
 from app.services.youtube import YouTubeService
-from app.services.audio import AudioService
+from app.services.audio import AudioService, AudioProcessingResult, get_encoding_profile
 from app.services.storage import StorageService
+from app.services.thumbnail import ThumbnailService
+from app.services.events import get_job_events, TERMINAL_STATUSES
+from app.services.scratch import get_scratch_space, ScratchSpaceFull
+from app.services.downloads import get_download_cache
+from app.services.jobqueue import get_job_queue, JobClaimError, JobLease, JobLeaseLost, VideoBusy
+from app.services.scheduler import JobScheduler, get_job_scheduler
+from app.services.admission import Admission, AdmissionRejected, client_address, get_admission_control
+from app.services.metrics import (
+    JOB_SECONDS,
+    JOBS_IN_FLIGHT,
+    QUEUE_WAIT_SECONDS,
+    StageTimings,
+    wait_measured,
+)
 
 router = APIRouter(prefix="/api", tags=["extract"])
 
@@ -20,6 +40,8 @@ router = APIRouter(prefix="/api", tags=["extract"])
 class ExtractRequest(BaseModel):
     youtube_id: str
     youtube_url: str
+    # Jobs of one class are shared fairly between tenants
+    tenant: Optional[str] = None
 
 
 class ExtractResponse(BaseModel):
@@ -32,9 +54,12 @@ class JobStatusResponse(BaseModel):
     status: str
     audio_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
+    thumbnails: Optional[Dict[str, str]] = None
     duration: Optional[float] = None
     waveform_data: Optional[List[float]] = None
+    renditions: Optional[dict] = None
     detected_silence: Optional[dict] = None
+    stage_timings: Optional[dict] = None
     error_message: Optional[str] = None
 
 
@@ -47,121 +72,385 @@ class CropRequest(BaseModel):
 class CropResponse(BaseModel):
     audio_url: str
     duration: float
+    renditions: Optional[dict] = None
 
 
 def process_extraction(
     job_id: str,
     youtube_url: str,
-    db_url: str
+    db_url: str,
+    scheduled: bool = False
 ):
-    """Background task to extract and process audio."""
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
+    """
+    Background task to extract and process audio. Waits for a scheduler
+    slot unless scheduled=True (the caller holds one: the worker).
+
+    Status and results are written only while this node holds the job's
+    lease; if it expired and another node claimed the job, this run stops
+    at the next stage boundary and leaves the job to that node.
+
+    While another job holds the same video, a worker's job goes back to
+    the queue for a later claim; a local one is retried here every
+    job_retry_delay and fails after job_max_attempts tries.
+    """
+    from app import database
 
-    # Create new session for background task
+    # Create new session for background task. The app's own database shares
+    # its engines, so SQLite writes go through the process's single writer.
     if db_url.startswith("postgres://"):
         db_url = db_url.replace("postgres://", "postgresql://", 1)
 
-    engine = create_engine(db_url)
-    SessionLocal = sessionmaker(bind=engine)
-    db = SessionLocal()
-
+    if db_url == database.database_url:
+        db = database.SessionLocal()
+    else:
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        db = sessionmaker(bind=create_engine(db_url))()
+    events = get_job_events()
+    timings = StageTimings()
+    started = time.perf_counter()
+
+    JOBS_IN_FLIGHT.inc()
+    scheduler = get_job_scheduler()
+    lease = None
+    slot = None
     try:
         # Update job status
         job = db.query(ExtractionJob).filter(ExtractionJob.id == job_id).first()
         if not job:
             return
 
-        job.status = JobStatus.PROCESSING
-        db.commit()
+        # Claim the job, so no other node (or worker) runs it or its video
+        lease = _acquire(job_id, job.youtube_id, scheduled)
+
+        # Interactive jobs go first; bulk jobs may be deferred between stages.
+        # A worker's claim has already chosen between tenants.
+        priority, tenant = job.priority, None if scheduled else job.tenant
+        if not scheduled:
+            scheduler.acquire(priority, tenant)
+        slot = (priority, tenant)
+        QUEUE_WAIT_SECONDS.labels(priority.value).observe(_seconds_since(job.created_at))
 
-        # Create temp directory for processing
-        temp_dir = tempfile.mkdtemp()
+        # Held here, still pending, until there is disk for another job;
+        # the scratch directory is removed however the job ends
+        scratch = get_scratch_space()
+        with scratch.job(f"extract-{job_id}") as temp_dir:
+            lease.update(status=JobStatus.PROCESSING)
+            events.publish(job_id, JobStatus.PROCESSING.value, stage="download", progress=0.0)
 
+            storage = StorageService()
+
+            settings = get_settings()
+            # Artwork is rendered and uploaded in the background while the
+            # audio is encoded
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                # The streaming pipeline encodes the primary profile only, and
+                # only to a muxer that can write to a pipe
+                if settings.streaming_pipeline and get_encoding_profile(settings.encoding_profile).streamable:
+                    with timings.stage("thumbnail_download"):
+                        thumbnail_path = YouTubeService.download_thumbnail(youtube_url, temp_dir)
+                    thumbnails = _start_thumbnails(pool, storage, thumbnail_path, temp_dir, timings)
+                    renditions, result = _stream_extraction(
+                        youtube_url, job_id, temp_dir, storage, timings
+                    )
+                    lease.check()
+                else:
+                    # Download audio from YouTube, or take it from the download
+                    # cache, where it stays locked until it has been encoded
+                    with get_download_cache().entry(youtube_url) as download:
+                        with timings.stage("download") as span:
+                            if download.complete:
+                                span["cached"] = True
+                            audio_path, thumbnail_path = download.download(
+                                temp_dir,
+                                progress_callback=events.progress_reporter(job_id, "download")
+                            )
+                            span["bytes"] = os.path.getsize(audio_path)
+                        scratch.check(temp_dir)
+                        thumbnails = _start_thumbnails(pool, storage, thumbnail_path, temp_dir, timings)
+                        _stage_boundary(lease, scheduler, slot)
+
+                        # Process audio (normalize, trim silence). Renditions are
+                        # written to the scratch directory so they go with it.
+                        events.publish(job_id, JobStatus.PROCESSING.value, stage="encode", progress=0.0)
+                        audio_service = AudioService()
+                        primary = get_encoding_profile(audio_service.profile_names()[0])
+                        result = audio_service.process_audio(
+                            audio_path,
+                            os.path.join(temp_dir, f"episode.{primary.extension}"),
+                            normalize=True,
+                            trim_silence=True,
+                            progress_callback=events.progress_reporter(job_id, "encode"),
+                            timings=timings
+                        )
+                    scratch.check(temp_dir)
+                    _stage_boundary(lease, scheduler, slot)
+
+                    # Upload every rendition to R2
+                    events.publish(job_id, JobStatus.PROCESSING.value, stage="upload")
+                    with timings.stage("upload") as span:
+                        renditions = _upload_renditions(storage, result.renditions, job_id)
+                        span["bytes"] = sum(entry["bytes"] for entry in renditions.values())
+
+                thumbnails = thumbnails.result()
+
+        # Update job with results
+        lease.update(
+            status=JobStatus.COMPLETED,
+            audio_url=next(iter(renditions.values()))["url"],
+            renditions=json.dumps(renditions),
+            thumbnail_url=thumbnails.get("artwork", ""),
+            thumbnails=json.dumps(thumbnails) if thumbnails else None,
+            duration=result.duration,
+            waveform_data=json.dumps(result.waveform),
+            detected_start_silence=result.silence_start,
+            detected_end_silence=result.silence_end,
+            detected_segments=json.dumps([asdict(segment) for segment in result.segments]),
+            stage_timings=json.dumps(timings.to_dict()),
+            completed_at=datetime.now(timezone.utc),
+        )
+        events.publish(job_id, JobStatus.COMPLETED.value)
+        JOB_SECONDS.labels(JobStatus.COMPLETED.value).observe(time.perf_counter() - started)
+
+    except JobLeaseLost as e:
+        # The node that claimed the job runs it; its result is the one kept
+        print(f"Stopped job {job_id}: {e}")
+    except VideoBusy as e:
+        if scheduled:
+            # Back in the queue until the other job is done with the video
+            events.publish(job_id, JobStatus.PENDING.value, stage="waiting", detail=str(e))
+        else:
+            message = f"{e} (gave up after {get_settings().job_max_attempts} tries)"
+            if get_job_queue().fail_unclaimed(job_id, message):
+                events.publish(job_id, JobStatus.FAILED.value, error_message=message)
+                JOB_SECONDS.labels(JobStatus.FAILED.value).observe(time.perf_counter() - started)
+    except JobClaimError as e:
+        # Running on another node, which reports its progress
+        print(f"Not running job {job_id}: {e}")
+    except Exception as e:
+        failed = {
+            "status": JobStatus.FAILED,
+            "error_message": str(e),
+            "stage_timings": json.dumps(timings.to_dict()),
+        }
         try:
-            # Download audio from YouTube
-            audio_path, thumbnail_path = YouTubeService.download_audio(
-                youtube_url, temp_dir
-            )
+            if lease is not None:
+                lease.update(**failed)
+            else:
+                for name, value in failed.items():
+                    setattr(job, name, value)
+                db.commit()
+        except JobLeaseLost as lost:
+            print(f"Job {job_id} failed after it was taken over, not recording it: {lost}")
+        else:
+            events.publish(job_id, JobStatus.FAILED.value, error_message=str(e))
+            JOB_SECONDS.labels(JobStatus.FAILED.value).observe(time.perf_counter() - started)
+    finally:
+        JOBS_IN_FLIGHT.dec()
+        if slot is not None and not scheduled:
+            scheduler.finish(*slot)
+        if lease is not None:
+            lease.release()
+        db.close()
 
-            # Process audio (normalize, trim silence)
-            audio_service = AudioService()
-            result = audio_service.process_audio(
-                audio_path,
-                normalize=True,
-                trim_silence=True
+
+def _acquire(job_id: str, youtube_id: Optional[str], scheduled: bool) -> JobLease:
+    """
+    Claim the job. Run locally, there is no worker to claim it later, so
+    while another job holds its video it is retried here (raising
+    VideoBusy once job_max_attempts tries have failed).
+    """
+    settings = get_settings()
+    queue = get_job_queue()
+    if scheduled:
+        return queue.acquire(job_id, youtube_id)
+
+    for attempt in range(1, settings.job_max_attempts + 1):
+        try:
+            return queue.acquire(job_id, youtube_id, retry_in=0)
+        except VideoBusy as e:
+            if attempt == settings.job_max_attempts:
+                raise
+            get_job_events().publish(
+                job_id, JobStatus.PENDING.value, stage="waiting", detail=str(e)
             )
+            time.sleep(settings.job_retry_delay)
 
-            # Upload to R2
-            storage = StorageService()
-            audio_url = storage.upload_audio(result.output_path, job_id)
-
-            thumbnail_url = ""
-            if os.path.exists(thumbnail_path):
-                thumbnail_url = storage.upload_thumbnail(thumbnail_path, job_id)
-
-            # Update job with results
-            job.status = JobStatus.COMPLETED
-            job.audio_url = audio_url
-            job.thumbnail_url = thumbnail_url
-            job.duration = result.duration
-            job.waveform_data = json.dumps(result.waveform)
-            job.detected_start_silence = result.silence_start
-            job.detected_end_silence = result.silence_end
-            job.completed_at = datetime.now(timezone.utc)
-            db.commit()
 
+def _stage_boundary(lease: JobLease, scheduler: JobScheduler, slot: tuple) -> None:
+    """
+    Between stages: stop if another node has taken the job over, and give
+    way to interactive jobs (after which the lease is checked again).
+    """
+    lease.check()
+    if scheduler.checkpoint(*slot):
+        lease.check()
+
+
+def _stream_extraction(
+    youtube_url: str,
+    job_id: str,
+    temp_dir: str,
+    storage: StorageService,
+    timings: StageTimings
+) -> tuple[Dict[str, dict], AudioProcessingResult]:
+    """
+    Pipelined download -> encode -> upload.
+    yt-dlp's stdout feeds FFmpeg directly and encoded chunks go straight
+    into a multipart upload, so the stages overlap instead of running
+    one after another.
+    """
+    log_path = os.path.join(temp_dir, "yt-dlp.log")
+    analysis_path = os.path.join(temp_dir, "analysis.wav")
+    audio_service = AudioService()
+    profile = get_encoding_profile(audio_service.settings.encoding_profile)
+
+    # Download and encode overlap here, so only the stage is reported
+    get_job_events().publish(job_id, JobStatus.PROCESSING.value, stage="stream")
+    # Download, encode and upload overlap, so they share one "stream" stage
+    with timings.stage("stream") as span:
+        source = YouTubeService.open_audio_stream(youtube_url, log_path)
+        try:
+            chunks = audio_service.encode_stream(source.stdout, analysis_path, profile=profile)
+            audio_url = storage.upload_audio_stream(
+                _count_bytes(chunks, span), job_id, profile.extension, profile.content_type
+            )
         finally:
-            # Cleanup temp files
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            source.stdout.close()
+            wait_measured(source, 'yt-dlp')
+        # A truncated download still encodes cleanly, so check yt-dlp explicitly
+        YouTubeService.wait_audio_stream(source, log_path)
+
+    result = audio_service.analyze_encoded(analysis_path, timings)
+    renditions = {
+        profile.name: {"url": audio_url, "content_type": profile.content_type, "bytes": span["bytes"]}
+    }
+    return renditions, result
+
+
+def _start_thumbnails(
+    pool: ThreadPoolExecutor,
+    storage: StorageService,
+    thumbnail_path: str,
+    temp_dir: str,
+    timings: StageTimings
+) -> "Future[Dict[str, str]]":
+    """
+    Publish the thumbnail's variants on the pool. The future gives
+    {variant: url}, empty if there is no thumbnail or it failed: artwork
+    is not worth failing the job for.
+    """
+    def publish() -> Dict[str, str]:
+        if not thumbnail_path:
+            return {}
+        try:
+            with timings.stage("thumbnail"):
+                return ThumbnailService(storage).publish(thumbnail_path, temp_dir)
+        except Exception as e:
+            print(f"Thumbnail processing failed: {e}")
+            return {}
 
-    except Exception as e:
-        job.status = JobStatus.FAILED
-        job.error_message = str(e)
-        db.commit()
-    finally:
-        db.close()
+    # Copy the context so FFmpeg usage is attributed to the thumbnail stage
+    return pool.submit(contextvars.copy_context().run, publish)
+
+
+def _upload_renditions(
+    storage: StorageService,
+    paths: Dict[str, str],
+    job_id: str,
+    version: Optional[int] = None
+) -> Dict[str, dict]:
+    """
+    Upload rendition files ({profile: path}, primary first). The primary
+    keeps the plain job key, the others get the profile name appended.
+    version uploads them as cropped versions instead.
+    Returns {profile: {url, content_type, bytes}}.
+    """
+    renditions = {}
+    for index, (name, path) in enumerate(paths.items()):
+        profile = get_encoding_profile(name)
+        key = job_id if index == 0 else f"{job_id}-{name}"
+        if version is None:
+            url = storage.upload_audio(path, key, profile.extension, profile.content_type)
+        else:
+            url = storage.upload_cropped_audio(
+                path, key, version, profile.extension, profile.content_type
+            )
+        renditions[name] = {
+            "url": url,
+            "content_type": profile.content_type,
+            "bytes": os.path.getsize(path),
+        }
+    return renditions
 
 
 @router.post("/extract", response_model=ExtractResponse)
 async def start_extraction(
     request: ExtractRequest,
+    http_request: Request,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Start audio extraction job for a YouTube video.
-    Returns job ID for polling status.
+    Returns job ID for polling status, or 429 when the client or the
+    server is over its limits.
     """
-    from app.config import get_settings
     settings = get_settings()
 
-    # Create job record
-    job_id = str(uuid.uuid4())
-    job = ExtractionJob(
-        id=job_id,
-        youtube_id=request.youtube_id,
-        status=JobStatus.PENDING
-    )
-    db.add(job)
-    db.commit()
-
-    # Start background processing
-    background_tasks.add_task(
-        process_extraction,
-        job_id,
-        request.youtube_url,
-        settings.database_url
-    )
+    try:
+        admission = await get_admission_control().admit("extract", client_address(http_request))
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
+
+    try:
+        # Create job record
+        job_id = str(uuid.uuid4())
+        job = ExtractionJob(
+            id=job_id,
+            youtube_id=request.youtube_id,
+            youtube_url=request.youtube_url,
+            status=JobStatus.PENDING,
+            priority=JobPriority.INTERACTIVE,
+            tenant=request.tenant
+        )
+        db.add(job)
+        await db.commit()
+    except BaseException:
+        admission.release()
+        raise
+    get_job_events().publish(job_id, JobStatus.PENDING.value)
+
+    # Start background processing, unless workers (python -m app.worker)
+    # claim jobs from the database. A job run here stays admitted until it ends.
+    if settings.extraction_runner == "local":
+        background_tasks.add_task(
+            _process_admitted,
+            admission,
+            job_id,
+            request.youtube_url,
+            settings.database_url
+        )
+    else:
+        admission.release()
 
     return ExtractResponse(job_id=job_id, status="processing")
 
 
+def _process_admitted(admission: Admission, job_id: str, youtube_url: str, db_url: str):
+    """process_extraction, then give back the request's admission."""
+    try:
+        process_extraction(job_id, youtube_url, db_url)
+    finally:
+        admission.release()
+
+
 @router.get("/extract/{job_id}", response_model=JobStatusResponse)
-async def get_extraction_status(job_id: str, db: Session = Depends(get_db)):
+async def get_extraction_status(job_id: str, db: AsyncSession = Depends(get_db)):
     """Get status of an extraction job."""
-    job = db.query(ExtractionJob).filter(ExtractionJob.id == job_id).first()
+    job = await db.get(ExtractionJob, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -177,65 +466,173 @@ async def get_extraction_status(job_id: str, db: Session = Depends(get_db)):
         status=job.status.value,
         audio_url=job.audio_url,
         thumbnail_url=job.thumbnail_url,
+        thumbnails=json.loads(job.thumbnails) if job.thumbnails else None,
         duration=job.duration,
         waveform_data=waveform,
+        renditions=json.loads(job.renditions) if job.renditions else None,
         detected_silence={
             "start_trim": job.detected_start_silence,
-            "end_trim": job.detected_end_silence
-        } if job.detected_start_silence or job.detected_end_silence else None,
+            "end_trim": job.detected_end_silence,
+            "segments": json.loads(job.detected_segments) if job.detected_segments else [],
+        } if job.detected_start_silence or job.detected_end_silence or job.detected_segments else None,
+        stage_timings=json.loads(job.stage_timings) if job.stage_timings else None,
         error_message=job.error_message
     )
 
 
+def _seconds_since(moment: Optional[datetime]) -> float:
+    if moment is None:
+        return 0.0
+    if moment.tzinfo is None:  # SQLite keeps UTC without an offset
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((datetime.now(timezone.utc) - moment).total_seconds(), 0.0)
+
+
+def _count_bytes(chunks: Iterator[bytes], span: dict) -> Iterator[bytes]:
+    """Pass chunks through, adding their size to a timing span."""
+    span["bytes"] = 0
+    for chunk in chunks:
+        span["bytes"] += len(chunk)
+        yield chunk
+
+
+# Seconds between keep-alive comments on an idle event stream
+EVENT_KEEPALIVE_INTERVAL = 15
+
+
+@router.get("/extract/{job_id}/events")
+async def stream_extraction_events(job_id: str):
+    """
+    Server-Sent Events stream of a job's status and progress.
+    Sends the current state first, then every transition and progress
+    update until the job completes or fails. Fetch GET /extract/{job_id}
+    once afterwards for the full result (waveform etc.).
+    """
+    events = get_job_events()
+    # Subscribe before taking the snapshot so no transition is missed
+    queue = events.subscribe(job_id)
+
+    # Not a get_db session, which would hold a connection until the stream ends
+    snapshot = events.latest(job_id) or await _load_job_event(job_id)
+    if snapshot is None:
+        events.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def stream():
+        event = snapshot
+        try:
+            while True:
+                if event is not None:
+                    yield f"data: {json.dumps(event)}\n\n"
+                    if event["status"] in TERMINAL_STATUSES:
+                        return
+
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=EVENT_KEEPALIVE_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    event = None
+                    yield ": keep-alive\n\n"
+                    # The job may be running in another process, in which
+                    # case nothing is published here: fall back to the DB
+                    if events.latest(job_id) is None:
+                        event = await _load_job_event(job_id)
+        finally:
+            events.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx)
+        }
+    )
+
+
+def _job_event(job: ExtractionJob) -> dict:
+    """Build an event from a job row, for watchers with no published state."""
+    event = {"status": job.status.value}
+    if job.error_message:
+        event["error_message"] = job.error_message
+    return event
+
+
+async def _load_job_event(job_id: str) -> Optional[dict]:
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ExtractionJob, job_id)
+        return _job_event(job) if job else None
+
+
 @router.post("/crop", response_model=CropResponse)
-async def crop_audio(request: CropRequest, db: Session = Depends(get_db)):
+async def crop_audio(request: CropRequest, db: AsyncSession = Depends(get_db)):
     """
     Crop audio to specified start and end times.
     Creates a new audio file with the cropped content.
     """
-    job = db.query(ExtractionJob).filter(ExtractionJob.id == request.job_id).first()
+    job = await db.get(ExtractionJob, request.job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
     if not job.audio_url:
         raise HTTPException(status_code=400, detail="No audio available")
 
+    # Jobs from before encoding profiles have a single mp3-stereo file
+    sources = {"mp3-stereo": job.audio_url}
+    if job.renditions:
+        sources = {name: entry["url"] for name, entry in json.loads(job.renditions).items()}
+
     # Download the current audio
     import httpx
-    temp_dir = tempfile.mkdtemp()
-
     try:
-        input_path = os.path.join(temp_dir, "input.mp3")
-        output_path = os.path.join(temp_dir, "output.mp3")
-
-        # Download audio from storage
-        async with httpx.AsyncClient() as client:
-            response = await client.get(job.audio_url)
-            with open(input_path, 'wb') as f:
-                f.write(response.content)
-
-        # Crop audio
-        audio_service = AudioService()
-        audio_service.crop_audio(
-            input_path,
-            request.start_time,
-            request.end_time,
-            output_path
-        )
-
-        # Upload cropped version
-        storage = StorageService()
-        new_audio_url = storage.upload_cropped_audio(
-            output_path,
-            request.job_id,
-            version=2  # Could increment based on existing versions
-        )
-
-        # Calculate new duration
-        new_duration = request.end_time - request.start_time
+        # Interactive: refuse rather than wait when disk is low
+        with get_scratch_space().job(f"crop-{request.job_id}", wait=False) as temp_dir:
+            audio_service = AudioService()
+            cropped = {}
+
+            async with httpx.AsyncClient() as client:
+                for name, url in sources.items():
+                    profile = get_encoding_profile(name)
+                    input_path = os.path.join(temp_dir, f"input-{name}.{profile.extension}")
+                    output_path = os.path.join(temp_dir, f"output-{name}.{profile.extension}")
+
+                    # Download audio from storage, streamed to disk
+                    async with client.stream("GET", url) as response:
+                        response.raise_for_status()
+                        with open(input_path, 'wb') as f:
+                            async for chunk in response.aiter_bytes(1024 * 1024):
+                                f.write(chunk)
+
+                    # Crop audio, keeping each rendition's encoding; FFmpeg
+                    # runs off the event loop
+                    await asyncio.to_thread(
+                        audio_service.crop_audio,
+                        input_path,
+                        request.start_time,
+                        request.end_time,
+                        output_path,
+                        profile=profile
+                    )
+                    cropped[name] = output_path
+
+            # Upload cropped versions
+            storage = StorageService()
+            renditions = await asyncio.to_thread(
+                _upload_renditions,
+                storage,
+                cropped,
+                request.job_id,
+                version=2  # Could increment based on existing versions
+            )
+    except ScratchSpaceFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-        return CropResponse(audio_url=new_audio_url, duration=new_duration)
+    # Calculate new duration
+    new_duration = request.end_time - request.start_time
 
-    finally:
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    return CropResponse(
+        audio_url=next(iter(renditions.values()))["url"],
+        duration=new_duration,
+        renditions=renditions
+    )
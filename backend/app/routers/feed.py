@@ -1,64 +1,118 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import Response
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import RedirectResponse, Response
+from sqlalchemy import func, select
+from typing import TYPE_CHECKING
+import asyncio
 
+from app.config import get_settings
 from app.database import get_db
 from app.models.episode import Episode, EpisodeStatus
-from app.services.feed import FeedService
+from app.services.feed import FEED_CACHE_CONTROL, FeedService, SUB_FEEDS, published_episodes
+
+if TYPE_CHECKING:
+    # Only for annotations: the async engine is created on the first request
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(tags=["feed"])
 
 
 @router.get("/api/feed.xml")
 @router.get("/feed.xml")
-async def get_podcast_feed(db: Session = Depends(get_db)):
+async def get_podcast_feed(db: "AsyncSession" = Depends(get_db)):
     """
     Get the RSS podcast feed.
-    This endpoint is publicly accessible for podcast apps.
+    This endpoint is publicly accessible for podcast apps. With a static
+    feed it redirects them to the copy in R2.
     """
+    feed_service = FeedService()
+    if get_settings().static_feed:
+        # Temporary, so subscribers keep this address and STATIC_FEED can
+        # be turned off again
+        return RedirectResponse(feed_service.feed_url, status_code=302)
+
     # Get all published episodes
-    episodes = (
-        db.query(Episode)
-        .filter(Episode.status == EpisodeStatus.PUBLISHED)
-        .order_by(Episode.published_at.desc())
-        .all()
-    )
+    episodes = (await db.scalars(published_episodes())).all()
 
-    # Generate RSS feed
-    feed_service = FeedService()
-    feed_xml = feed_service.generate_feed(episodes)
+    # Generate RSS feed, off the event loop: it's CPU bound for large feeds
+    feed_xml = await asyncio.to_thread(feed_service.generate_feed, episodes)
 
     return Response(
         content=feed_xml,
         media_type="application/rss+xml",
         headers={
-            "Cache-Control": "public, max-age=300",  # Cache for 5 minutes
+            "Cache-Control": FEED_CACHE_CONTROL,  # Cache for 5 minutes
         }
     )
 
 
+@router.get("/api/feed/speaker/{slug}.xml")
+@router.get("/feed/speaker/{slug}.xml")
+async def get_speaker_feed(slug: str, db: "AsyncSession" = Depends(get_db)):
+    """RSS feed of one speaker's episodes, by the speaker's slug."""
+    return await _sub_feed(db, "speaker", slug)
+
+
+@router.get("/api/feed/topic/{slug}.xml")
+@router.get("/feed/topic/{slug}.xml")
+async def get_topic_feed(slug: str, db: "AsyncSession" = Depends(get_db)):
+    """RSS feed of one topic's episodes, by the topic's slug."""
+    return await _sub_feed(db, "topic", slug)
+
+
+async def _sub_feed(db: "AsyncSession", kind: str, slug: str):
+    feed_service = FeedService()
+    if get_settings().static_feed:
+        return RedirectResponse(feed_service.sub_feed_url(kind, slug), status_code=302)
+
+    episodes = (await db.scalars(published_episodes(kind, slug))).all()
+    if not episodes:
+        raise HTTPException(status_code=404, detail=f"No published episodes for {kind} {slug}")
+
+    # Items come from the cache the main feed fills, so sub-feeds are cheap
+    feed_xml = await asyncio.to_thread(
+        feed_service.generate_feed,
+        episodes,
+        feed_service.sub_feed_title(kind, episodes[0]),
+        feed_service.sub_feed_url(kind, slug),
+    )
+    return Response(
+        content=feed_xml,
+        media_type="application/rss+xml",
+        headers={"Cache-Control": FEED_CACHE_CONTROL},
+    )
+
+
 @router.get("/api/feed/info")
-async def get_feed_info(db: Session = Depends(get_db)):
-    """Get information about the podcast feed."""
-    from app.config import get_settings
+async def get_feed_info(db: "AsyncSession" = Depends(get_db)):
+    """Get information about the podcast feed and its speaker and topic feeds."""
     settings = get_settings()
+    feed_service = FeedService()
 
-    published_count = (
-        db.query(Episode)
-        .filter(Episode.status == EpisodeStatus.PUBLISHED)
-        .count()
-    )
+    counts = dict((await db.execute(
+        select(Episode.status, func.count(Episode.id))
+        .group_by(Episode.status)
+    )).all())
 
-    draft_count = (
-        db.query(Episode)
-        .filter(Episode.status == EpisodeStatus.DRAFT)
-        .count()
-    )
+    sub_feeds = {}
+    for kind in SUB_FEEDS:
+        name, slug = getattr(Episode, kind), getattr(Episode, f"{kind}_slug")
+        rows = (await db.execute(
+            select(slug, func.min(name), func.count(Episode.id))
+            .where(Episode.status == EpisodeStatus.PUBLISHED, slug.isnot(None))
+            .group_by(slug)
+            .order_by(slug)
+        )).all()
+        sub_feeds[kind] = [
+            {"name": display, "feed_url": feed_service.sub_feed_url(kind, value), "episodes": count}
+            for value, display, count in rows
+        ]
 
     return {
         "title": settings.podcast_title,
         "description": settings.podcast_description,
-        "feed_url": f"{settings.podcast_base_url}/api/feed.xml",
-        "published_episodes": published_count,
-        "draft_episodes": draft_count,
+        "feed_url": feed_service.feed_url,
+        "published_episodes": counts.get(EpisodeStatus.PUBLISHED, 0),
+        "draft_episodes": counts.get(EpisodeStatus.DRAFT, 0),
+        "speaker_feeds": sub_feeds["speaker"],
+        "topic_feeds": sub_feeds["topic"],
     }
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.episode import ExtractionJob, JobStatus
+from app.services.metrics import QUEUE_DEPTH
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+async def metrics(db: AsyncSession = Depends(get_db)):
+    """Prometheus metrics for the extraction pipeline."""
+    # The queue is shared by every process, so its depth comes from the
+    # database rather than from whichever process accepted or ran a job
+    QUEUE_DEPTH.set(await db.scalar(
+        select(func.count()).select_from(ExtractionJob)
+        .where(ExtractionJob.status == JobStatus.PENDING)
+    ))
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
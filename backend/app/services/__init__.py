@@ -1,8 +1,14 @@
-from app.services.youtube import YouTubeService
-from app.services.ai import AIService
-from app.services.audio import AudioService
-from app.services.storage import StorageService
-from app.services.feed import FeedService
+from importlib import import_module
+
+# Imported on first access, so importing one service (or the package) does
+# not load every other service's dependencies
+_SERVICES = {
+    "YouTubeService": "app.services.youtube",
+    "AIService": "app.services.ai",
+    "AudioService": "app.services.audio",
+    "StorageService": "app.services.storage",
+    "FeedService": "app.services.feed",
+}
 
 __all__ = [
     "YouTubeService",
@@ -11,3 +17,9 @@ __all__ = [
     "StorageService",
     "FeedService"
 ]
+
+
+def __getattr__(name: str):
+    if name in _SERVICES:
+        return getattr(import_module(_SERVICES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
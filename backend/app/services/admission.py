@@ -0,0 +1,162 @@
+import asyncio
+import math
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+
+from app.config import get_settings
+from app.services.metrics import ADMISSION_IN_FLIGHT, ADMISSION_REJECTED
+from app.services.ratelimit import ClientRateLimiter, DatabaseRateLimiter, get_client_rate_limiter
+
+# Bounds on the Retry-After sent with a refusal (seconds)
+RETRY_AFTER_MIN = 1
+RETRY_AFTER_MAX = 60
+# Weight of each finished request in the running mean of time held
+HOLD_SMOOTHING = 0.2
+
+
+class AdmissionRejected(RuntimeError):
+    """A request turned away: its client is over the rate limit, or this node is full."""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason  # "rate_limited" or "overloaded"
+        self.retry_after = max(RETRY_AFTER_MIN, min(math.ceil(retry_after), RETRY_AFTER_MAX))
+        if reason == "rate_limited":
+            message = "Too many requests from this client"
+        else:
+            message = "Server is busy"
+        super().__init__(f"{message}; retry in {self.retry_after}s")
+
+
+class Admission:
+    """A request's place among those in flight. release() once its work is done."""
+
+    def __init__(self, control: "AdmissionControl"):
+        self.control = control
+        self.started = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.control._leave(time.monotonic() - self.started)
+
+
+class AdmissionControl:
+    """
+    Admission for requests that start heavy work (yt-dlp, Claude, FFmpeg):
+    /api/analyze, and /api/extract, whose job counts until it ends when it
+    runs in this process.
+
+    A node takes at most admission_max_in_flight of them at once, and each
+    client address at most client_rate_per_minute a minute per endpoint,
+    in bursts of up to client_rate_burst. Anything more is refused at once
+    (429 with Retry-After) instead of queueing behind work the node cannot
+    get to; /ready reports the node saturated meanwhile, so the load
+    balancer sends new requests elsewhere.
+
+    The in-flight count is per process. The rate limit buckets are too,
+    unless rate_limit_backend is "database".
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        limiter: Optional[ClientRateLimiter] = None
+    ):
+        settings = get_settings()
+        self.max_in_flight = settings.admission_max_in_flight if max_in_flight is None else max_in_flight
+        self.limiter = limiter or get_client_rate_limiter()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._mean_hold = 0.0  # seconds an admitted request holds its place
+
+    async def admit(self, endpoint: str, client: str) -> Admission:
+        """
+        Admit a request from `client` to `endpoint`, or raise
+        AdmissionRejected. Release the Admission when its work is done.
+        """
+        with self._lock:
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                rejected = AdmissionRejected("overloaded", self._retry_after())
+            else:
+                rejected = None
+                self._in_flight += 1
+                ADMISSION_IN_FLIGHT.set(self._in_flight)
+        if rejected is not None:
+            ADMISSION_REJECTED.labels(endpoint, rejected.reason).inc()
+            raise rejected
+
+        admission = Admission(self)
+        key = f"{endpoint}:{client}"
+        try:
+            if isinstance(self.limiter, DatabaseRateLimiter):
+                wait = await asyncio.to_thread(self.limiter.take, key)
+            else:
+                wait = self.limiter.take(key)
+        except BaseException:
+            self._leave(None)
+            raise
+        if wait:
+            # Refused before any work: not a sample of time held
+            self._leave(None)
+            ADMISSION_REJECTED.labels(endpoint, "rate_limited").inc()
+            raise AdmissionRejected("rate_limited", wait)
+        return admission
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def saturated(self) -> bool:
+        return bool(self.max_in_flight) and self._in_flight >= self.max_in_flight
+
+    def status(self) -> Dict[str, object]:
+        """In-flight load, for the readiness check."""
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "status": "saturated" if self.saturated else "ready",
+            "in_flight": in_flight,
+            "max_in_flight": self.max_in_flight,
+            "saturation": round(in_flight / self.max_in_flight, 2) if self.max_in_flight else 0.0,
+        }
+
+    def _leave(self, seconds: Optional[float]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            ADMISSION_IN_FLIGHT.set(self._in_flight)
+            if seconds is not None:
+                if self._mean_hold:
+                    self._mean_hold += HOLD_SMOOTHING * (seconds - self._mean_hold)
+                else:
+                    self._mean_hold = seconds
+
+    def _retry_after(self) -> float:
+        """
+        Rough wait for a free place: with requests finishing at an even
+        pace, one does every mean hold time / in flight. Call holding the lock.
+        """
+        return self._mean_hold / max(self._in_flight, 1)
+
+
+def client_address(request) -> str:
+    """
+    The client's address for rate limits: the peer address, or with
+    trusted_proxy_hops proxies in front, the X-Forwarded-For entry the
+    outermost of them appended.
+    """
+    hops = get_settings().trusted_proxy_hops
+    forwarded = request.headers.get("x-forwarded-for") if hops > 0 else None
+    if forwarded:
+        addresses = [address.strip() for address in forwarded.split(",") if address.strip()]
+        if addresses:
+            return addresses[max(len(addresses) - hops, 0)]
+    return request.client.host if request.client else "unknown"
+
+
+@lru_cache()
+def get_admission_control() -> AdmissionControl:
+    return AdmissionControl()
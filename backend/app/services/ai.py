@@ -1,4 +1,3 @@
-import anthropic
 from dataclasses import dataclass
 from typing import Optional
 import json
@@ -21,6 +20,8 @@ class AIService:
     """Service for AI-powered metadata generation using Claude."""
 
     def __init__(self):
+        import anthropic
+
         settings = get_settings()
         self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
 
@@ -2,16 +2,130 @@ import subprocess
 import tempfile
 import os
 import json
-from typing import Optional, List
-from dataclasses import dataclass
+import hashlib
+import contextvars
+from typing import Optional, List, Dict, BinaryIO, Callable, Iterator
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from app.config import get_settings
+from app.services.metrics import StageTimings, run_measured, wait_measured
 
 # FFmpeg binary paths - use system PATH
 import shutil
 FFMPEG = shutil.which('ffmpeg') or 'ffmpeg'
 FFPROBE = shutil.which('ffprobe') or 'ffprobe'
 
+# MPEG-1 Layer III framing, used to cut segments on frame boundaries
+MP3_FRAME_SAMPLES = 1152
+MP3_SAMPLE_RATES = (44100, 48000, 32000)
+MP3_BITRATES_KBPS = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+
+# libmp3lame's encoder delay and the MP3 decoder delay, in samples
+LAME_ENCODER_DELAY = 576
+MP3_DECODER_DELAY = 529
+# Pre-roll so that delay + pre-roll is a whole number of frames to drop
+SEGMENT_PREROLL_FRAMES = 2
+SEGMENT_PREROLL = (SEGMENT_PREROLL_FRAMES * MP3_FRAME_SAMPLES
+                   - LAME_ENCODER_DELAY - MP3_DECODER_DELAY)
+SEGMENT_POSTROLL = 2 * MP3_FRAME_SAMPLES
+
+# Xing/Info header frame: the tag follows the side info (17 bytes for mono,
+# 32 otherwise), then flags, frame count, byte count, a 100-entry seek table
+# and a quality value. The LAME tag after it holds the encoder delay and
+# padding, the music length and two CRC-16/ARC checksums.
+XING_FLAGS_ALL = 0x0F
+XING_TOC_SIZE = 100
+LAME_TAG_OFFSET = 120  # from the Xing tag
+LAME_DELAY_OFFSET = 21  # from the LAME tag, and so on
+LAME_MUSIC_LENGTH_OFFSET = 28
+LAME_MUSIC_CRC_OFFSET = 32
+LAME_TAG_CRC_OFFSET = 34
+CRC16_POLY = 0xA001
+
+# Silence detection and the waveform share one low-rate mono decode,
+# reduced to the mean power of each 50 ms frame
+ANALYSIS_SAMPLE_RATE = 8000
+ANALYSIS_FRAME_SAMPLES = 400
+ANALYSIS_FRAME_SECONDS = ANALYSIS_FRAME_SAMPLES / ANALYSIS_SAMPLE_RATE
+
+# Adaptive threshold: a fraction of the way from the noise floor (10th
+# percentile frame) to the speech level (90th), and at least 20 dB below speech
+SILENCE_FLOOR_PERCENTILE = 10
+SPEECH_LEVEL_PERCENTILE = 90
+SILENCE_THRESHOLD_RATIO = 0.3
+SILENCE_MIN_MARGIN_DB = 6.0
+SILENCE_MIN_DEPTH_DB = 20.0
+DIGITAL_SILENCE_DB = -70.0
+
+# Applause: loud but without the syllable-rate level swings of speech
+APPLAUSE_WINDOW_FRAMES = 20
+APPLAUSE_MAX_LEVEL_STD_DB = 3.0
+APPLAUSE_MIN_DURATION = 3.0
+# Segments closer than this (half an applause window) chain into one edge
+EDGE_GAP_SECONDS = APPLAUSE_WINDOW_FRAMES * ANALYSIS_FRAME_SECONDS / 2
+
+# Interior gap edits: each join is an equal-power crossfade of this length,
+# centred on the cut so the edited length is the sum of the kept ranges
+GAP_CROSSFADE_SECONDS = 0.02
+# loudnorm upsamples to 192 kHz; from 48 kHz that is an integer ratio and
+# much cheaper than from 44.1 kHz
+EDIT_SAMPLE_RATE = 48000
+
+# A source counts as stereo when its side (L-R) channel carries at least
+# this much power relative to mid (L+R); below it the channels are copies
+STEREO_MIN_SIDE_DB = -20.0
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    """Codec, rate control and container for one rendition of an episode."""
+    name: str
+    codec: str
+    extension: str
+    content_type: str
+    muxer: str
+    bitrate: Optional[str] = None  # None without quality: settings.audio_bitrate
+    quality: Optional[str] = None  # VBR quality (-q:a), used instead of bitrate
+    channels: Optional[int] = None  # None: mono unless the source is stereo
+    sample_rate: Optional[int] = None  # None: settings.audio_sample_rate
+    options: tuple = ()
+    streamable: bool = True  # The muxer can write to a pipe
+
+
+ENCODING_PROFILES: Dict[str, EncodingProfile] = {profile.name: profile for profile in (
+    # The original output: CBR stereo MP3 at settings.audio_bitrate
+    EncodingProfile("mp3-stereo", "libmp3lame", "mp3", "audio/mpeg", "mp3", channels=2),
+    # LAME V7, about 64 kbps for mono speech
+    EncodingProfile("speech-mp3", "libmp3lame", "mp3", "audio/mpeg", "mp3", quality="7"),
+    EncodingProfile(
+        "speech-aac", "aac", "m4a", "audio/mp4", "ipod", bitrate="64k",
+        options=("-movflags", "+faststart"), streamable=False,
+    ),
+    EncodingProfile(
+        "speech-opus", "libopus", "opus", "audio/ogg", "ogg", bitrate="32k",
+        sample_rate=48000,
+    ),
+)}
+
+
+def get_encoding_profile(name: str) -> EncodingProfile:
+    """Look up a profile by name, raising ValueError for unknown names."""
+    try:
+        return ENCODING_PROFILES[name.strip()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown encoding profile '{name}' "
+            f"(expected one of: {', '.join(ENCODING_PROFILES)})"
+        )
+
+
+@dataclass
+class SilenceSegment:
+    start: float
+    end: float
+    kind: str = "silence"  # silence or applause
+
 
 @dataclass
 class AudioProcessingResult:
@@ -20,6 +134,9 @@ class AudioProcessingResult:
     waveform: List[float]
     silence_start: float
     silence_end: float
+    segments: List[SilenceSegment] = field(default_factory=list)
+    # Profile name -> file, the primary profile (output_path) first
+    renditions: Dict[str, str] = field(default_factory=dict)
 
 
 class AudioService:
@@ -34,61 +151,508 @@ class AudioService:
         output_path: Optional[str] = None,
         normalize: bool = True,
         trim_silence: bool = True,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        timings: Optional[StageTimings] = None,
+        compress_gaps: Optional[bool] = None,
+        profiles: Optional[List[str]] = None,
     ) -> AudioProcessingResult:
         """
         Process audio file: normalize loudness and optionally trim silence.
+        compress_gaps shortens long interior silence and applause
+        (default: settings.compress_gaps).
+        profiles names the encoding profiles to produce, primary first
+        (default: encoding_profile plus encoding_renditions); all of them
+        come out of a single FFmpeg run. Extra renditions are written next
+        to output_path.
+        progress_callback, if given, receives the encoded fraction (0-1).
+        timings, if given, records the analyze, encode and waveform stages.
         Returns processed audio path and metadata.
         """
+        import numpy as np
+
+        selected = [get_encoding_profile(name) for name in (profiles or self.profile_names())]
+        primary = selected[0]
         if output_path is None:
-            fd, output_path = tempfile.mkstemp(suffix='.mp3')
+            fd, output_path = tempfile.mkstemp(suffix=f'.{primary.extension}')
             os.close(fd)
+        renditions = {primary.name: output_path}
+        stem = os.path.splitext(output_path)[0]
+        for profile in selected[1:]:
+            renditions[profile.name] = f'{stem}.{profile.name}.{profile.extension}'
+        timings = timings or StageTimings()
 
-        # Get initial duration and detect silence
+        # One low-rate decode feeds silence detection, the waveform and the
+        # mono/stereo decision
         duration = self._get_duration(input_path)
-        silence_start, silence_end = 0.0, 0.0
+        with timings.stage("analyze"):
+            frames = self._frame_power(input_path, stereo=True)
+            power = frames[:, 0]
+            channels = 2 if self._is_stereo(frames) else 1
+            segments, speech_db = self._detect_silence(power)
 
+        silence_start, silence_end = 0.0, 0.0
         if trim_silence:
-            silence_start, silence_end = self._detect_silence(input_path, duration)
+            silence_start, silence_end = self._edge_silence(segments, duration)
 
-        # Build FFmpeg filter chain
-        filters = []
+        # Trim the ends and shorten long interior gaps in one filtergraph
+        if compress_gaps is None:
+            compress_gaps = self.settings.compress_gaps
+        kept = self._kept_ranges(segments, duration, silence_start, silence_end, compress_gaps)
+        kept, edit_graph = self._edit_graph(kept, duration)
+        edited_duration = sum(end - start for start, end in kept)
 
-        # Trim silence from start and end
-        if trim_silence and (silence_start > 0.5 or silence_end > 0.5):
-            trim_end = duration - silence_end
-            filters.append(f"atrim=start={silence_start}:end={trim_end}")
-            filters.append("asetpts=PTS-STARTPTS")
+        with timings.stage("encode") as span:
+            if len(selected) == 1 and self._use_segmented_encode(edited_duration, primary):
+                self._encode_segmented(
+                    input_path, output_path, edit_graph, normalize, progress_callback,
+                    profile=primary, channels=channels,
+                )
+            else:
+                # Normalize loudness (EBU R128)
+                post = "anull"
+                if normalize:
+                    target_lufs = self.settings.loudness_target
+                    post = f"loudnorm=I={target_lufs}:TP=-1.5:LRA=11"
 
-        # Normalize loudness (EBU R128)
-        if normalize:
-            target_lufs = self.settings.loudness_target
-            filters.append(f"loudnorm=I={target_lufs}:TP=-1.5:LRA=11")
+                # Normalize once, then split to one output per rendition
+                labels = [f'[out{index}]' for index in range(len(selected))]
+                split = f',asplit={len(selected)}{"".join(labels)}' if len(selected) > 1 else labels[0]
+                cmd = [
+                    FFMPEG, '-y',
+                    '-i', input_path,
+                    '-filter_complex', f'{edit_graph};[edited]{post}{split}',
+                ]
+                for label, profile in zip(labels, selected):
+                    cmd += ['-map', label, *self._encode_args(profile, channels),
+                            renditions[profile.name]]
+
+                self._run_ffmpeg(cmd, edited_duration, progress_callback)
+            span["bytes"] = sum(os.path.getsize(path) for path in renditions.values())
+
+        # Get final duration and draw the waveform from the kept frames,
+        # scaled by the gain loudness normalization will have applied
+        final_duration = self._get_duration(output_path)
+        with timings.stage("waveform"):
+            power = np.concatenate([
+                power[round(start / ANALYSIS_FRAME_SECONDS):round(end / ANALYSIS_FRAME_SECONDS)]
+                for start, end in kept
+            ])
+            gain_db = self.settings.loudness_target - speech_db if normalize else 0.0
+            waveform = self._waveform(power, gain_db=gain_db)
+
+        return AudioProcessingResult(
+            output_path=output_path,
+            duration=final_duration,
+            waveform=waveform,
+            silence_start=silence_start,
+            silence_end=silence_end,
+            segments=segments,
+            renditions=renditions,
+        )
+
+    def profile_names(self) -> List[str]:
+        """The configured profiles: encoding_profile, then encoding_renditions."""
+        names = [self.settings.encoding_profile.strip()]
+        for name in self.settings.encoding_renditions.split(','):
+            if name.strip() and name.strip() not in names:
+                names.append(name.strip())
+        return names
+
+    def _encode_args(
+        self,
+        profile: EncodingProfile,
+        channels: Optional[int] = None,
+        sample_rate: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Output options for a profile. channels is used when the profile
+        does not fix its own; with neither, the input layout is kept.
+        sample_rate overrides the profile's.
+        """
+        sample_rate = sample_rate or profile.sample_rate or self.settings.audio_sample_rate
+        args = ['-ar', str(sample_rate)]
+        channels = profile.channels or channels
+        if channels:
+            args += ['-ac', str(channels)]
+        args += ['-c:a', profile.codec]
+        if profile.quality is not None:
+            args += ['-q:a', profile.quality]
+        else:
+            args += ['-b:a', profile.bitrate or self.settings.audio_bitrate]
+        return args + list(profile.options) + ['-f', profile.muxer]
+
+    def _kept_ranges(
+        self,
+        segments: List[SilenceSegment],
+        duration: float,
+        silence_start: float,
+        silence_end: float,
+        compress_gaps: bool,
+    ) -> List[tuple[float, float]]:
+        """
+        Source time ranges to keep, in order. The ends are trimmed by the
+        edge silence; with compress_gaps, interior gaps (silence/applause
+        runs, merged when adjacent) longer than settings.gap_threshold lose
+        their middle so that settings.gap_max_duration remains.
+        """
+        start, end = 0.0, duration
+        if silence_start > 0.5 or silence_end > 0.5:
+            start, end = silence_start, duration - silence_end
+        kept = [(start, end)]
+        if not compress_gaps:
+            return kept
+
+        limit = self.settings.gap_max_duration
+        threshold = max(self.settings.gap_threshold, limit)
+        half = limit / 2
+
+        gaps = []
+        for segment in segments:
+            if gaps and segment.start <= gaps[-1][1] + ANALYSIS_FRAME_SECONDS:
+                gaps[-1][1] = max(gaps[-1][1], segment.end)
+            else:
+                gaps.append([segment.start, segment.end])
+
+        for gap_start, gap_end in gaps:
+            if gap_start <= start or gap_end >= end or gap_end - gap_start <= threshold:
+                continue
+            last_start, _ = kept.pop()
+            kept += [(last_start, gap_start + half), (gap_end - half, end)]
+
+        return kept
+
+    def _edit_graph(
+        self,
+        kept: List[tuple[float, float]],
+        duration: float,
+    ) -> tuple[List[tuple[float, float]], str]:
+        """
+        Filtergraph taking [0:a] to [edited] with only the kept ranges.
+        Returns the ranges as actually cut, and the graph.
+
+        Several ranges are cut sample-accurately at EDIT_SAMPLE_RATE: one
+        asplit branch per range, each trimmed with atrim on sample indices,
+        chained with acrossfade. Every cut falls inside a gap longer than
+        settings.gap_threshold, so each side of a join is extended into the
+        gap by half the crossfade and the fade is centred on the cut. The
+        ranges are disjoint and in order, so each branch's atrim drops the
+        audio before its range as it arrives and nothing is held back for
+        later branches.
+        """
+        if len(kept) == 1:
+            start, end = kept[0]
+            if start <= 0 and end >= duration:
+                return kept, '[0:a]anull[edited]'
+            return kept, f'[0:a]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[edited]'
+
+        samples = [
+            (round(start * EDIT_SAMPLE_RATE), round(end * EDIT_SAMPLE_RATE))
+            for start, end in kept
+        ]
+        total = round(duration * EDIT_SAMPLE_RATE)
+        # Never fade over more than a kept range holds
+        fade = min(
+            round(GAP_CROSSFADE_SECONDS * EDIT_SAMPLE_RATE),
+            *(last - first for first, last in samples),
+        )
+        half = fade // 2
 
-        # Build FFmpeg command
-        filter_str = ",".join(filters) if filters else "anull"
+        chains = [
+            f'[0:a]aresample={EDIT_SAMPLE_RATE},asetpts=PTS-STARTPTS,'
+            f'asplit={len(samples)}' + ''.join(f'[r{i}]' for i in range(len(samples)))
+        ]
+        for i, (first, last) in enumerate(samples):
+            trim = [f'start_sample={first - half if i else first}']
+            if i < len(samples) - 1:
+                trim.append(f'end_sample={last + fade - half}')
+            elif last < total:
+                trim.append(f'end_sample={last}')
+            chains.append(f"[r{i}]atrim={':'.join(trim)},asetpts=PTS-STARTPTS[t{i}]")
+
+        joined = 't0'
+        for i in range(1, len(samples)):
+            label = 'edited' if i == len(samples) - 1 else f'x{i}'
+            chains.append(f'[{joined}][t{i}]acrossfade=ns={fade}:c1=qsin:c2=qsin[{label}]')
+            joined = label
+        ranges = [
+            (first / EDIT_SAMPLE_RATE, last / EDIT_SAMPLE_RATE) for first, last in samples
+        ]
+        return ranges, ';'.join(chains)
+
+    def _use_segmented_encode(self, duration: float, profile: EncodingProfile) -> bool:
+        """
+        Whether a file is long enough to be worth encoding in parallel.
+        Only MP3 can be cut on frame boundaries and joined by stream copy.
+        """
+        return (
+            self.settings.encode_workers > 1
+            and duration >= self.settings.segment_min_duration
+            and profile.codec == 'libmp3lame'
+            and (profile.sample_rate or self.settings.audio_sample_rate) in MP3_SAMPLE_RATES
+        )
+
+    def _encode_segmented(
+        self,
+        input_path: str,
+        output_path: str,
+        edit_graph: str,
+        normalize: bool,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        profile: Optional[EncodingProfile] = None,
+        channels: int = 2,
+    ) -> None:
+        """
+        Encode long audio as frame-aligned segments in parallel, with an
+        MP3 profile (default: mp3-stereo).
+
+        The input is decoded once to PCM while its loudness is measured, so
+        every segment gets the same linear gain. Each segment is encoded
+        with a little of its neighbours' audio on either side and without
+        the bit reservoir; those extra frames are then cut away by stream
+        copy, which cancels the encoder delay and padding at each join.
+        """
+        profile = profile or ENCODING_PROFILES['mp3-stereo']
+        channels = profile.channels or channels
+        sample_rate = profile.sample_rate or self.settings.audio_sample_rate
+        # Next to the output, so the PCM counts against the job's scratch space
+        work_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
+
+        try:
+            pcm_path = os.path.join(work_dir, 'source.wav')
+            gain_db = self._decode_and_measure(
+                input_path, pcm_path, edit_graph, normalize, sample_rate, channels
+            )
+
+            total_samples = round(self._get_duration(pcm_path) * sample_rate)
+            total_frames = -(-(total_samples + MP3_DECODER_DELAY) // MP3_FRAME_SAMPLES)
+            workers = self.settings.encode_workers
+            frames_per_segment = -(-total_frames // workers)
+
+            segments = []
+            for index in range(workers):
+                first_frame = index * frames_per_segment
+                if first_frame >= total_frames:
+                    break
+                segments.append((
+                    index,
+                    first_frame,
+                    min(frames_per_segment, total_frames - first_frame),
+                    first_frame + frames_per_segment >= total_frames,
+                ))
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # Copy the context so FFmpeg usage is attributed to this stage
+                futures = [
+                    pool.submit(
+                        contextvars.copy_context().run,
+                        self._encode_segment, pcm_path, work_dir, gain_db, profile,
+                        *segment
+                    )
+                    for segment in segments
+                ]
+                if progress_callback is not None:
+                    for done, _ in enumerate(as_completed(futures), start=1):
+                        progress_callback(done / len(futures))
+                segment_paths = [future.result() for future in futures]
+
+            self.concatenate_audio(segment_paths, output_path, copy=True)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _decode_and_measure(
+        self,
+        input_path: str,
+        pcm_path: str,
+        edit_graph: str,
+        normalize: bool,
+        sample_rate: int,
+        channels: int = 2,
+    ) -> float:
+        """
+        Decode (and edit, see _edit_graph) input to a PCM WAV, measuring loudness in the same
+        pass. Returns the gain in dB that brings it to the loudness target
+        without pushing the true peak above -1.5 dBTP.
+        """
+        target_lufs = self.settings.loudness_target
+        decode = f'{edit_graph};[edited]aresample={sample_rate}'
+        pcm_output = ['-ac', str(channels), '-c:a', 'pcm_s16le', '-rf64', 'auto', pcm_path]
+
+        if not normalize:
+            cmd = [FFMPEG, '-y', '-i', input_path,
+                   '-filter_complex', f'{decode}[pcm]', '-map', '[pcm]'] + pcm_output
+            run_measured(cmd, 'ffmpeg', capture_output=True, check=True)
+            return 0.0
 
         cmd = [
             FFMPEG, '-y',
             '-i', input_path,
-            '-af', filter_str,
-            '-ar', str(self.settings.audio_sample_rate),
-            '-ab', self.settings.audio_bitrate,
-            '-ac', '2',  # Stereo
-            output_path
+            '-filter_complex',
+            f'{decode},asplit=2[pcm][meas];'
+            f'[meas]loudnorm=I={target_lufs}:TP=-1.5:LRA=11:print_format=json[out]',
+            '-map', '[pcm]', *pcm_output,
+            '-map', '[out]', '-f', 'null', '-',
         ]
 
-        subprocess.run(cmd, capture_output=True, check=True)
+        result = run_measured(cmd, 'ffmpeg', capture_output=True, text=True, check=True)
+        stderr = result.stderr
+        stats = json.loads(stderr[stderr.rindex('{'):stderr.rindex('}') + 1])
+        input_i = float(stats['input_i'])
+        input_tp = float(stats['input_tp'])
+        if input_i == float('-inf'):
+            return 0.0
+        return min(target_lufs - input_i, -1.5 - input_tp)
 
-        # Get final duration and generate waveform
-        final_duration = self._get_duration(output_path)
-        waveform = self._generate_waveform(output_path)
+    def _encode_segment(
+        self,
+        pcm_path: str,
+        work_dir: str,
+        gain_db: float,
+        profile: EncodingProfile,
+        index: int,
+        first_frame: int,
+        frame_count: int,
+        is_last: bool,
+    ) -> str:
+        """Encode one segment and cut it to exactly its own frames."""
+        # Frames are counted on the output timeline, which starts with the
+        # decoder delay, so source samples lag frame boundaries by that much
+        start_sample = first_frame * MP3_FRAME_SAMPLES - MP3_DECODER_DELAY
+        end_sample = start_sample + frame_count * MP3_FRAME_SAMPLES
+
+        filters = []
+        if index == 0:
+            # Nothing precedes the first segment: pre-roll with silence, and
+            # leave the decoder delay in place since players skip it
+            preroll = SEGMENT_PREROLL + MP3_DECODER_DELAY
+            filters.append(f"atrim=end_sample={end_sample + SEGMENT_POSTROLL}")
+            filters.append(f"adelay=delays={preroll}S:all=1")
+        elif is_last:
+            filters.append(f"atrim=start_sample={start_sample - SEGMENT_PREROLL}")
+        else:
+            filters.append(
+                f"atrim=start_sample={start_sample - SEGMENT_PREROLL}"
+                f":end_sample={end_sample + SEGMENT_POSTROLL}"
+            )
+        filters.append("asetpts=PTS-STARTPTS")
+        filters.append(f"volume={gain_db:.2f}dB")
+
+        encoded_path = os.path.join(work_dir, f'segment_{index}.raw.mp3')
+        cmd = [
+            FFMPEG, '-y',
+            '-i', pcm_path,
+            '-af', ",".join(filters),
+            *self._encode_args(profile),
+            '-reservoir', '0',  # Keep frames independent so they can be cut
+            '-write_xing', '0',
+            '-id3v2_version', '0',
+            encoded_path
+        ]
+        run_measured(cmd, 'ffmpeg', capture_output=True, check=True)
+
+        with open(encoded_path, 'rb') as f:
+            data = f.read()
+        os.unlink(encoded_path)
+
+        offsets = _mp3_frame_offsets(data)
+        first = SEGMENT_PREROLL_FRAMES
+        last = len(offsets) if is_last else first + frame_count
+        if last > len(offsets):
+            raise RuntimeError(f"Segment {index} is shorter than expected")
+        end_offset = offsets[last] if last < len(offsets) else len(data)
+
+        segment_path = os.path.join(work_dir, f'segment_{index}.mp3')
+        with open(segment_path, 'wb') as f:
+            f.write(data[offsets[first]:end_offset])
+        return segment_path
+
+    def encode_stream(
+        self,
+        source: BinaryIO,
+        analysis_path: str,
+        normalize: bool = True,
+        chunk_size: int = 64 * 1024,
+        profile: Optional[EncodingProfile] = None,
+    ) -> Iterator[bytes]:
+        """
+        Encode audio from a pipe while it is still being written.
+        Yields chunks in the given profile (default: settings.encoding_profile,
+        which must be streamable) as FFmpeg produces them and writes a
+        low-rate mono WAV copy to analysis_path for analyze_encoded().
+
+        Silence trimming needs the whole file, so it is not applied here;
+        the detected silence is reported by analyze_encoded() instead. The
+        source cannot be checked for stereo in advance either, so profiles
+        without a fixed channel count encode mono.
+        """
+        profile = profile or get_encoding_profile(self.settings.encoding_profile)
+        if not profile.streamable:
+            raise ValueError(f"Encoding profile '{profile.name}' cannot be streamed")
+
+        filter_str = "anull"
+        if normalize:
+            target_lufs = self.settings.loudness_target
+            filter_str = f"loudnorm=I={target_lufs}:TP=-1.5:LRA=11"
+
+        cmd = [
+            FFMPEG, '-y', '-nostdin',
+            '-loglevel', 'error',
+            '-i', 'pipe:0',
+            '-filter_complex', f'[0:a]{filter_str},asplit=2[enc][ana]',
+            '-map', '[enc]',
+            *self._encode_args(profile, channels=1),
+            'pipe:1',
+            '-map', '[ana]',
+            '-ac', '1',
+            '-ar', '8000',
+            '-c:a', 'pcm_s16le',
+            analysis_path,
+        ]
+
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(
+                cmd, stdin=source, stdout=subprocess.PIPE, stderr=stderr
+            )
+            try:
+                while True:
+                    chunk = process.stdout.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                process.stdout.close()
+                returncode = wait_measured(process, 'ffmpeg')
+
+            if returncode != 0:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(
+                    returncode, cmd, stderr=stderr.read()
+                )
+
+    def analyze_encoded(
+        self,
+        analysis_path: str,
+        timings: Optional[StageTimings] = None,
+    ) -> AudioProcessingResult:
+        """
+        Compute duration, waveform and silence for audio produced by
+        encode_stream(), using its analysis WAV.
+        """
+        timings = timings or StageTimings()
+        duration = self._get_duration(analysis_path)
+        with timings.stage("analyze"):
+            power = self._frame_power(analysis_path)
+            segments, _ = self._detect_silence(power)
+            silence_start, silence_end = self._edge_silence(segments, duration)
+        with timings.stage("waveform"):
+            waveform = self._waveform(power)
 
         return AudioProcessingResult(
-            output_path=output_path,
-            duration=final_duration,
+            output_path="",
+            duration=duration,
             waveform=waveform,
             silence_start=silence_start,
             silence_end=silence_end,
+            segments=segments,
         )
 
     def crop_audio(
@@ -97,10 +661,15 @@ class AudioService:
         start_time: float,
         end_time: float,
         output_path: Optional[str] = None,
+        profile: Optional[EncodingProfile] = None,
     ) -> str:
-        """Crop audio to specified start and end times."""
+        """
+        Crop audio to specified start and end times, re-encoding with the
+        profile it was made with (default: mp3-stereo).
+        """
+        profile = profile or ENCODING_PROFILES['mp3-stereo']
         if output_path is None:
-            fd, output_path = tempfile.mkstemp(suffix='.mp3')
+            fd, output_path = tempfile.mkstemp(suffix=f'.{profile.extension}')
             os.close(fd)
 
         cmd = [
@@ -108,21 +677,25 @@ class AudioService:
             '-i', input_path,
             '-ss', str(start_time),
             '-to', str(end_time),
-            '-c:a', 'libmp3lame',
-            '-ab', self.settings.audio_bitrate,
+            *self._encode_args(profile),
             output_path
         ]
 
-        subprocess.run(cmd, capture_output=True, check=True)
+        run_measured(cmd, 'ffmpeg', capture_output=True, check=True)
         return output_path
 
     def concatenate_audio(
         self,
         audio_files: List[str],
         output_path: Optional[str] = None,
+        copy: bool = False,
+        profile: Optional[EncodingProfile] = None,
     ) -> str:
         """
         Concatenate multiple audio files (for intro/outro support).
+        With copy=True the inputs must already share codec parameters and
+        are joined by stream copy instead of being re-encoded.
+        profile sets the output format (default: MP3 at audio_bitrate).
         """
         if output_path is None:
             fd, output_path = tempfile.mkstemp(suffix='.mp3')
@@ -141,18 +714,147 @@ class AudioService:
             '-f', 'concat',
             '-safe', '0',
             '-i', list_path,
-            '-c:a', 'libmp3lame',
-            '-ab', self.settings.audio_bitrate,
-            output_path
         ]
+        if copy:
+            cmd += ['-c:a', 'copy']
+            if profile is not None:
+                cmd += [*profile.options, '-f', profile.muxer]
+        elif profile is not None:
+            cmd += self._encode_args(profile)
+        else:
+            cmd += ['-c:a', 'libmp3lame', '-ab', self.settings.audio_bitrate]
+        cmd.append(output_path)
 
         try:
-            subprocess.run(cmd, capture_output=True, check=True)
+            run_measured(cmd, 'ffmpeg', capture_output=True, check=True)
         finally:
             os.unlink(list_path)
 
         return output_path
 
+    def assemble_episode(
+        self,
+        speech_path: str,
+        profile: EncodingProfile,
+        intro_path: Optional[str] = None,
+        outro_path: Optional[str] = None,
+        output_path: Optional[str] = None,
+    ) -> str:
+        """
+        Put intro and outro clips around an encoded speech without
+        re-encoding the speech. The clips are encoded once to the speech's
+        format (see prepare_clip) and the parts are joined by stream copy.
+        MP3 frames are copied as they are behind a rebuilt Xing/LAME
+        header, so apart from copying bytes the work does not grow with
+        the speech; other formats are remuxed by FFmpeg.
+
+        Only the start and end of the file are gapless. Each interior join
+        keeps the earlier part's padding and the later part's encoder
+        delay, about 25-50 ms of silence for MP3: removing it would mean
+        re-encoding the frames on both sides of the join (MP3 frames are
+        1152 samples and borrow bits from the frames before them), which
+        is what stream copy avoids.
+        """
+        if output_path is None:
+            fd, output_path = tempfile.mkstemp(suffix=f'.{profile.extension}')
+            os.close(fd)
+
+        sample_rate, channels = self._probe_audio(speech_path)
+        parts = [speech_path]
+        if intro_path:
+            parts.insert(0, self.prepare_clip(intro_path, profile, sample_rate, channels))
+        if outro_path:
+            parts.append(self.prepare_clip(outro_path, profile, sample_rate, channels))
+
+        if len(parts) == 1:
+            shutil.copyfile(speech_path, output_path)
+        elif profile.codec == 'libmp3lame':
+            _join_mp3([_read_mp3_layout(part) for part in parts], output_path)
+        else:
+            self.concatenate_audio(parts, output_path, copy=True, profile=profile)
+        return output_path
+
+    def prepare_clip(
+        self,
+        clip_path: str,
+        profile: EncodingProfile,
+        sample_rate: int,
+        channels: int,
+    ) -> str:
+        """
+        Encode an intro/outro clip so it can be stream-copied next to a
+        speech: same profile, sample rate and channels, normalized to the
+        same loudness target. Results are cached in settings.clip_cache_dir
+        by content and parameters, so each clip is encoded once per format.
+        """
+        digest = hashlib.sha256()
+        with open(clip_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+
+        target_lufs = self.settings.loudness_target
+        cache_dir = self.settings.clip_cache_dir or os.path.join(
+            tempfile.gettempdir(), 'speech2pod-clips'
+        )
+        os.makedirs(cache_dir, exist_ok=True)
+        cached = os.path.join(
+            cache_dir,
+            f'{digest.hexdigest()[:32]}-{profile.name}-{sample_rate}-{channels}ch'
+            f'-{target_lufs:g}.{profile.extension}'
+        )
+        if os.path.exists(cached):
+            return cached
+
+        # Encode beside the cache entry and rename it into place, so a
+        # concurrent assembly never picks up a partial file
+        fd, partial = tempfile.mkstemp(dir=cache_dir, suffix=f'.{profile.extension}')
+        os.close(fd)
+        try:
+            cmd = [
+                FFMPEG, '-y',
+                '-i', clip_path,
+                '-af', f'loudnorm=I={target_lufs}:TP=-1.5:LRA=11',
+                *self._encode_args(profile, channels, sample_rate),
+                partial
+            ]
+            run_measured(cmd, 'ffmpeg', capture_output=True, check=True)
+            os.replace(partial, cached)
+        finally:
+            if os.path.exists(partial):
+                os.unlink(partial)
+        return cached
+
+    def _run_ffmpeg(
+        self,
+        cmd: List[str],
+        duration: float,
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        """
+        Run an FFmpeg command that writes to a file. With a callback, FFmpeg's
+        -progress output is parsed to report the fraction of `duration` done.
+        """
+        if progress_callback is None or duration <= 0:
+            run_measured(cmd, 'ffmpeg', capture_output=True, check=True)
+            return
+
+        cmd = [cmd[0], '-progress', 'pipe:1', '-nostats'] + cmd[1:]
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=stderr, text=True
+            )
+            for line in process.stdout:
+                key, _, value = line.strip().partition('=')
+                if key == 'out_time_us' and value.isdigit():
+                    progress_callback(min(1.0, int(value) / 1e6 / duration))
+            returncode = wait_measured(process, 'ffmpeg')
+
+            if returncode != 0:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(
+                    returncode, cmd, stderr=stderr.read()
+                )
+
     def _get_duration(self, audio_path: str) -> float:
         """Get audio duration in seconds."""
         cmd = [
@@ -163,97 +865,444 @@ class AudioService:
             audio_path
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_measured(cmd, 'ffprobe', capture_output=True, text=True)
         data = json.loads(result.stdout)
         return float(data['format']['duration'])
 
-    def _detect_silence(
-        self,
-        audio_path: str,
-        duration: float,
-        threshold: str = '-40dB',
-        min_duration: float = 0.5
-    ) -> tuple[float, float]:
+    def _probe_audio(self, audio_path: str) -> tuple[int, int]:
+        """Sample rate and channel count of the first audio stream."""
+        cmd = [
+            FFPROBE,
+            '-v', 'error',
+            '-select_streams', 'a:0',
+            '-show_entries', 'stream=sample_rate,channels',
+            '-of', 'json',
+            audio_path
+        ]
+
+        result = run_measured(cmd, 'ffprobe', capture_output=True, text=True)
+        stream = json.loads(result.stdout)['streams'][0]
+        return int(stream['sample_rate']), int(stream['channels'])
+
+    def _frame_power(self, audio_path: str, stereo: bool = False) -> "np.ndarray":
         """
-        Detect silence at the start and end of audio.
-        Returns (start_silence_duration, end_silence_duration).
+        Decode audio to low-rate mono and return the mean power of each
+        ANALYSIS_FRAME_SAMPLES frame. The decode is consumed as it streams,
+        so memory stays proportional to the frame count, not the samples.
+        With stereo=True the decode keeps two channels and each frame gets
+        [mid, side] power; mid equals the mono downmix power.
         """
+        import numpy as np
+
+        channels = 2 if stereo else 1
         cmd = [
             FFMPEG,
+            '-v', 'error',
             '-i', audio_path,
-            '-af', f'silencedetect=noise={threshold}:d={min_duration}',
-            '-f', 'null',
+            '-ac', str(channels),
+            '-ar', str(ANALYSIS_SAMPLE_RATE),
+            '-f', 'f32le',
             '-'
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        output = result.stderr
+        sample_bytes = channels * 4
+        frame_bytes = ANALYSIS_FRAME_SAMPLES * sample_bytes
+        chunk_size = frame_bytes * 1000
+        powers = []
+        pending = b''
 
-        # Parse silence detection output
-        silence_start = 0.0
-        silence_end = 0.0
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+            try:
+                while True:
+                    chunk = process.stdout.read(chunk_size)
+                    if not chunk:
+                        break
+                    pending += chunk
+                    whole = len(pending) - len(pending) % frame_bytes
+                    if whole:
+                        frames = np.frombuffer(pending[:whole], dtype='<f4').reshape(
+                            -1, ANALYSIS_FRAME_SAMPLES, channels
+                        )
+                        powers.append(_mean_power(frames))
+                        pending = pending[whole:]
+            finally:
+                process.stdout.close()
+                returncode = wait_measured(process, 'ffmpeg')
+
+            if returncode != 0:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr.read())
 
-        # Look for silence at the very beginning
-        import re
-        start_matches = re.findall(r'silence_start: ([\d.]+)', output)
-        end_matches = re.findall(r'silence_end: ([\d.]+)', output)
+        # A trailing partial frame still counts
+        if len(pending) >= sample_bytes:
+            tail = np.frombuffer(pending[:len(pending) - len(pending) % sample_bytes], dtype='<f4')
+            powers.append(_mean_power(tail.reshape(1, -1, channels)))
 
-        if start_matches and end_matches:
-            # Check if first silence starts at 0
-            first_start = float(start_matches[0])
-            if first_start < 0.1:  # Essentially at the beginning
-                silence_start = float(end_matches[0])
+        power = np.concatenate(powers) if powers else np.zeros((0, channels), dtype=np.float32)
+        return power if stereo else power[:, 0]
 
-            # Check for silence at the end
-            if len(start_matches) > 0:
-                last_start = float(start_matches[-1])
-                # If the last silence starts close to the end
-                if last_start > duration - 30:  # Within last 30 seconds
-                    silence_end = duration - last_start
+    @staticmethod
+    def _is_stereo(frames: "np.ndarray") -> bool:
+        """Whether [mid, side] frame power from _frame_power() is real stereo."""
+        import numpy as np
 
-        return silence_start, silence_end
+        mid, side = np.sum(frames, axis=0, dtype=np.float64)
+        return bool(mid > 0 and side >= mid * 10 ** (STEREO_MIN_SIDE_DB / 10))
 
-    def _generate_waveform(self, audio_path: str, samples: int = 200) -> List[float]:
+    def _detect_silence(
+        self,
+        power: "np.ndarray",
+        min_duration: float = 0.5,
+    ) -> tuple[List[SilenceSegment], float]:
         """
-        Generate waveform data for visualization.
-        Returns list of amplitude values (0-1).
+        Find every silence and applause segment in per-frame power from
+        _frame_power(). The silence threshold adapts to the recording's
+        noise floor unless settings.silence_threshold_db is set.
+        Returns (segments in time order, speech level in dBFS).
         """
-        # Use FFmpeg to extract raw audio and compute RMS per segment
-        cmd = [
-            FFMPEG,
-            '-i', audio_path,
-            '-ac', '1',
-            '-ar', '8000',
-            '-f', 'f32le',
-            '-'
+        import numpy as np
+
+        if len(power) == 0:
+            return [], DIGITAL_SILENCE_DB
+
+        level = 10 * np.log10(power.astype(np.float64) + 1e-12)
+        floor = max(float(np.percentile(level, SILENCE_FLOOR_PERCENTILE)), DIGITAL_SILENCE_DB)
+        speech = float(np.percentile(level, SPEECH_LEVEL_PERCENTILE))
+
+        threshold = self.settings.silence_threshold_db
+        if threshold is None:
+            threshold = floor + max(SILENCE_MIN_MARGIN_DB, (speech - floor) * SILENCE_THRESHOLD_RATIO)
+            threshold = min(threshold, speech - SILENCE_MIN_DEPTH_DB)
+        silent = level < threshold
+
+        # Rolling level spread over ~1 s: speech rises and falls with each
+        # syllable, sustained applause (or music) stays flat
+        window = APPLAUSE_WINDOW_FRAMES
+        steady = np.zeros(len(level), dtype=bool)
+        if len(level) >= window:
+            sums = np.concatenate(([0.0], np.cumsum(level)))
+            squares = np.concatenate(([0.0], np.cumsum(level * level)))
+            mean = (sums[window:] - sums[:-window]) / window
+            spread = np.sqrt(np.maximum(
+                (squares[window:] - squares[:-window]) / window - mean * mean, 0.0
+            ))
+            flat = (spread < APPLAUSE_MAX_LEVEL_STD_DB) & (mean >= threshold)
+            # Centre each window on its frame; the ends take the nearest window
+            offset = window // 2
+            steady[offset:offset + len(flat)] = flat
+            steady[:offset] = flat[0]
+            steady[offset + len(flat):] = flat[-1]
+        applause = steady & ~silent
+
+        segments = (
+            _runs(silent, min_duration, "silence")
+            + _runs(applause, APPLAUSE_MIN_DURATION, "applause")
+        )
+        segments.sort(key=lambda segment: segment.start)
+
+        speech_frames = power[~silent & ~applause]
+        if len(speech_frames):
+            speech = float(10 * np.log10(np.mean(speech_frames, dtype=np.float64) + 1e-12))
+
+        return segments, speech
+
+    def _edge_silence(
+        self,
+        segments: List[SilenceSegment],
+        duration: float,
+    ) -> tuple[float, float]:
+        """
+        Length of the non-speech runs touching the start and end of the
+        audio. Applause only counts when settings.trim_applause is on.
+        Returns (start_silence_duration, end_silence_duration).
+        """
+        trimmable = [
+            segment for segment in segments
+            if segment.kind == "silence" or self.settings.trim_applause
         ]
 
-        result = subprocess.run(cmd, capture_output=True)
-        raw_audio = result.stdout
+        silence_start = 0.0
+        for segment in trimmable:
+            if segment.start > silence_start + EDGE_GAP_SECONDS:
+                break
+            silence_start = max(silence_start, segment.end)
 
-        import struct
-        import numpy as np
+        tail = duration
+        for segment in reversed(trimmable):
+            if segment.end < tail - EDGE_GAP_SECONDS:
+                break
+            tail = min(tail, segment.start)
 
-        # Convert to float array
-        num_samples = len(raw_audio) // 4
-        audio_data = struct.unpack(f'{num_samples}f', raw_audio)
-        audio_array = np.array(audio_data)
+        silence_start = min(silence_start, duration)
+        return silence_start, max(0.0, duration - max(tail, silence_start))
 
-        # Split into segments and compute RMS
-        segment_size = max(1, len(audio_array) // samples)
-        waveform = []
+    def _generate_waveform(self, audio_path: str, samples: int = 200) -> List[float]:
+        """
+        Generate waveform data for visualization.
+        Returns list of amplitude values (0-1).
+        """
+        return self._waveform(self._frame_power(audio_path), samples)
 
-        for i in range(samples):
-            start = i * segment_size
-            end = min(start + segment_size, len(audio_array))
-            segment = audio_array[start:end]
+    @staticmethod
+    def _waveform(power: "np.ndarray", samples: int = 200, gain_db: float = 0.0) -> List[float]:
+        """RMS of `samples` equal spans of per-frame power, scaled to 0-1."""
+        import numpy as np
 
-            if len(segment) > 0:
-                rms = np.sqrt(np.mean(segment ** 2))
+        gain = 10 ** (gain_db / 20)
+        waveform = []
+        for bucket in np.array_split(power, samples):
+            if len(bucket) > 0:
+                rms = np.sqrt(np.mean(bucket, dtype=np.float64)) * gain
                 # Normalize to 0-1 range (with some headroom)
-                normalized = min(1.0, rms * 3)
-                waveform.append(float(normalized))
+                waveform.append(float(min(1.0, rms * 3)))
             else:
                 waveform.append(0.0)
 
         return waveform
+
+
+def _mean_power(frames: "np.ndarray") -> "np.ndarray":
+    """
+    Mean power per frame and channel of (frames, samples, channels) audio.
+    Two channels are first turned into mid (L+R)/sqrt(2), which matches
+    FFmpeg's mono downmix, and side (L-R)/sqrt(2).
+    """
+    import numpy as np
+
+    if frames.shape[2] == 2:
+        frames = frames @ (np.array([[1, 1], [1, -1]], dtype=np.float32) / np.sqrt(2))
+    return np.einsum('ijk,ijk->ik', frames, frames) / frames.shape[1]
+
+
+def _runs(mask: "np.ndarray", min_duration: float, kind: str) -> List[SilenceSegment]:
+    """Runs of True frames lasting at least min_duration, as segments."""
+    import numpy as np
+
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    min_frames = min_duration / ANALYSIS_FRAME_SECONDS
+
+    return [
+        SilenceSegment(
+            start=round(float(start * ANALYSIS_FRAME_SECONDS), 3),
+            end=round(float(end * ANALYSIS_FRAME_SECONDS), 3),
+            kind=kind,
+        )
+        for start, end in zip(starts, ends)
+        if end - start >= min_frames
+    ]
+
+
+def _mp3_frame_size(header: int) -> int:
+    """Size in bytes of an MPEG-1 Layer III frame, or 0 if header is not one."""
+    bitrate_index = (header >> 12) & 0xF
+    sample_rate_index = (header >> 10) & 0x3
+    # Frame sync, MPEG-1, Layer III and a valid bitrate/sample rate
+    if (header >> 21 != 0x7FF or (header >> 19) & 0x3 != 0x3
+            or (header >> 17) & 0x3 != 0x1
+            or bitrate_index in (0, 0xF) or sample_rate_index == 0x3):
+        return 0
+    padding = (header >> 9) & 0x1
+    return (144000 * MP3_BITRATES_KBPS[bitrate_index]
+            // MP3_SAMPLE_RATES[sample_rate_index] + padding)
+
+
+def _mp3_frame_offsets(data: bytes) -> List[int]:
+    """Byte offsets of the MPEG-1 Layer III frames in a raw MP3 stream."""
+    offsets = []
+    pos = 0
+    while pos + 4 <= len(data):
+        size = _mp3_frame_size(int.from_bytes(data[pos:pos + 4], 'big'))
+        if not size:
+            pos += 1
+            continue
+        offsets.append(pos)
+        pos += size
+    return offsets
+
+
+@dataclass
+class Mp3Layout:
+    """Where the audio frames of an MP3 file are, and its gapless info."""
+    path: str
+    audio_start: int  # first audio frame, after ID3v2 and the Xing frame
+    audio_end: int  # end of the last frame, before any ID3v1 tag
+    frames: int
+    toc: List[int]  # Xing seek table over audio_start..audio_end
+    delay: int
+    padding: int
+    vbr: bool
+    music_crc: Optional[int] = None
+    header_frame: Optional[bytes] = None  # Xing/Info frame, with a LAME tag
+
+
+def _read_mp3_layout(path: str) -> Mp3Layout:
+    """
+    Read an MP3's Xing/LAME header. Files without one (e.g. encoded to a
+    pipe) are scanned frame by frame instead.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(10)
+        start = 0
+        if head[:3] == b'ID3':
+            # Syncsafe size: 7 bits per byte
+            start = 10 + sum((head[6 + i] & 0x7F) << (21 - 7 * i) for i in range(4))
+            if head[5] & 0x10:  # Footer present
+                start += 10
+        end = f.seek(0, os.SEEK_END)
+        if end - start >= 128:
+            f.seek(end - 128)
+            if f.read(3) == b'TAG':
+                end -= 128
+        f.seek(start)
+        first = f.read(4)
+        size = _mp3_frame_size(int.from_bytes(first, 'big')) if len(first) == 4 else 0
+        frame = first + f.read(size - 4) if size else b''
+
+    if frame:
+        side_info = 17 if (frame[3] >> 6) & 0x3 == 0x3 else 32
+        xing = 4 + side_info
+        lame = xing + LAME_TAG_OFFSET
+        if (frame[xing:xing + 4] in (b'Xing', b'Info')
+                and int.from_bytes(frame[xing + 4:xing + 8], 'big') == XING_FLAGS_ALL
+                and len(frame) >= lame + LAME_TAG_CRC_OFFSET + 2):
+            delay_padding = int.from_bytes(
+                frame[lame + LAME_DELAY_OFFSET:lame + LAME_DELAY_OFFSET + 3], 'big'
+            )
+            return Mp3Layout(
+                path=path,
+                audio_start=start + len(frame),
+                audio_end=end,
+                frames=int.from_bytes(frame[xing + 8:xing + 12], 'big'),
+                toc=list(frame[xing + 16:xing + 16 + XING_TOC_SIZE]),
+                delay=delay_padding >> 12,
+                padding=delay_padding & 0xFFF,
+                vbr=frame[xing:xing + 4] == b'Xing',
+                music_crc=int.from_bytes(
+                    frame[lame + LAME_MUSIC_CRC_OFFSET:lame + LAME_MUSIC_CRC_OFFSET + 2], 'big'
+                ),
+                header_frame=frame,
+            )
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    offsets = _mp3_frame_offsets(data)
+    if not offsets:
+        raise ValueError(f"No MP3 frames in {path}")
+    bitrates = {data[offset + 2] >> 4 for offset in offsets}
+    return Mp3Layout(
+        path=path,
+        audio_start=start + offsets[0],
+        audio_end=end,
+        frames=len(offsets),
+        toc=[
+            min(255, (offsets[len(offsets) * percent // 100] - offsets[0]) * 256
+                // (len(data) - offsets[0]))
+            for percent in range(XING_TOC_SIZE)
+        ],
+        delay=LAME_ENCODER_DELAY,
+        padding=0,  # Unknown without a LAME tag
+        vbr=len(bitrates) > 1,
+    )
+
+
+def _join_mp3(parts: List[Mp3Layout], output_path: str) -> None:
+    """
+    Join MP3 files by copying their audio frames, behind one new Xing/LAME
+    header built from the parts' headers: frame and byte counts, merged
+    seek table and music CRC, the first part's encoder delay and the last
+    part's padding. The parts must share sample rate and channel mode and
+    at least one must have a LAME header to use as the template.
+    """
+    template = next((part.header_frame for part in parts if part.header_frame), None)
+    if template is None:
+        raise ValueError("No Xing/LAME header to build the joined header from")
+
+    header = bytearray(template)
+    xing = 4 + (17 if (header[3] >> 6) & 0x3 == 0x3 else 32)
+    lame = xing + LAME_TAG_OFFSET
+    sizes = [part.audio_end - part.audio_start for part in parts]
+    frames = sum(part.frames for part in parts)
+    total = len(header) + sum(sizes)
+
+    # Seek table: byte position at each percent of the joined duration,
+    # interpolated within the part that percent falls in
+    toc = bytearray()
+    for percent in range(XING_TOC_SIZE):
+        target = frames * percent / 100
+        offset = len(header)
+        for part, size in zip(parts, sizes):
+            if target < part.frames or part is parts[-1]:
+                position = min(target / part.frames * 100, 99.999) if part.frames else 0
+                index = int(position)
+                after = part.toc[index + 1] if index + 1 < XING_TOC_SIZE else 256
+                fraction = part.toc[index] + (after - part.toc[index]) * (position - index)
+                offset += size * fraction / 256
+                break
+            target -= part.frames
+            offset += size
+        toc.append(min(255, int(offset * 256 / total)))
+
+    music_crc = 0
+    if all(part.music_crc is not None for part in parts):
+        for part, size in zip(parts, sizes):
+            music_crc = _crc16_zeros(music_crc, size) ^ part.music_crc
+
+    header[xing:xing + 4] = b'Xing' if any(part.vbr for part in parts) else b'Info'
+    header[xing + 8:xing + 12] = frames.to_bytes(4, 'big')
+    header[xing + 12:xing + 16] = total.to_bytes(4, 'big')
+    header[xing + 16:xing + 16 + XING_TOC_SIZE] = toc
+    delay_padding = (parts[0].delay << 12) | parts[-1].padding
+    header[lame + LAME_DELAY_OFFSET:lame + LAME_DELAY_OFFSET + 3] = delay_padding.to_bytes(3, 'big')
+    header[lame + LAME_MUSIC_LENGTH_OFFSET:lame + LAME_MUSIC_LENGTH_OFFSET + 4] = total.to_bytes(4, 'big')
+    header[lame + LAME_MUSIC_CRC_OFFSET:lame + LAME_MUSIC_CRC_OFFSET + 2] = music_crc.to_bytes(2, 'big')
+    # The tag CRC covers the frame up to the CRC itself
+    tag_crc = _crc16(header[:lame + LAME_TAG_CRC_OFFSET])
+    header[lame + LAME_TAG_CRC_OFFSET:lame + LAME_TAG_CRC_OFFSET + 2] = tag_crc.to_bytes(2, 'big')
+
+    with open(output_path, 'wb') as output:
+        output.write(header)
+        for part, size in zip(parts, sizes):
+            with open(part.path, 'rb') as f:
+                f.seek(part.audio_start)
+                while size > 0:
+                    chunk = f.read(min(size, 1024 * 1024))
+                    if not chunk:
+                        raise ValueError(f"{part.path} is shorter than its header says")
+                    output.write(chunk)
+                    size -= len(chunk)
+
+
+def _crc16(data: bytes, crc: int = 0) -> int:
+    """CRC-16/ARC, as used by the LAME tag."""
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ CRC16_POLY if crc & 1 else crc >> 1
+    return crc
+
+
+def _crc16_zeros(crc: int, count: int) -> int:
+    """
+    CRC-16/ARC state after `count` more zero bytes, in O(log count), so
+    that crc(a + b) = _crc16_zeros(crc(a), len(b)) ^ crc(b).
+    """
+    def apply(matrix: List[int], value: int) -> int:
+        result = 0
+        for bit in range(16):
+            if value >> bit & 1:
+                result ^= matrix[bit]
+        return result
+
+    # Shifting in one zero bit, as the image of each register bit
+    operator = [CRC16_POLY] + [1 << (bit - 1) for bit in range(1, 16)]
+    bits = count * 8
+    while bits:
+        if bits & 1:
+            crc = apply(operator, crc)
+        operator = [apply(operator, column) for column in operator]
+        bits >>= 1
+    return crc
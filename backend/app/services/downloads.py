@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.metrics import DOWNLOAD_CACHE_BYTES, DOWNLOAD_CACHE_REQUESTS
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks
+    fcntl = None
+
+# Each entry directory holds a lock file for as long as a job uses it, and
+# a marker naming the downloaded files once the download has completed
+LOCK_FILE = ".lock"
+COMPLETE_FILE = ".complete"
+# Partial downloads nobody has resumed for this long are dropped whatever
+# the budget
+PARTIAL_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+MB = 1024 * 1024
+
+
+class DownloadEntry:
+    """
+    One video's cached download, locked by the job using it. With the
+    cache turned off there is no directory and download() goes to the
+    job's scratch directory.
+    """
+
+    def __init__(self, url: str, path: Optional[str]):
+        self.url = url
+        self.path = path
+
+    @property
+    def complete(self) -> bool:
+        return self._files() is not None
+
+    def download(
+        self,
+        scratch_dir: str,
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ) -> Tuple[str, str]:
+        """
+        The source audio and thumbnail for the video: from the cache if it
+        was downloaded before, otherwise downloaded into the entry, resuming
+        any partial download a failed attempt left there. The thumbnail is
+        copied to scratch_dir, since it is used after the entry is released.
+        Returns (audio_path, thumbnail_path).
+        """
+        from app.services.youtube import YouTubeService
+
+        if self.path is None:
+            return YouTubeService.download_audio(self.url, scratch_dir, progress_callback)
+
+        files = self._files()
+        if files is not None:
+            DOWNLOAD_CACHE_REQUESTS.labels("hit").inc()
+            audio_path, thumbnail_path = files
+        else:
+            resumed = any(name.endswith(".part") for name in os.listdir(self.path))
+            DOWNLOAD_CACHE_REQUESTS.labels("resume" if resumed else "miss").inc()
+            audio_path, thumbnail_path = YouTubeService.download_audio(
+                self.url, self.path, progress_callback
+            )
+            self._mark_complete(audio_path, thumbnail_path)
+
+        if thumbnail_path:
+            copy = os.path.join(scratch_dir, os.path.basename(thumbnail_path))
+            shutil.copyfile(thumbnail_path, copy)
+            thumbnail_path = copy
+        return audio_path, thumbnail_path
+
+    def _files(self) -> Optional[Tuple[str, str]]:
+        """(audio_path, thumbnail_path) of a completed download, else None."""
+        if self.path is None:
+            return None
+        try:
+            with open(os.path.join(self.path, COMPLETE_FILE)) as f:
+                names = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        audio_path = os.path.join(self.path, names["audio"])
+        if not os.path.exists(audio_path):
+            return None
+        thumbnail_path = os.path.join(self.path, names["thumbnail"]) if names.get("thumbnail") else ""
+        return audio_path, thumbnail_path
+
+    def _mark_complete(self, audio_path: str, thumbnail_path: str) -> None:
+        marker = os.path.join(self.path, COMPLETE_FILE)
+        with open(f"{marker}.tmp", "w") as f:
+            json.dump({
+                "audio": os.path.basename(audio_path),
+                "thumbnail": os.path.basename(thumbnail_path) if thumbnail_path else "",
+            }, f)
+        os.replace(f"{marker}.tmp", marker)
+
+
+class DownloadCache:
+    """
+    Source audio downloaded from YouTube, kept between jobs in one
+    directory per video and yt-dlp format, so a job that is retried
+    resumes yt-dlp's .part file instead of starting over, and a video
+    processed again (other crop, encoding or loudness settings) is not
+    downloaded again.
+
+    An entry is locked (flock) by the job using it, from download to the
+    end of encoding. Completed entries are evicted least recently used
+    first while the cache is over download_cache_mb; entries in use never
+    are. Partial downloads count against the budget too, and are dropped
+    after PARTIAL_MAX_AGE_SECONDS unused.
+    """
+
+    def __init__(self, root: Optional[str] = None, budget_mb: Optional[int] = None):
+        settings = get_settings()
+        self.root = root or settings.download_cache_dir or os.path.join(
+            tempfile.gettempdir(), 'speech2pod-downloads'
+        )
+        self.budget = (settings.download_cache_mb if budget_mb is None else budget_mb) * MB
+        self._lock = threading.Lock()
+        self._in_use = set()  # entry directories used by this process
+        if self.enabled:
+            os.makedirs(self.root, exist_ok=True)
+            DOWNLOAD_CACHE_BYTES.set_function(
+                lambda: sum(_entry_size(path) for path in self._entries())
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+
+    @contextmanager
+    def entry(self, url: str) -> Iterator[DownloadEntry]:
+        """
+        Lock and yield the cache entry for a video, waiting while another
+        job holds it. The cache is trimmed to its budget afterwards.
+        """
+        from app.services.youtube import YouTubeService
+
+        if not self.enabled:
+            yield DownloadEntry(url, None)
+            return
+
+        video_id = YouTubeService.extract_video_id(url) or hashlib.sha256(url.encode()).hexdigest()[:16]
+        path = os.path.join(self.root, self.key(video_id, get_settings().youtube_audio_format))
+        fd = self._open_locked(path)
+        with self._lock:
+            self._in_use.add(path)
+        try:
+            # The lock file's mtime is the entry's last use
+            os.utime(os.path.join(path, LOCK_FILE))
+            yield DownloadEntry(url, path)
+        finally:
+            with self._lock:
+                self._in_use.discard(path)
+            os.close(fd)
+        self.evict()
+
+    @staticmethod
+    def key(video_id: str, audio_format: str) -> str:
+        """Entry directory name: the video and a digest of the format selector."""
+        return f"{video_id}.{hashlib.sha256(audio_format.encode()).hexdigest()[:12]}"
+
+    def evict(self) -> int:
+        """
+        Remove entries not in use, stale partial downloads first and then
+        least recently used, until the cache is within budget. Returns how
+        many were removed.
+        """
+        now = time.time()
+        entries = []
+        for path in self._entries():
+            used = _last_used(path)
+            complete = DownloadEntry("", path).complete
+            entries.append((complete or now - used < PARTIAL_MAX_AGE_SECONDS, used, path))
+        total = sum(_entry_size(path) for _, _, path in entries)
+
+        removed = 0
+        for fresh, _, path in sorted(entries):
+            if fresh and total <= self.budget:
+                break
+            size = _entry_size(path)
+            if self._remove(path):
+                total -= size
+                removed += 1
+
+        if removed:
+            print(f"Evicted {removed} downloads from {self.root}")
+        return removed
+
+    def _entries(self) -> List[str]:
+        return [entry.path for entry in os.scandir(self.root) if entry.is_dir(follow_symlinks=False)]
+
+    def _open_locked(self, path: str) -> int:
+        """
+        Create the entry if needed and lock it, waiting for other jobs.
+        Retries if the entry was evicted while we waited for its lock.
+        """
+        lock_path = os.path.join(path, LOCK_FILE)
+        while True:
+            os.makedirs(path, exist_ok=True)
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_WRONLY, 0o600)
+            except FileNotFoundError:
+                continue
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_ino == os.stat(lock_path).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+    def _remove(self, path: str) -> bool:
+        """Delete an entry unless a job (here or in another process) has it."""
+        with self._lock:
+            if path in self._in_use:
+                return False
+        try:
+            fd = os.open(os.path.join(path, LOCK_FILE), os.O_CREAT | os.O_WRONLY, 0o600)
+        except FileNotFoundError:
+            return False
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+            shutil.rmtree(path, ignore_errors=True)
+            return True
+        finally:
+            os.close(fd)
+
+
+def _entry_size(path: str) -> int:
+    total = 0
+    try:
+        for entry in os.scandir(path):
+            try:
+                total += entry.stat(follow_symlinks=False).st_size
+            except FileNotFoundError:
+                pass
+    except FileNotFoundError:
+        pass
+    return total
+
+
+def _last_used(path: str) -> float:
+    try:
+        return os.path.getmtime(os.path.join(path, LOCK_FILE))
+    except FileNotFoundError:
+        return 0.0
+
+
+@lru_cache()
+def get_download_cache() -> DownloadCache:
+    return DownloadCache()
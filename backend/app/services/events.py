@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class JobEventBus:
+    """
+    In-process pub/sub for extraction job progress.
+
+    Background jobs publish from worker threads; SSE handlers subscribe from
+    the event loop. The latest event per job is kept so a new watcher gets
+    the current state without touching the database.
+    """
+
+    def __init__(self, max_jobs: int = 1000, queue_size: int = 32):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._latest: "OrderedDict[str, dict]" = OrderedDict()
+        self._max_jobs = max_jobs
+        self._queue_size = queue_size
+
+    def publish(self, job_id: str, status: str, **fields) -> None:
+        """Publish an event for a job. Safe to call from any thread."""
+        event = {"status": status, **fields}
+
+        with self._lock:
+            self._latest[job_id] = event
+            self._latest.move_to_end(job_id)
+            while len(self._latest) > self._max_jobs:
+                self._latest.popitem(last=False)
+            subscribers = list(self._subscribers.get(job_id, []))
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, event)
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Register a watcher. Must be called from the event loop."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(
+                (asyncio.get_running_loop(), queue)
+            )
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = [
+                entry for entry in self._subscribers.get(job_id, [])
+                if entry[1] is not queue
+            ]
+            if subscribers:
+                self._subscribers[job_id] = subscribers
+            else:
+                self._subscribers.pop(job_id, None)
+
+    def latest(self, job_id: str) -> Optional[dict]:
+        """Last event published for a job in this process, if any."""
+        with self._lock:
+            return self._latest.get(job_id)
+
+    def progress_reporter(
+        self,
+        job_id: str,
+        stage: str,
+        step: float = 0.01
+    ) -> Callable[[float], None]:
+        """
+        Return a callback taking a 0-1 fraction that publishes a progress
+        event for a processing stage, at most once per `step` of progress.
+        """
+        last = [-1.0]
+
+        def report(fraction: float) -> None:
+            fraction = max(0.0, min(1.0, fraction))
+            if fraction - last[0] >= step or (fraction == 1.0 and last[0] < 1.0):
+                last[0] = fraction
+                self.publish(job_id, "processing", stage=stage, progress=round(fraction, 3))
+
+        return report
+
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+    """Enqueue an event, dropping the oldest one if the watcher is behind."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+@lru_cache()
+def get_job_events() -> JobEventBus:
+    return JobEventBus()
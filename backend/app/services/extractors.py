@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Type, TypeVar
+
+from app.config import get_settings
+from app.services.metrics import (
+    EXTRACTOR_ATTEMPT_SECONDS,
+    EXTRACTOR_ATTEMPTS,
+    EXTRACTOR_BREAKER_OPEN,
+    record_attempt,
+)
+
+T = TypeVar("T")
+
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+)
+# User-Agent sent with each YouTube player client (others get DEFAULT_USER_AGENT)
+CLIENT_USER_AGENTS = {
+    'android': 'com.google.android.youtube/19.02.39 (Linux; U; Android 14) gzip',
+    'ios': 'com.google.ios.youtube/19.09.3 (iPhone14,3; U; CPU iOS 15_6 like Mac OS X)',
+}
+
+# Outcomes remembered per strategy: the last STRATEGY_WINDOW, none older
+# than STRATEGY_WINDOW_SECONDS
+STRATEGY_WINDOW = 20
+STRATEGY_WINDOW_SECONDS = 3600
+# Consecutive failures that open a strategy's circuit breaker, and how long
+# it stays open before one trial attempt is let through
+BREAKER_FAILURES = 3
+BREAKER_COOLDOWN_SECONDS = 300
+# yt-dlp errors about the video itself, which every player client gets
+# alike (lowercase substrings of the message)
+VIDEO_ERRORS = (
+    "private video",
+    "video unavailable",
+    "this video is unavailable",
+    "this video has been removed",
+    "video is no longer available",
+    "account associated with this video has been terminated",
+    "members-only",
+    "join this channel",
+    "not available in your country",
+    "uploader has not made this video available",
+    "this live event will begin",
+    "premieres in",
+)
+
+
+def is_video_error(message: str) -> bool:
+    """
+    Whether a yt-dlp error is the video's (private, removed, members-only,
+    geo-blocked, not live yet) rather than the player client's or the
+    network's (403s, bot checks, timeouts), which are what fallback and
+    the breakers are for.
+    """
+    message = message.lower()
+    return any(marker in message for marker in VIDEO_ERRORS)
+
+
+@dataclass(frozen=True)
+class ExtractorStrategy:
+    """How yt-dlp talks to YouTube: the player client and its User-Agent."""
+    name: str
+    player_client: str
+    user_agent: str
+
+
+@dataclass
+class _Outcome:
+    at: float
+    ok: bool
+    seconds: float
+
+
+class _StrategyHealth:
+    """Sliding window of outcomes and the circuit breaker for one strategy and format."""
+
+    def __init__(self):
+        self.outcomes: Deque[_Outcome] = deque(maxlen=STRATEGY_WINDOW)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record(self, ok: bool, seconds: float, now: float) -> None:
+        self.outcomes.append(_Outcome(now, ok, seconds))
+        if ok:
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+        else:
+            self.consecutive_failures += 1
+            # A failed trial after the cooldown opens it again at once
+            if self.consecutive_failures >= BREAKER_FAILURES:
+                self.open_until = now + BREAKER_COOLDOWN_SECONDS
+
+    def is_open(self, now: float) -> bool:
+        return now < self.open_until
+
+    def score(self, now: float) -> Tuple[float, float]:
+        """
+        (success rate, median seconds of successes) over the window. The
+        rate is smoothed so an untried strategy scores 0.5; latency is
+        infinite until there is a success.
+        """
+        recent = [o for o in self.outcomes if now - o.at <= STRATEGY_WINDOW_SECONDS]
+        successes = sorted(o.seconds for o in recent if o.ok)
+        rate = (len(successes) + 1) / (len(recent) + 2)
+        latency = successes[len(successes) // 2] if successes else float("inf")
+        return rate, latency
+
+
+class ExtractorSelector:
+    """
+    Chooses the yt-dlp strategy (player client) to try first, from each
+    strategy's recent success rate and latency for the format being
+    downloaded; ties keep the youtube_player_clients order.
+
+    A strategy that fails BREAKER_FAILURES times in a row is skipped for
+    BREAKER_COOLDOWN_SECONDS, then given one trial. When every strategy is
+    open, only the one that opened first is tried, so jobs fail fast.
+    Errors about the video itself (is_video_error) count against no
+    strategy and are raised without trying another. Outcomes are kept per
+    process.
+    """
+
+    def __init__(self, clients: Optional[List[str]] = None):
+        if clients is None:
+            clients = [c.strip() for c in get_settings().youtube_player_clients.split(",") if c.strip()]
+        self.strategies = [
+            ExtractorStrategy(client, client, CLIENT_USER_AGENTS.get(client, DEFAULT_USER_AGENT))
+            for client in clients
+        ]
+        self._lock = threading.Lock()
+        self._health: Dict[Tuple[str, str], _StrategyHealth] = {}
+        for strategy in self.strategies:
+            EXTRACTOR_BREAKER_OPEN.labels(strategy.name).set_function(
+                lambda name=strategy.name: 1 if self._breaker_open(name) else 0
+            )
+
+    def ranked(self, audio_format: str) -> List[ExtractorStrategy]:
+        """Strategies to try for a format, best first; open breakers left out."""
+        now = time.time()
+        with self._lock:
+            health = {s: self._get(s, audio_format) for s in self.strategies}
+            closed = [s for s in self.strategies if not health[s].is_open(now)]
+            if not closed:
+                return [min(self.strategies, key=lambda s: health[s].open_until)]
+
+            def key(strategy: ExtractorStrategy):
+                rate, latency = health[strategy].score(now)
+                return -rate, latency
+
+            return sorted(closed, key=key)
+
+    def record(self, strategy: ExtractorStrategy, audio_format: str, ok: bool, seconds: float) -> None:
+        now = time.time()
+        with self._lock:
+            health = self._get(strategy, audio_format)
+            was_open = health.is_open(now)
+            health.record(ok, seconds, now)
+            opened = health.is_open(now)
+        EXTRACTOR_ATTEMPTS.labels(strategy.name, "success" if ok else "failure").inc()
+        EXTRACTOR_ATTEMPT_SECONDS.labels(strategy.name).observe(seconds)
+        if opened and not was_open:
+            print(f"yt-dlp client {strategy.name} failed {BREAKER_FAILURES} times in a row; "
+                  f"skipping it for {BREAKER_COOLDOWN_SECONDS}s")
+
+    def run(
+        self,
+        action: Callable[[ExtractorStrategy], T],
+        audio_format: str,
+        retry_on: Type[BaseException],
+        attempts: int,
+        retry_delay: float = 0.0,
+    ) -> T:
+        """
+        Call action(strategy) with the best strategy, falling back to the
+        next on retry_on errors, up to `attempts` calls. With fewer
+        strategies than attempts they are tried again, after retry_delay
+        times the round, unless breakers are open. Each attempt is
+        recorded here and in the current stage timing, except errors about
+        the video itself, which are raised at once. Raises the last error.
+        """
+        ranked = self.ranked(audio_format)
+        if len(ranked) < len(self.strategies):
+            # Some breakers are open: don't retry the rest over and over
+            attempts = min(attempts, len(ranked))
+        for attempt in range(attempts):
+            strategy = ranked[attempt % len(ranked)]
+            if attempt and attempt % len(ranked) == 0:
+                time.sleep(retry_delay * (attempt // len(ranked)))
+            started = time.perf_counter()
+            try:
+                result = action(strategy)
+            except retry_on as e:
+                if is_video_error(str(e)):
+                    raise
+                seconds = time.perf_counter() - started
+                self.record(strategy, audio_format, False, seconds)
+                record_attempt({"client": strategy.name, "ok": False, "seconds": round(seconds, 3),
+                                "error": str(e)[-200:]})
+                if attempt == attempts - 1:
+                    raise
+                print(f"yt-dlp client {strategy.name} failed, trying again: {e}")
+                continue
+            seconds = time.perf_counter() - started
+            self.record(strategy, audio_format, True, seconds)
+            record_attempt({"client": strategy.name, "ok": True, "seconds": round(seconds, 3)})
+            return result
+
+    def _breaker_open(self, name: str) -> bool:
+        """Whether the strategy's breaker is open for any format right now."""
+        now = time.time()
+        with self._lock:
+            return any(
+                health.is_open(now) for (strategy, _), health in self._health.items() if strategy == name
+            )
+
+    def _get(self, strategy: ExtractorStrategy, audio_format: str) -> _StrategyHealth:
+        key = (strategy.name, audio_format)
+        if key not in self._health:
+            self._health[key] = _StrategyHealth()
+        return self._health[key]
+
+
+@lru_cache()
+def get_extractor_selector() -> ExtractorSelector:
+    return ExtractorSelector()
@@ -1,10 +1,108 @@
-from feedgen.feed import FeedGenerator
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import List
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+
+from sqlalchemy import Select, select
 
 from app.config import get_settings
 from app.models.episode import Episode, EpisodeStatus
 
+# Pollers may keep the feed this long (the route and the static copy)
+FEED_CACHE_CONTROL = "public, max-age=300"
+# A feed still changing after this long is published anyway
+FEED_MAX_DELAY_SECONDS = 60.0
+# A failed publish is tried again after this long, doubling up to the max
+FEED_RETRY_SECONDS = 5.0
+FEED_RETRY_MAX_SECONDS = 300.0
+# Feeds of one speaker's or one topic's episodes, by Episode.<kind>_slug
+SUB_FEEDS = ("speaker", "topic")
+# Rendered <item>s kept (about 1.5 KB each)
+FEED_ITEM_CACHE_ITEMS = 10000
+# Episode fields an <item> is rendered from; a change to any renders it again
+ITEM_FIELDS = (
+    "title", "speaker", "speech_date", "venue", "topic", "summary", "youtube_url",
+    "published_at", "created_at", "audio_url", "audio_duration", "thumbnail_url", "renditions",
+)
+_item_fields = attrgetter(*ITEM_FIELDS)
+
+
+def published_episodes(kind: Optional[str] = None, slug: Optional[str] = None) -> Select:
+    """The feed's episodes, newest first; a sub-feed's with kind and slug."""
+    query = select(Episode).where(Episode.status == EpisodeStatus.PUBLISHED)
+    if kind is not None:
+        query = query.where(getattr(Episode, f"{kind}_slug") == slug)
+    return query.order_by(Episode.published_at.desc())
+
+
+def sub_feed_prefix(kind: str) -> str:
+    """Common start of every sub_feed_key of a kind."""
+    return f"feed/{kind}/"
+
+
+def sub_feed_key(kind: str, slug: str) -> str:
+    """Path of a sub-feed under the API's base URL, and its static copy's key."""
+    return f"{sub_feed_prefix(kind)}{slug}.xml"
+
+
+class FeedItemCache:
+    """
+    Rendered <item>s by episode, shared by the main feed and the speaker
+    and topic feeds, so an episode is rendered once however many feeds it
+    is in, and again only when a field it is rendered from changes. Least
+    recently used items are dropped beyond max_items.
+    """
+
+    def __init__(self, max_items: int = FEED_ITEM_CACHE_ITEMS):
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[int, Tuple[tuple, bytes]]" = OrderedDict()
+
+    def items(
+        self,
+        episodes: List[Episode],
+        versions: List[tuple],
+        render: Callable[[Episode], bytes],
+    ) -> List[bytes]:
+        """Each episode's <item>, rendering those not cached at their version."""
+        # Imported here, so the feed replica doesn't load prometheus_client to start
+        from app.services.metrics import FEED_ITEM_CACHE_REQUESTS
+
+        with self._lock:
+            found = []
+            for episode, version in zip(episodes, versions):
+                entry = self._items.get(episode.id)
+                if entry is not None and entry[0] == version:
+                    self._items.move_to_end(episode.id)
+                    found.append(entry[1])
+                else:
+                    found.append(None)
+
+        # Rendered outside the lock: other feeds go on meanwhile
+        misses = [i for i, item in enumerate(found) if item is None]
+        for i in misses:
+            found[i] = render(episodes[i])
+
+        if misses:
+            with self._lock:
+                for i in misses:
+                    self._items[episodes[i].id] = (versions[i], found[i])
+                    self._items.move_to_end(episodes[i].id)
+                while len(self._items) > self.max_items:
+                    self._items.popitem(last=False)
+        FEED_ITEM_CACHE_REQUESTS.labels("hit").inc(len(episodes) - len(misses))
+        FEED_ITEM_CACHE_REQUESTS.labels("miss").inc(len(misses))
+        return found
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
 
 class FeedService:
     """Service for generating iTunes-compatible RSS podcast feed."""
@@ -12,18 +110,46 @@ class FeedService:
     def __init__(self):
         self.settings = get_settings()
 
-    def generate_feed(self, episodes: List[Episode]) -> str:
-        """Generate RSS feed XML from published episodes."""
+    @property
+    def feed_url(self) -> str:
+        """Where subscribers fetch the feed: the static copy, if it is published."""
+        if self.settings.static_feed:
+            return f"{self.settings.r2_public_url.rstrip('/')}/{self.settings.static_feed_key}"
+        return f"{self.settings.podcast_base_url.rstrip('/')}/api/feed.xml"
+
+    def sub_feed_url(self, kind: str, slug: str) -> str:
+        """Where subscribers fetch a speaker or topic feed."""
+        if self.settings.static_feed:
+            return f"{self.settings.r2_public_url.rstrip('/')}/{sub_feed_key(kind, slug)}"
+        return f"{self.settings.podcast_base_url.rstrip('/')}/{sub_feed_key(kind, slug)}"
+
+    def sub_feed_title(self, kind: str, episode: Episode) -> str:
+        """A sub-feed's title, from the speaker or topic of one of its episodes."""
+        return f"{self.settings.podcast_title}: {getattr(episode, kind)}"
+
+    def generate_feed(
+        self,
+        episodes: List[Episode],
+        title: Optional[str] = None,
+        feed_url: Optional[str] = None,
+    ) -> str:
+        """
+        Generate RSS feed XML from published episodes: the main feed, or a
+        sub-feed with its own title and URL.
+        """
+        from feedgen.feed import FeedGenerator
+        from lxml import etree
+
         fg = FeedGenerator()
         fg.load_extension('podcast')
 
         # Basic feed info
         base_url = self.settings.podcast_base_url.rstrip('/')
         fg.id(f"{base_url}/feed.xml")
-        fg.title(self.settings.podcast_title)
+        fg.title(title or self.settings.podcast_title)
         fg.description(self.settings.podcast_description)
         fg.link(href=base_url, rel='alternate')
-        fg.link(href=f"{base_url}/api/feed.xml", rel='self')
+        fg.link(href=feed_url or self.feed_url, rel='self')
         fg.language('en')
 
         # Podcast-specific metadata
@@ -47,14 +173,40 @@ class FeedService:
             if ep.status == EpisodeStatus.PUBLISHED
         ]
 
-        for episode in published_episodes:
-            self._add_episode(fg, episode)
+        # The last change rather than now, so an unchanged feed renders the
+        # same bytes (and ETag)
+        changed = [
+            moment for ep in published_episodes
+            for moment in (ep.updated_at, ep.published_at, ep.created_at) if moment
+        ]
+        if changed:
+            last = max(_utc(moment) for moment in changed)
+            fg.lastBuildDate(last)
+
+        # The channel, then each episode's <item> from the shared cache, in
+        # the order feedgen's add_entry() (which prepends) would give them
+        feed = etree.fromstring(fg.rss_str())
+        channel = feed.find('channel')
+        versions = [self._item_version(ep) for ep in published_episodes]
+        items = get_feed_item_cache().items(published_episodes, versions, self._render_item)
+        for item in reversed(items):
+            channel.append(etree.fromstring(item))
+
+        return etree.tostring(
+            feed, pretty_print=True, xml_declaration=True, encoding='UTF-8'
+        ).decode('utf-8')
 
-        return fg.rss_str(pretty=True).decode('utf-8')
+    def _item_version(self, episode: Episode) -> tuple:
+        """What an episode's <item> is rendered from, settings included."""
+        return (self.settings.feed_profile, self.settings.podcast_author) + _item_fields(episode)
 
-    def _add_episode(self, fg: FeedGenerator, episode: Episode) -> None:
-        """Add a single episode to the feed."""
-        fe = fg.add_entry()
+    def _render_item(self, episode: Episode) -> bytes:
+        """A single episode's <item>."""
+        from feedgen.entry import FeedEntry
+        from lxml import etree
+
+        fe = FeedEntry()
+        fe.load_extension('podcast')
 
         # Basic episode info
         fe.id(str(episode.id))
@@ -85,22 +237,12 @@ class FeedService:
 
         # Publication date - ensure timezone info is present
         pub_date = episode.published_at or episode.created_at or datetime.now(timezone.utc)
-        if pub_date.tzinfo is None:
-            pub_date = pub_date.replace(tzinfo=timezone.utc)
-        fe.pubDate(pub_date)
+        fe.pubDate(_utc(pub_date))
 
         # Audio enclosure
-        if episode.audio_url:
-            # Calculate file size estimate (bitrate * duration / 8)
-            duration_sec = episode.audio_duration or 0
-            # 192kbps = 24000 bytes/sec
-            file_size = int(duration_sec * 24000) if duration_sec else 0
-
-            fe.enclosure(
-                url=episode.audio_url,
-                length=str(file_size),
-                type='audio/mpeg'
-            )
+        enclosure = self._enclosure(episode)
+        if enclosure:
+            fe.enclosure(**enclosure)
 
         # iTunes-specific
         fe.podcast.itunes_author(episode.speaker or self.settings.podcast_author)
@@ -125,3 +267,187 @@ class FeedService:
             fe.podcast.itunes_image(episode.thumbnail_url)
 
         fe.podcast.itunes_explicit('no')
+        return etree.tostring(fe.rss_entry())
+
+    def _enclosure(self, episode: Episode) -> Optional[dict]:
+        """
+        The rendition the feed points at: settings.feed_profile when the
+        episode has it, otherwise audio_url; with intro/outro assembled in,
+        if it has been. Episodes from before encoding profiles have no
+        renditions and get a 192 kbps MP3 size estimate.
+        """
+        renditions = json.loads(episode.renditions) if episode.renditions else {}
+        chosen = renditions.get(self.settings.feed_profile)
+        if chosen is None:
+            if not episode.audio_url:
+                return None
+            chosen = next(
+                (entry for entry in renditions.values() if entry["url"] == episode.audio_url),
+                None
+            )
+        if chosen is not None:
+            audio = chosen.get("assembled", chosen)
+            return {
+                "url": audio["url"],
+                "length": str(audio["bytes"]),
+                "type": chosen["content_type"],
+            }
+
+        # Calculate file size estimate (bitrate * duration / 8)
+        duration_sec = episode.audio_duration or 0
+        # 192kbps = 24000 bytes/sec
+        file_size = int(duration_sec * 24000) if duration_sec else 0
+        return {"url": episode.audio_url, "length": str(file_size), "type": "audio/mpeg"}
+
+
+class FeedPublisher:
+    """
+    Publishes the feed as a static file in R2 (settings.static_feed_key),
+    with the speaker and topic feeds beside it (sub_feed_key), so podcast
+    apps poll the bucket or its CDN instead of the API.
+
+    Episode changes call schedule(); the feeds are rendered and uploaded
+    once they have stopped for static_feed_debounce seconds (at most
+    FEED_MAX_DELAY_SECONDS after the first), on a background thread. A
+    publish that fails is tried again with backoff (FEED_RETRY_SECONDS up
+    to FEED_RETRY_MAX_SECONDS) rather than waiting for the next change. A
+    file's upload is skipped when its SHA-256 matches the one in the
+    published object's metadata, read back on every publish since other
+    replicas publish too, so its ETag and Last-Modified only change with
+    the feed. Sub-feeds in the bucket that are left without episodes are
+    deleted, whichever replica or earlier process published them.
+    """
+
+    def __init__(self, debounce: Optional[float] = None):
+        settings = get_settings()
+        self.settings = settings
+        self.debounce = settings.static_feed_debounce if debounce is None else debounce
+        self._condition = threading.Condition()
+        self._first: Optional[float] = None  # first change not yet published
+        self._due: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.static_feed
+
+    def schedule(self) -> None:
+        """Note that episodes changed. Returns at once."""
+        if not self.enabled:
+            return
+        with self._condition:
+            now = time.monotonic()
+            if self._first is None:
+                self._first = now
+            self._due = min(now + self.debounce, self._first + FEED_MAX_DELAY_SECONDS)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="feed-publisher", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def pending(self) -> bool:
+        """Whether changes are waiting to be published."""
+        with self._condition:
+            return self._due is not None
+
+    def publish(self) -> int:
+        """Render the feeds and upload those that changed. Returns how many were uploaded."""
+        from app.database import SessionLocal
+        from app.services.metrics import FEED_PUBLISHES
+        from app.services.storage import StorageService
+
+        db = SessionLocal()
+        try:
+            episodes = db.scalars(published_episodes()).all()
+            feeds = self.render(episodes)
+        finally:
+            db.close()
+
+        storage = StorageService()
+        uploaded = 0
+        for key, feed_xml in feeds.items():
+            data = feed_xml.encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()
+            if digest == storage.get_metadata(key).get("sha256"):
+                FEED_PUBLISHES.labels("unchanged").inc()
+                continue
+
+            storage.upload_bytes(
+                data,
+                key,
+                "application/rss+xml",
+                cache_control=FEED_CACHE_CONTROL,
+                metadata={"sha256": digest},
+            )
+            FEED_PUBLISHES.labels("uploaded").inc()
+            uploaded += 1
+
+        for kind in SUB_FEEDS:
+            for key in storage.list_keys(sub_feed_prefix(kind)):
+                if key.endswith(".xml") and key not in feeds:
+                    storage.delete_file(key)
+
+        if uploaded:
+            print(f"Published {uploaded} of {len(feeds)} feeds ({len(episodes)} episodes)")
+        return uploaded
+
+    def render(self, episodes: List[Episode]) -> Dict[str, str]:
+        """The main feed and every speaker and topic feed of episodes, by key."""
+        service = FeedService()
+        feeds = {self.settings.static_feed_key: service.generate_feed(episodes)}
+        for kind in SUB_FEEDS:
+            groups: Dict[str, List[Episode]] = {}
+            for episode in episodes:
+                slug = getattr(episode, f"{kind}_slug")
+                if slug:
+                    groups.setdefault(slug, []).append(episode)
+            for slug, group in groups.items():
+                feeds[sub_feed_key(kind, slug)] = service.generate_feed(
+                    group,
+                    title=service.sub_feed_title(kind, group[0]),
+                    feed_url=service.sub_feed_url(kind, slug),
+                )
+        return feeds
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            with self._condition:
+                while self._due is None or self._due > time.monotonic():
+                    timeout = None if self._due is None else self._due - time.monotonic()
+                    self._condition.wait(timeout)
+                self._first = self._due = None
+            try:
+                self.publish()
+                failures = 0
+            except Exception as e:
+                from app.services.metrics import FEED_PUBLISHES
+                FEED_PUBLISHES.labels("failed").inc()
+                delay = min(FEED_RETRY_SECONDS * 2 ** failures, FEED_RETRY_MAX_SECONDS)
+                failures += 1
+                print(f"Publishing the feed failed, trying again in {delay:.0f}s: {e}")
+                self._retry(delay)
+
+    def _retry(self, delay: float) -> None:
+        """Publish again after delay, unless a change has it due sooner."""
+        with self._condition:
+            now = time.monotonic()
+            if self._due is None:
+                self._first = now
+                self._due = now + delay
+            self._condition.notify_all()
+
+
+def _utc(moment: datetime) -> datetime:
+    # SQLite keeps UTC without an offset
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+@lru_cache()
+def get_feed_item_cache() -> FeedItemCache:
+    return FeedItemCache()
+
+
+@lru_cache()
+def get_feed_publisher() -> FeedPublisher:
+    return FeedPublisher()
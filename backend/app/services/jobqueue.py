@@ -0,0 +1,390 @@
+import hashlib
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import and_, exists, func, or_, select, update
+from sqlalchemy.orm import aliased
+
+from app.config import get_settings
+from app.models.episode import ExtractionJob, JobPriority, JobStatus
+
+# Identifies this process in extraction_jobs.claimed_by
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}"
+# Jobs that still need a node to run them
+ACTIVE_STATUSES = (JobStatus.PENDING, JobStatus.PROCESSING)
+# Candidates tried per claim where there is no SKIP LOCKED
+CLAIM_CANDIDATES = 10
+# Namespace for the per-video advisory lock keys
+ADVISORY_LOCK_PREFIX = "speech2pod:video:"
+
+
+class JobClaimError(RuntimeError):
+    """The job is leased by another node, or its video is being processed elsewhere."""
+
+
+class VideoBusy(JobClaimError):
+    """Another job for the same video is running; this one can run after it."""
+
+
+class JobLeaseLost(JobClaimError):
+    """Our lease on a running job expired and another node claimed it."""
+
+
+class JobLease:
+    """
+    A claimed job. Renews its lease in the background until released; on
+    PostgreSQL it also holds the advisory lock for the job's video.
+    """
+
+    def __init__(self, queue: "JobQueue", job_id: str, lock_connection=None, lock_key: int = 0):
+        self.queue = queue
+        self.job_id = job_id
+        self.lost = False
+        self._lock_connection = lock_connection
+        self._lock_key = lock_key
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(
+            target=self._renew, name=f"lease-{job_id}", daemon=True
+        )
+        self._heartbeat.start()
+
+    def check(self) -> None:
+        """Raise JobLeaseLost if another node has taken the job over."""
+        if self.lost:
+            raise JobLeaseLost("lease lost to another node")
+
+    def update(self, **values) -> None:
+        """
+        Write to the job row only while this node holds it; raises
+        JobLeaseLost (and stops renewing) if it no longer does.
+        """
+        self.check()
+        if not self.queue.update_job(self.job_id, **values):
+            self.lost = True
+            raise JobLeaseLost("lease lost to another node")
+
+    def release(self) -> None:
+        """Stop renewing, end the lease and drop the video lock."""
+        self._stop.set()
+        self._heartbeat.join()
+        try:
+            self.queue.release(self.job_id)
+        finally:
+            if self._lock_connection is not None:
+                self.queue.unlock_video(self._lock_connection, self._lock_key)
+
+    def _renew(self) -> None:
+        interval = get_settings().job_lease_seconds / 3
+        while not self._stop.wait(interval):
+            try:
+                if not self.queue.renew(self.job_id):
+                    # Expired and claimed by another node; it will run the job again
+                    self.lost = True
+                    print(f"Job {self.job_id}: lease lost to another node")
+                    return
+            except Exception as e:
+                print(f"Job {self.job_id}: could not renew lease: {e}")
+
+
+class JobQueue:
+    """
+    Extraction jobs as a queue shared by every node that runs them.
+
+    A node claims a job by writing its NODE_ID and a lease expiry to the
+    row, and renews the lease while the job runs. A job whose lease has
+    expired (its node died) can be claimed again, up to job_max_attempts.
+
+    On PostgreSQL, claim_next() picks the job with SELECT ... FOR UPDATE
+    SKIP LOCKED, so concurrent claimers never wait on each other, and a
+    session advisory lock per youtube_id keeps two nodes off the same
+    video. Elsewhere (SQLite) claims are compare-and-set UPDATEs; SQLite
+    serializes writers, so the same-video check in the UPDATE holds.
+    """
+
+    def __init__(self, node_id: str = NODE_ID):
+        from app.database import SessionLocal, engine
+
+        self.node_id = node_id
+        self.session_factory = SessionLocal
+        self.engine = engine
+        self.postgres = engine.dialect.name == "postgresql"
+
+    def claim_next(self, priority: Optional[JobPriority] = None) -> Optional[str]:
+        """
+        Claim a runnable job for this node, of one priority class if given:
+        the oldest of the tenant with fewest jobs running. Returns its id,
+        or None.
+        """
+        self.fail_abandoned()
+        db = self.session_factory()
+        try:
+            now = self._now()
+            runnable = self._runnable(now, priority)
+            order = (self._tenant_load(ExtractionJob, now), ExtractionJob.created_at)
+            if self.postgres:
+                candidate = (
+                    select(ExtractionJob.id)
+                    .where(runnable)
+                    .order_by(*order)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                    .scalar_subquery()
+                )
+                job_id = db.execute(
+                    update(ExtractionJob)
+                    .where(ExtractionJob.id == candidate)
+                    .values(claimed_by=self.node_id, lease_expires_at=self._expiry(now))
+                    .returning(ExtractionJob.id)
+                ).scalar()
+                db.commit()
+                return job_id
+
+            candidates = db.scalars(
+                select(ExtractionJob.id)
+                .where(runnable)
+                .order_by(*order)
+                .limit(CLAIM_CANDIDATES)
+            ).all()
+            db.rollback()
+            for job_id in candidates:
+                if self._set_claim(db, job_id, count_attempt=False, reentrant=False):
+                    return job_id
+            return None
+        finally:
+            db.close()
+
+    def has_runnable(self, priority: Optional[JobPriority] = None) -> bool:
+        """Whether any job (of the class) is waiting to be claimed."""
+        db = self.session_factory()
+        try:
+            now = self._now()
+            return db.scalar(select(exists().where(self._runnable(now, priority))))
+        finally:
+            db.close()
+
+    def acquire(
+        self, job_id: str, youtube_id: Optional[str], retry_in: Optional[float] = None
+    ) -> JobLease:
+        """
+        Claim a specific job (already ours, unclaimed or with an expired
+        lease) for one attempt. Raises VideoBusy if another job holds its
+        video, after which the job can be claimed again in retry_in seconds
+        (default: job_retry_delay), or JobClaimError if another node holds it.
+        """
+        db = self.session_factory()
+        try:
+            if not self._set_claim(db, job_id, count_attempt=True):
+                if self._video_blocked(db, job_id):
+                    raise VideoBusy(f"Video {youtube_id} is being processed by another job")
+                raise JobClaimError(f"Job {job_id} is claimed by another node")
+        finally:
+            db.close()
+
+        if not (self.postgres and youtube_id):
+            return JobLease(self, job_id)
+
+        key = _advisory_key(youtube_id)
+        connection = self.engine.connect()
+        try:
+            locked = connection.execute(select(func.pg_try_advisory_lock(key))).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not locked:
+            connection.close()
+            # Run it once the other node is done with the video
+            if retry_in is None:
+                retry_in = get_settings().job_retry_delay
+            self.release(job_id, retry_in=retry_in, count_attempt=False)
+            raise VideoBusy(f"Video {youtube_id} is being processed by another node")
+        return JobLease(self, job_id, connection, key)
+
+    def renew(self, job_id: str) -> bool:
+        """Extend our lease. False if the job is no longer ours."""
+        return self._update(
+            and_(ExtractionJob.id == job_id, ExtractionJob.claimed_by == self.node_id),
+            lease_expires_at=self._expiry(self._now()),
+        )
+
+    def update_job(self, job_id: str, **values) -> bool:
+        """Set columns of a job this node holds. False if it is no longer ours."""
+        return self._update(
+            and_(ExtractionJob.id == job_id, ExtractionJob.claimed_by == self.node_id),
+            **values,
+        )
+
+    def fail_unclaimed(self, job_id: str, message: str) -> bool:
+        """Fail an active job no node holds. False if one has claimed it."""
+        return self._update(
+            and_(ExtractionJob.id == job_id, self._claimable(self._now())),
+            status=JobStatus.FAILED,
+            error_message=message,
+            completed_at=datetime.now(timezone.utc),
+        )
+
+    def release(self, job_id: str, retry_in: float = 0, count_attempt: bool = True) -> None:
+        """
+        End our lease; claimed_by is kept as a record of who ran the job. A
+        job that is still active can then be claimed again, or only after
+        retry_in seconds. count_attempt=False gives back the attempt.
+        """
+        values = {"lease_expires_at": None}
+        if retry_in:
+            values = {"claimed_by": None, "lease_expires_at": self._now() + timedelta(seconds=retry_in)}
+        if not count_attempt:
+            values["attempts"] = ExtractionJob.attempts - 1
+        self._update(
+            and_(ExtractionJob.id == job_id, ExtractionJob.claimed_by == self.node_id),
+            **values,
+        )
+
+    def fail_abandoned(self) -> int:
+        """
+        Fail active jobs whose node died holding them job_max_attempts
+        times, rather than retrying them forever. Returns how many.
+        """
+        settings = get_settings()
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(ExtractionJob)
+                .where(
+                    ExtractionJob.status.in_(ACTIVE_STATUSES),
+                    ExtractionJob.claimed_by.is_not(None),
+                    ExtractionJob.lease_expires_at < self._now(),
+                    ExtractionJob.attempts >= settings.job_max_attempts,
+                )
+                .values(
+                    status=JobStatus.FAILED,
+                    error_message=f"Abandoned after {settings.job_max_attempts} attempts",
+                    completed_at=datetime.now(timezone.utc),
+                    lease_expires_at=None,
+                )
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    @staticmethod
+    def unlock_video(connection, key: int) -> None:
+        try:
+            connection.execute(select(func.pg_advisory_unlock(key)))
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _set_claim(self, db, job_id: str, count_attempt: bool, reentrant: bool = True) -> bool:
+        """
+        Compare-and-set the claim on one job. reentrant=True also succeeds
+        if this node already holds it (claim_next() then acquire()).
+        """
+        now = self._now()
+        values = {"claimed_by": self.node_id, "lease_expires_at": self._expiry(now)}
+        if count_attempt:
+            values["attempts"] = ExtractionJob.attempts + 1
+        claimable = self._claimable(now)
+        if reentrant:
+            claimable = or_(claimable, and_(
+                ExtractionJob.status.in_(ACTIVE_STATUSES),
+                ExtractionJob.claimed_by == self.node_id,
+            ))
+        result = db.execute(
+            update(ExtractionJob)
+            .where(
+                ExtractionJob.id == job_id,
+                claimable,
+                self._video_free(ExtractionJob, now),
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    def _video_blocked(self, db, job_id: str) -> bool:
+        """Whether the job is free to claim but another job holds its video."""
+        now = self._now()
+        blocked = db.scalar(select(exists().where(
+            ExtractionJob.id == job_id,
+            self._claimable(now),
+            ~self._video_free(ExtractionJob, now),
+        )))
+        db.rollback()
+        return blocked
+
+    def _update(self, condition, **values) -> bool:
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(ExtractionJob).where(condition).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    @staticmethod
+    def _claimable(now):
+        return and_(
+            ExtractionJob.status.in_(ACTIVE_STATUSES),
+            or_(ExtractionJob.lease_expires_at.is_(None), ExtractionJob.lease_expires_at < now),
+        )
+
+    def _runnable(self, now, priority: Optional[JobPriority]):
+        runnable = and_(self._claimable(now), self._video_free(ExtractionJob, now))
+        if priority is not None:
+            runnable = and_(runnable, ExtractionJob.priority == priority)
+        return runnable
+
+    @staticmethod
+    def _tenant_load(job, now):
+        """Jobs of the same tenant leased right now."""
+        other = aliased(ExtractionJob)
+        return (
+            select(func.count())
+            .where(
+                other.tenant == job.tenant,
+                other.status.in_(ACTIVE_STATUSES),
+                other.claimed_by.is_not(None),
+                other.lease_expires_at >= now,
+            )
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def _video_free(job, now):
+        """No other job for the same video is leased right now."""
+        other = aliased(ExtractionJob)
+        return ~exists().where(
+            other.youtube_id == job.youtube_id,
+            other.id != job.id,
+            other.status.in_(ACTIVE_STATUSES),
+            other.claimed_by.is_not(None),
+            other.lease_expires_at >= now,
+        )
+
+    def _now(self):
+        """The database's clock on PostgreSQL, so nodes' clocks needn't agree."""
+        return func.now() if self.postgres else datetime.now(timezone.utc)
+
+    @staticmethod
+    def _expiry(now):
+        return now + timedelta(seconds=get_settings().job_lease_seconds)
+
+
+def _advisory_key(youtube_id: str) -> int:
+    """A stable signed 64-bit advisory lock key for a video."""
+    digest = hashlib.sha256(f"{ADVISORY_LOCK_PREFIX}{youtube_id}".encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+@lru_cache()
+def get_job_queue() -> JobQueue:
+    return JobQueue()
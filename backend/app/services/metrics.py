@@ -0,0 +1,242 @@
+import os
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Buckets span a few seconds (thumbnail) to hours (multi-hour downloads)
+STAGE_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 2400, 3600, 7200)
+
+STAGE_SECONDS = Histogram(
+    "speech2pod_extraction_stage_seconds",
+    "Wall-clock time spent in each extraction stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_BYTES = Counter(
+    "speech2pod_extraction_stage_bytes",
+    "Bytes produced by each extraction stage",
+    ["stage"],
+)
+JOB_SECONDS = Histogram(
+    "speech2pod_extraction_job_seconds",
+    "End-to-end extraction job time",
+    ["status"],
+    buckets=STAGE_BUCKETS,
+)
+JOBS_IN_FLIGHT = Gauge(
+    "speech2pod_extraction_jobs_in_flight",
+    "Extraction jobs currently being processed",
+)
+# Set from the database when /metrics is scraped
+QUEUE_DEPTH = Gauge(
+    "speech2pod_extraction_queue_depth",
+    "Extraction jobs accepted but not yet started (pending in the database)",
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "speech2pod_extraction_queue_wait_seconds",
+    "Time from accepting an extraction job to starting it, by priority class",
+    ["priority"],
+    buckets=STAGE_BUCKETS,
+)
+SCHEDULER_WAITING = Gauge(
+    "speech2pod_extraction_scheduler_waiting_jobs",
+    "Extraction jobs waiting for a slot in this process, by priority class",
+    ["priority"],
+)
+SCHEDULER_DEFERRALS = Counter(
+    "speech2pod_extraction_scheduler_deferrals",
+    "Times a running job gave up its slot to interactive work at a stage boundary",
+    ["priority"],
+)
+SUBPROCESS_CPU_SECONDS = Histogram(
+    "speech2pod_subprocess_cpu_seconds",
+    "User + system CPU time of external tools (FFmpeg, yt-dlp)",
+    ["tool"],
+    buckets=STAGE_BUCKETS,
+)
+SUBPROCESS_MAX_RSS_BYTES = Histogram(
+    "speech2pod_subprocess_max_rss_bytes",
+    "Peak resident memory of external tools (FFmpeg, yt-dlp)",
+    ["tool"],
+    buckets=tuple(2 ** n * 1024 * 1024 for n in range(4, 13)),  # 16 MiB - 4 GiB
+)
+EXTRACTOR_ATTEMPTS = Counter(
+    "speech2pod_extractor_attempts",
+    "yt-dlp attempts by player client and result",
+    ["client", "result"],
+)
+EXTRACTOR_ATTEMPT_SECONDS = Histogram(
+    "speech2pod_extractor_attempt_seconds",
+    "Time of each yt-dlp attempt, by player client",
+    ["client"],
+    buckets=STAGE_BUCKETS,
+)
+EXTRACTOR_BREAKER_OPEN = Gauge(
+    "speech2pod_extractor_breaker_open",
+    "1 while a player client's circuit breaker is open",
+    ["client"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "speech2pod_admission_in_flight",
+    "Admitted analyze and extract requests whose work has not finished",
+)
+ADMISSION_REJECTED = Counter(
+    "speech2pod_admission_rejected",
+    "Requests refused with 429, by endpoint and reason (rate_limited, overloaded)",
+    ["endpoint", "reason"],
+)
+FEED_PUBLISHES = Counter(
+    "speech2pod_feed_publishes",
+    "Static feed renders by result: uploaded, unchanged (skipped) or failed",
+    ["result"],
+)
+FEED_ITEM_CACHE_REQUESTS = Counter(
+    "speech2pod_feed_item_cache_requests",
+    "Episode <item>s of rendered feeds by outcome: hit (cached) or miss (rendered)",
+    ["result"],
+)
+SCRATCH_USED_BYTES = Gauge(
+    "speech2pod_scratch_used_bytes",
+    "Bytes in the worker scratch directory",
+)
+SCRATCH_FREE_BYTES = Gauge(
+    "speech2pod_scratch_free_bytes",
+    "Free bytes on the filesystem holding the scratch directory",
+)
+SCRATCH_JOBS = Gauge(
+    "speech2pod_scratch_jobs",
+    "Jobs holding a scratch directory",
+)
+SCRATCH_WAITING = Gauge(
+    "speech2pod_scratch_waiting_jobs",
+    "Jobs held until there is enough free scratch space",
+)
+DOWNLOAD_CACHE_BYTES = Gauge(
+    "speech2pod_download_cache_bytes",
+    "Bytes in the download cache",
+)
+DOWNLOAD_CACHE_REQUESTS = Counter(
+    "speech2pod_download_cache_requests",
+    "Source downloads by outcome: hit (cached), resume (partial) or miss",
+    ["result"],
+)
+SCRATCH_JOB_BYTES = Histogram(
+    "speech2pod_scratch_job_peak_bytes",
+    "Largest scratch usage measured per job",
+    buckets=tuple(2 ** n * 1024 * 1024 for n in range(4, 15)),  # 16 MiB - 16 GiB
+)
+
+# The span of the stage currently running, so subprocess usage can be
+# attributed to it
+_current_span: ContextVar[Optional[dict]] = ContextVar("current_span", default=None)
+
+
+class StageTimings:
+    """
+    Per-job record of stage durations, byte counts and subprocess usage.
+    Each stage is also observed in the Prometheus histograms.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, dict] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict]:
+        """
+        Time a stage. The yielded span dict may be given a "bytes" entry;
+        subprocesses run inside the stage add their CPU time and peak RSS.
+        """
+        span = self.stages.setdefault(name, {"seconds": 0.0})
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        bytes_before = span.get("bytes", 0)
+        try:
+            yield span
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_span.reset(token)
+            span["seconds"] = round(span["seconds"] + elapsed, 3)
+            STAGE_SECONDS.labels(name).observe(elapsed)
+            if span.get("bytes", 0) > bytes_before:
+                STAGE_BYTES.labels(name).inc(span["bytes"] - bytes_before)
+
+    def to_dict(self) -> Dict[str, dict]:
+        return dict(self.stages)
+
+
+def record_usage(
+    tool: str,
+    cpu_seconds: float,
+    max_rss_bytes: Optional[int] = None
+) -> None:
+    """Record an external tool's resource usage against the current stage."""
+    SUBPROCESS_CPU_SECONDS.labels(tool).observe(cpu_seconds)
+    if max_rss_bytes is not None:
+        SUBPROCESS_MAX_RSS_BYTES.labels(tool).observe(max_rss_bytes)
+
+    span = _current_span.get()
+    if span is not None:
+        span["cpu_seconds"] = round(span.get("cpu_seconds", 0.0) + cpu_seconds, 3)
+        if max_rss_bytes is not None:
+            span["max_rss_bytes"] = max(span.get("max_rss_bytes", 0), max_rss_bytes)
+
+
+def record_attempt(attempt: dict) -> None:
+    """Add one attempt (of a retried operation) to the current stage's "attempts"."""
+    span = _current_span.get()
+    if span is not None:
+        span.setdefault("attempts", []).append(attempt)
+
+
+def wait_measured(process: subprocess.Popen, tool: str) -> int:
+    """
+    process.wait(), reaping the child with os.wait4() to record its CPU
+    time and peak RSS under `tool`. Call it instead of wait() (nothing
+    else may wait for or poll the process first, or the usage is gone).
+    Returns the exit code.
+
+    On Linux a child's ru_maxrss starts from the parent's RSS at fork, so
+    peak RSS is an upper bound for small tools.
+    """
+    if process.returncode is not None or not hasattr(os, "wait4"):
+        return process.wait()
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in kilobytes on Linux
+    record_usage(tool, rusage.ru_utime + rusage.ru_stime, rusage.ru_maxrss * 1024)
+    return process.returncode
+
+
+def run_measured(
+    cmd: List[str],
+    tool: str,
+    check: bool = False,
+    capture_output: bool = False,
+    text: bool = False,
+) -> subprocess.CompletedProcess:
+    """
+    subprocess.run() equivalent that records the child's CPU and RSS.
+    Output is captured through temporary files rather than communicate(),
+    which would reap the child itself.
+    """
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        process = subprocess.Popen(
+            cmd, stdout=out if capture_output else None, stderr=err if capture_output else None
+        )
+        returncode = wait_measured(process, tool)
+        stdout = stderr = None
+        if capture_output:
+            out.seek(0)
+            err.seek(0)
+            stdout, stderr = out.read(), err.read()
+            if text:
+                stdout, stderr = stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)
@@ -0,0 +1,212 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Tuple
+from urllib.parse import urlparse
+
+from app.config import get_settings
+
+# Seconds between sweeps of client buckets that have refilled (forgotten)
+BUCKET_SWEEP_INTERVAL = 60.0
+# Compare-and-set rounds a database bucket update gets before giving up
+BUCKET_UPDATE_ATTEMPTS = 5
+
+# Hosts that are the same service as far as rate limits go
+DOMAIN_ALIASES = {
+    "youtu.be": "youtube.com",
+    "m.youtube.com": "youtube.com",
+    "music.youtube.com": "youtube.com",
+    "youtube-nocookie.com": "youtube.com",
+}
+
+
+def domain_of(url: str) -> str:
+    """The rate-limit key for a URL (or a bare host name)."""
+    host = (urlparse(url).hostname if "//" in url else url).lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return DOMAIN_ALIASES.get(host, host)
+
+
+class DomainRateLimiter:
+    """
+    Token bucket per domain: on average `per_minute` requests a minute to
+    any one domain, with bursts of up to `burst`. Thread-safe; acquire()
+    blocks the calling thread until its request may go.
+    """
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # domain -> (tokens, time)
+
+    def acquire(self, url: str) -> float:
+        """Wait for a slot for `url`'s domain. Returns the seconds waited."""
+        if not self.interval:
+            return 0.0
+
+        domain = domain_of(url)
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(domain, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) / self.interval)
+            # Take the token now, even if it is not there yet, so waiting
+            # callers queue up in order
+            tokens -= 1
+            self._buckets[domain] = (tokens, now)
+            wait = -tokens * self.interval if tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class ClientRateLimiter:
+    """
+    Token bucket per client key (endpoint and address): on average
+    `per_minute` requests a minute, with bursts of up to `burst`. Unlike
+    DomainRateLimiter it never waits: take() says how long until the
+    request would be allowed, and the caller turns the client away.
+    Buckets are kept in this process.
+    """
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.burst = max(burst, 1)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, time)
+        self._swept = time.monotonic()
+
+    def take(self, key: str) -> float:
+        """
+        Take a token for `key` if there is one. Returns 0, or the seconds
+        until a token is available (nothing is taken then).
+        """
+        if not self.interval:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            if now - self._swept > BUCKET_SWEEP_INTERVAL:
+                self._sweep(now)
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens, wait = _take(tokens, now - last, self.burst, self.interval)
+            self._buckets[key] = (tokens, now)
+        return wait
+
+    def _sweep(self, now: float) -> None:
+        # A bucket that has had time to refill is the same as no bucket
+        full = self.burst * self.interval
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if now - bucket[1] < full
+        }
+        self._swept = now
+
+
+class DatabaseRateLimiter(ClientRateLimiter):
+    """
+    ClientRateLimiter with the buckets in the rate_limit_buckets table, so
+    every API replica draws from the same ones. On PostgreSQL a bucket is
+    read and updated under its row lock (SELECT ... FOR UPDATE). Elsewhere
+    (SQLite) updates are compare-and-set on the bucket's timestamp; a
+    client that keeps losing the race is let through rather than held up.
+    """
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        from app.database import SessionLocal, engine
+
+        super().__init__(per_minute, burst)
+        self.session_factory = SessionLocal
+        self.postgres = engine.dialect.name == "postgresql"
+
+    def take(self, key: str) -> float:
+        from sqlalchemy import delete, select, update
+        from sqlalchemy.exc import IntegrityError
+        from app.models.ratelimit import RateLimitBucket
+
+        if not self.interval:
+            return 0.0
+
+        db = self.session_factory()
+        try:
+            now = time.time()
+            if time.monotonic() - self._swept > BUCKET_SWEEP_INTERVAL:
+                self._swept = time.monotonic()
+                db.execute(delete(RateLimitBucket).where(
+                    RateLimitBucket.updated_at < now - self.burst * self.interval
+                ))
+                db.commit()
+
+            if self.postgres:
+                return self._take_locked(db, key)
+
+            for _ in range(BUCKET_UPDATE_ATTEMPTS):
+                now = time.time()
+                bucket = db.execute(
+                    select(RateLimitBucket.tokens, RateLimitBucket.updated_at)
+                    .where(RateLimitBucket.key == key)
+                ).first()
+                db.rollback()
+                if bucket is None:
+                    tokens, wait = _take(self.burst, 0.0, self.burst, self.interval)
+                    db.add(RateLimitBucket(key=key, tokens=tokens, updated_at=now))
+                    try:
+                        db.commit()
+                        return wait
+                    except IntegrityError:  # another replica created it first
+                        db.rollback()
+                        continue
+
+                tokens, wait = _take(bucket.tokens, now - bucket.updated_at, self.burst, self.interval)
+                updated = db.execute(
+                    update(RateLimitBucket)
+                    .where(RateLimitBucket.key == key, RateLimitBucket.updated_at == bucket.updated_at)
+                    .values(tokens=tokens, updated_at=now)
+                ).rowcount
+                db.commit()
+                if updated:
+                    return wait
+            return 0.0
+        finally:
+            db.close()
+
+    def _take_locked(self, db, key: str) -> float:
+        from sqlalchemy import select, update
+        from sqlalchemy.dialects.postgresql import insert
+        from app.models.ratelimit import RateLimitBucket
+
+        now = time.time()
+        db.execute(
+            insert(RateLimitBucket)
+            .values(key=key, tokens=self.burst, updated_at=now)
+            .on_conflict_do_nothing(index_elements=[RateLimitBucket.key])
+        )
+        bucket = db.execute(
+            select(RateLimitBucket.tokens, RateLimitBucket.updated_at)
+            .where(RateLimitBucket.key == key)
+            .with_for_update()
+        ).one()
+        tokens, wait = _take(bucket.tokens, now - bucket.updated_at, self.burst, self.interval)
+        db.execute(
+            update(RateLimitBucket)
+            .where(RateLimitBucket.key == key)
+            .values(tokens=tokens, updated_at=max(now, bucket.updated_at))
+        )
+        db.commit()
+        return wait
+
+
+def _take(tokens: float, elapsed: float, burst: int, interval: float) -> Tuple[float, float]:
+    """Refill a bucket for `elapsed` seconds and take a token: (tokens left, seconds to wait)."""
+    tokens = min(burst, tokens + max(elapsed, 0.0) / interval)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) * interval
+
+
+@lru_cache()
+def get_client_rate_limiter() -> ClientRateLimiter:
+    settings = get_settings()
+    limiter = DatabaseRateLimiter if settings.rate_limit_backend == "database" else ClientRateLimiter
+    return limiter(settings.client_rate_per_minute, settings.client_rate_burst)
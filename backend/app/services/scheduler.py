@@ -0,0 +1,233 @@
+import itertools
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import get_settings
+from app.models.episode import JobPriority
+from app.services.metrics import SCHEDULER_DEFERRALS, SCHEDULER_WAITING
+
+# Share of job starts each class gets while both have jobs waiting
+PRIORITY_WEIGHTS = {JobPriority.INTERACTIVE: 4, JobPriority.BULK: 1}
+
+
+@dataclass
+class _Waiter:
+    priority: JobPriority
+    tenant: Optional[str]
+    order: int
+    granted: bool = False
+    # A running job that gave its slot to interactive work. It stays out of
+    # the way until an interactive job has started, then goes before new
+    # jobs of its class (it holds scratch space and finished stages).
+    resuming: bool = False
+    yielded: bool = False
+
+
+class JobScheduler:
+    """
+    The slots for extraction jobs one process runs at once
+    (worker_concurrency): the API in local mode, or a worker.
+
+    Slots go to waiting jobs weighted-fair across priority classes (start-
+    time fair queueing): each start moves its class's tag on by 1/weight,
+    and the waiting class with the lowest tag goes next, so interactive
+    jobs get PRIORITY_WEIGHTS[INTERACTIVE] starts for each bulk one.
+    Within a class, jobs resuming after a deferral go first, then the
+    tenant with fewest running jobs, then the longest waiting job.
+    interactive_reserved_slots are never given to other classes.
+
+    A running job is never interrupted. Lower-priority jobs call
+    checkpoint() between stages, where they give their slot to waiting
+    interactive work when it is the interactive class's turn, and wait to
+    be scheduled again.
+
+    A worker claims jobs from the database instead of waiting here: it asks
+    startable() which classes it may claim, then start()s them. demand()
+    tells checkpoint() whether interactive jobs are waiting in the database.
+    """
+
+    def __init__(
+        self,
+        slots: Optional[int] = None,
+        reserved: Optional[int] = None,
+        demand: Optional[Callable[[], bool]] = None
+    ):
+        settings = get_settings()
+        self.slots = max(slots or settings.worker_concurrency, 1)
+        if reserved is None:
+            reserved = settings.interactive_reserved_slots
+        # Other classes always keep at least one slot
+        self.reserved = max(min(reserved, self.slots - 1), 0)
+        self.weights = dict(PRIORITY_WEIGHTS)
+        self._demand = demand
+        self._condition = threading.Condition()
+        self._running: Dict[JobPriority, int] = defaultdict(int)
+        self._tenants: Dict[Tuple[JobPriority, Optional[str]], int] = defaultdict(int)
+        self._tags: Dict[JobPriority, float] = defaultdict(float)
+        self._clock = 0.0  # tag of the last start
+        self._waiting: List[_Waiter] = []
+        self._order = itertools.count()
+
+    @contextmanager
+    def slot(self, priority: JobPriority, tenant: Optional[str] = None) -> Iterator[None]:
+        """Wait for a slot for a job of this class, and hold it for the block."""
+        self.acquire(priority, tenant)
+        try:
+            yield
+        finally:
+            self.finish(priority, tenant)
+
+    def acquire(self, priority: JobPriority, tenant: Optional[str] = None) -> None:
+        """Wait for a slot. Pair with finish()."""
+        with self._condition:
+            self._wait_for_slot(_Waiter(priority, tenant, next(self._order)))
+
+    def start(self, priority: JobPriority, tenant: Optional[str] = None) -> None:
+        """Take a slot without waiting, for a class startable() returned."""
+        with self._condition:
+            self._start(priority, tenant)
+
+    def finish(self, priority: JobPriority, tenant: Optional[str] = None) -> None:
+        """Give back a slot and start whoever is next."""
+        with self._condition:
+            self._stop(priority, tenant)
+            self._dispatch()
+
+    def startable(self) -> List[JobPriority]:
+        """
+        Classes a job could start for right now, whose turn it is first.
+        Classes with jobs already waiting here are left out: they go first.
+        """
+        with self._condition:
+            waiting = {waiter.priority for waiter in self._waiting}
+            return [
+                priority for priority in self._by_turn(JobPriority)
+                if priority not in waiting and self._may_start(priority)
+            ]
+
+    def idle(self) -> None:
+        """
+        A worker found nothing to claim: jobs that yielded for interactive
+        work another node has taken get their slots back.
+        """
+        with self._condition:
+            for waiter in self._waiting:
+                waiter.yielded = False
+            self._dispatch()
+
+    def stats(self) -> Dict[str, int]:
+        """Slots, and jobs running and waiting for one."""
+        with self._condition:
+            return {
+                "slots": self.slots,
+                "running": sum(self._running.values()),
+                "waiting": len(self._waiting),
+            }
+
+    def wait(self, timeout: float) -> None:
+        """Block until a slot is given back, or for timeout seconds."""
+        with self._condition:
+            self._condition.wait(timeout)
+
+    def checkpoint(self, priority: JobPriority, tenant: Optional[str] = None) -> bool:
+        """
+        Call at a stage boundary of a running job that holds a slot. A job
+        below interactive priority yields its slot if interactive jobs are
+        waiting for one and it is their turn, then waits to be scheduled
+        again. Returns whether it yielded.
+        """
+        if priority == JobPriority.INTERACTIVE:
+            return False
+        with self._condition:
+            if self._free() or self._by_turn([JobPriority.INTERACTIVE, priority])[0] == priority:
+                return False
+            waiting = any(w.priority == JobPriority.INTERACTIVE for w in self._waiting)
+        # Outside the lock: this may query the database
+        if not (waiting or (self._demand is not None and self._demand())):
+            return False
+
+        print(f"Deferring a {priority.value} job: interactive jobs are waiting")
+        SCHEDULER_DEFERRALS.labels(priority.value).inc()
+        with self._condition:
+            self._stop(priority, tenant)
+            self._wait_for_slot(
+                _Waiter(priority, tenant, next(self._order), resuming=True, yielded=True)
+            )
+        return True
+
+    def _wait_for_slot(self, waiter: _Waiter) -> None:
+        self._waiting.append(waiter)
+        self._dispatch()
+        while not waiter.granted:
+            self._condition.wait()
+
+    def _dispatch(self) -> None:
+        """Give free slots to waiting jobs. Call holding the condition."""
+        while self._free():
+            ready = [w for w in self._waiting if not w.yielded and self._may_start(w.priority)]
+            if not ready:
+                break
+            priority = self._by_turn({w.priority for w in ready})[0]
+            waiter = min(
+                (w for w in ready if w.priority == priority),
+                key=lambda w: (not w.resuming, self._tenants[(priority, w.tenant)], w.order)
+            )
+            self._waiting.remove(waiter)
+            self._start(waiter.priority, waiter.tenant)
+            waiter.granted = True
+
+        for priority in JobPriority:
+            SCHEDULER_WAITING.labels(priority.value).set(
+                sum(1 for w in self._waiting if w.priority == priority)
+            )
+        self._condition.notify_all()
+
+    def _start(self, priority: JobPriority, tenant: Optional[str]) -> None:
+        self._clock = self._tag(priority)
+        self._tags[priority] = self._clock + 1 / self.weights[priority]
+        self._running[priority] += 1
+        self._tenants[(priority, tenant)] += 1
+        if priority == JobPriority.INTERACTIVE:
+            for waiter in self._waiting:
+                waiter.yielded = False
+
+    def _stop(self, priority: JobPriority, tenant: Optional[str]) -> None:
+        self._running[priority] -= 1
+        self._tenants[(priority, tenant)] -= 1
+        if not self._tenants[(priority, tenant)]:
+            del self._tenants[(priority, tenant)]
+
+    def _free(self) -> int:
+        return self.slots - sum(self._running.values())
+
+    def _may_start(self, priority: JobPriority) -> bool:
+        if not self._free():
+            return False
+        if priority == JobPriority.INTERACTIVE:
+            return True
+        others = sum(n for p, n in self._running.items() if p != JobPriority.INTERACTIVE)
+        return others < self.slots - self.reserved
+
+    def _tag(self, priority: JobPriority) -> float:
+        # A class that has been idle starts from now, not with credit
+        return max(self._tags[priority], self._clock)
+
+    def _by_turn(self, priorities) -> List[JobPriority]:
+        """Classes in the order they are due a start; ties to the heavier."""
+        return sorted(priorities, key=lambda p: (self._tag(p), -self.weights[p]))
+
+
+@lru_cache()
+def get_job_scheduler() -> JobScheduler:
+    demand = None
+    if get_settings().extraction_runner == "worker":
+        # Interactive jobs wait in the database, not in this process
+        from app.services.jobqueue import get_job_queue
+
+        def demand() -> bool:
+            return get_job_queue().has_runnable(JobPriority.INTERACTIVE)
+    return JobScheduler(demand=demand)
@@ -0,0 +1,243 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, Optional
+
+from app.config import get_settings
+from app.services.metrics import (
+    SCRATCH_FREE_BYTES,
+    SCRATCH_JOB_BYTES,
+    SCRATCH_JOBS,
+    SCRATCH_USED_BYTES,
+    SCRATCH_WAITING,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks
+    fcntl = None
+
+# Job directories are named "<JOB_DIR_PREFIX><name>.<random>" and hold a lock
+# file for as long as their owner is alive
+JOB_DIR_PREFIX = "job-"
+LOCK_FILE = ".lock"
+# Seconds between free-space checks while a job is held
+ADMISSION_POLL_SECONDS = 5.0
+# A directory without a lock file is only swept once it is this old
+# (it may be between mkdtemp() and taking the lock)
+UNLOCKED_GRACE_SECONDS = 60.0
+
+MB = 1024 * 1024
+
+
+class ScratchSpaceError(RuntimeError):
+    """Base class for scratch space failures."""
+
+
+class ScratchSpaceFull(ScratchSpaceError):
+    """Not enough free disk to admit a job."""
+
+
+class ScratchQuotaExceeded(ScratchSpaceError):
+    """A job wrote more to its scratch directory than scratch_job_quota_mb."""
+
+
+class ScratchSpace:
+    """
+    Scratch directories for jobs (downloads, PCM, encoded renditions) under
+    one root, which should be on fast local disk.
+
+    Each job reserves scratch_job_quota_mb when it is admitted. A job is
+    held while the filesystem's free space, less what running jobs may
+    still write, would fall below scratch_min_free_mb. The directory is
+    removed when the job ends, and directories left by dead processes are
+    swept on startup. Reservations are per process; other processes only
+    count through the free space they actually use.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        settings = get_settings()
+        self.root = root or settings.scratch_dir or os.path.join(
+            tempfile.gettempdir(), 'speech2pod-scratch'
+        )
+        os.makedirs(self.root, exist_ok=True)
+        self._condition = threading.Condition()
+        self._jobs: Dict[str, int] = {}  # job directory -> peak bytes seen
+        self._locks: Dict[str, int] = {}  # job directory -> lock file descriptor
+
+        SCRATCH_FREE_BYTES.set_function(lambda: shutil.disk_usage(self.root).free)
+        SCRATCH_USED_BYTES.set_function(lambda: _tree_size(self.root))
+
+    @contextmanager
+    def job(self, name: str, wait: bool = True) -> Iterator[str]:
+        """
+        Admit a job and yield its scratch directory, which is removed
+        afterwards whatever happens. Waits up to scratch_wait_timeout for
+        free space (wait=False fails at once) and raises ScratchSpaceFull.
+        """
+        path = self._admit(name, wait)
+        try:
+            yield path
+        finally:
+            self._release(path)
+
+    def check(self, path: str) -> int:
+        """
+        Measure a job directory, raising ScratchQuotaExceeded if it is
+        over quota. Call between stages. Returns the bytes in use.
+        """
+        used = _tree_size(path)
+        with self._condition:
+            if path in self._jobs:
+                self._jobs[path] = max(self._jobs[path], used)
+
+        quota = get_settings().scratch_job_quota_mb * MB
+        if used > quota:
+            raise ScratchQuotaExceeded(
+                f"Job used {used / MB:.0f} MB of scratch space "
+                f"(quota {quota / MB:.0f} MB)"
+            )
+        return used
+
+    def sweep(self) -> int:
+        """
+        Remove job directories whose owner has exited. Returns the number
+        removed.
+        """
+        removed = 0
+        for entry in os.scandir(self.root):
+            if not entry.is_dir(follow_symlinks=False) or not entry.name.startswith(JOB_DIR_PREFIX):
+                continue
+            if entry.path in self._jobs or not self._orphaned(entry.path):
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+
+        if removed:
+            print(f"Removed {removed} orphaned scratch directories from {self.root}")
+        return removed
+
+    def _admit(self, name: str, wait: bool) -> str:
+        settings = get_settings()
+        deadline = time.monotonic() + (settings.scratch_wait_timeout if wait else 0)
+        quota = settings.scratch_job_quota_mb * MB
+        min_free = settings.scratch_min_free_mb * MB
+
+        with self._condition:
+            waiting = False
+            try:
+                while True:
+                    free = shutil.disk_usage(self.root).free - self._outstanding(quota)
+                    if free - quota >= min_free:
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ScratchSpaceFull(
+                            f"Not enough scratch space in {self.root}: "
+                            f"{max(free, 0) / MB:.0f} MB available, a job needs "
+                            f"{quota / MB:.0f} MB plus {min_free / MB:.0f} MB kept free"
+                        )
+                    if not waiting:
+                        waiting = True
+                        SCRATCH_WAITING.inc()
+                        print(f"Holding {name}: low scratch space in {self.root}")
+                        # Space held by crashed workers may be reclaimable
+                        self.sweep()
+                    # Woken early when a job here finishes; otherwise poll,
+                    # since other processes free space too
+                    self._condition.wait(min(remaining, ADMISSION_POLL_SECONDS))
+            finally:
+                if waiting:
+                    SCRATCH_WAITING.dec()
+
+            path = tempfile.mkdtemp(prefix=f'{JOB_DIR_PREFIX}{name}.', dir=self.root)
+            self._jobs[path] = 0
+            self._locks[path] = self._lock(path)
+            SCRATCH_JOBS.inc()
+        return path
+
+    def _release(self, path: str) -> None:
+        try:
+            peak = max(self._jobs.get(path, 0), _tree_size(path))
+            SCRATCH_JOB_BYTES.observe(peak)
+        finally:
+            # Unlock first: an open file cannot be deleted on Windows
+            os.close(self._locks.pop(path))
+            shutil.rmtree(path, ignore_errors=True)
+            with self._condition:
+                self._jobs.pop(path, None)
+                SCRATCH_JOBS.dec()
+                self._condition.notify_all()
+
+    def _outstanding(self, quota: int) -> int:
+        """Bytes this process's running jobs may still write."""
+        return sum(max(0, quota - _tree_size(path)) for path in self._jobs)
+
+    @staticmethod
+    def _lock(path: str) -> int:
+        """
+        Create the directory's lock file, recording our PID, and lock it.
+        The lock lasts until the descriptor is closed or the process dies.
+        """
+        fd = os.open(os.path.join(path, LOCK_FILE), os.O_CREAT | os.O_WRONLY, 0o600)
+        os.write(fd, str(os.getpid()).encode())
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    @staticmethod
+    def _orphaned(path: str) -> bool:
+        """Whether a job directory's owning process is gone."""
+        lock_path = os.path.join(path, LOCK_FILE)
+        try:
+            fd = os.open(lock_path, os.O_RDONLY)
+        except FileNotFoundError:
+            try:
+                return time.time() - os.path.getmtime(path) > UNLOCKED_GRACE_SECONDS
+            except FileNotFoundError:
+                return False
+
+        try:
+            if fcntl is None:
+                return _pid_gone(int(os.read(fd, 32) or 0))
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            return True
+        finally:
+            os.close(fd)
+
+
+def _tree_size(path: str) -> int:
+    """Total size of the files under a directory."""
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(directory, name)).st_size
+            except FileNotFoundError:
+                pass
+    return total
+
+
+def _pid_gone(pid: int) -> bool:
+    if pid <= 0:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+@lru_cache()
+def get_scratch_space() -> ScratchSpace:
+    return ScratchSpace()
@@ -1,16 +1,22 @@
-import boto3
-from botocore.config import Config
 import os
 import mimetypes
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
 
 from app.config import get_settings
 
+# S3 requires every multipart part except the last to be at least 5 MiB
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 class StorageService:
     """Service for S3-compatible storage (Cloudflare R2)."""
 
     def __init__(self):
+        import boto3
+        from botocore.config import Config
+
         settings = get_settings()
 
         # Configure S3 client for Cloudflare R2
@@ -32,7 +38,8 @@ class StorageService:
         self,
         local_path: str,
         remote_key: str,
-        content_type: Optional[str] = None
+        content_type: Optional[str] = None,
+        cache_control: Optional[str] = None
     ) -> str:
         """
         Upload a file to R2 storage.
@@ -42,35 +49,162 @@ class StorageService:
             content_type, _ = mimetypes.guess_type(local_path)
             content_type = content_type or 'application/octet-stream'
 
+        extra = {'CacheControl': cache_control} if cache_control else {}
         with open(local_path, 'rb') as f:
             self.client.put_object(
                 Bucket=self.bucket_name,
                 Key=remote_key,
                 Body=f,
-                ContentType=content_type
+                ContentType=content_type,
+                **extra
             )
 
         return f"{self.public_url}/{remote_key}"
 
-    def upload_audio(self, local_path: str, episode_id: str) -> str:
+    def upload_bytes(
+        self,
+        data: bytes,
+        remote_key: str,
+        content_type: str,
+        cache_control: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Upload data held in memory, with optional user metadata
+        (x-amz-meta-*). Returns the public URL for the file.
+        """
+        extra = {'CacheControl': cache_control} if cache_control else {}
+        if metadata:
+            extra['Metadata'] = metadata
+        self.client.put_object(
+            Bucket=self.bucket_name,
+            Key=remote_key,
+            Body=data,
+            ContentType=content_type,
+            **extra
+        )
+        return f"{self.public_url}/{remote_key}"
+
+    def upload_stream(
+        self,
+        chunks: Iterable[bytes],
+        remote_key: str,
+        content_type: str,
+        max_concurrency: int = 4,
+    ) -> str:
+        """
+        Upload data from an iterator using a multipart upload.
+        Parts are sent in the background while the iterator keeps producing,
+        with at most 2 * max_concurrency parts buffered in memory.
+        Returns the public URL for the file.
+        """
+        upload = self.client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=remote_key,
+            ContentType=content_type
+        )
+        upload_id = upload['UploadId']
+        slots = threading.BoundedSemaphore(max_concurrency * 2)
+
+        def upload_part(part_number: int, body: bytes) -> dict:
+            try:
+                response = self.client.upload_part(
+                    Bucket=self.bucket_name,
+                    Key=remote_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body
+                )
+                return {'ETag': response['ETag'], 'PartNumber': part_number}
+            finally:
+                slots.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+                futures = []
+                buffer = bytearray()
+
+                def submit() -> None:
+                    slots.acquire()
+                    futures.append(
+                        pool.submit(upload_part, len(futures) + 1, bytes(buffer))
+                    )
+                    buffer.clear()
+
+                for chunk in chunks:
+                    buffer.extend(chunk)
+                    if len(buffer) >= MULTIPART_CHUNK_SIZE:
+                        submit()
+                if buffer or not futures:
+                    submit()
+
+                parts = [future.result() for future in futures]
+
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=remote_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=remote_key,
+                UploadId=upload_id
+            )
+            raise
+
+        return f"{self.public_url}/{remote_key}"
+
+    def upload_audio(
+        self,
+        local_path: str,
+        episode_id: str,
+        extension: str = "mp3",
+        content_type: str = "audio/mpeg"
+    ) -> str:
         """Upload audio file and return public URL."""
-        remote_key = f"audio/{episode_id}.mp3"
-        return self.upload_file(local_path, remote_key, 'audio/mpeg')
+        remote_key = f"audio/{episode_id}.{extension}"
+        return self.upload_file(local_path, remote_key, content_type)
+
+    def upload_audio_stream(
+        self,
+        chunks: Iterable[bytes],
+        episode_id: str,
+        extension: str = "mp3",
+        content_type: str = "audio/mpeg"
+    ) -> str:
+        """Upload streamed audio chunks and return public URL."""
+        remote_key = f"audio/{episode_id}.{extension}"
+        return self.upload_stream(chunks, remote_key, content_type)
 
-    def upload_thumbnail(self, local_path: str, episode_id: str) -> str:
+    def upload_thumbnail(
+        self,
+        local_path: str,
+        name: str,
+        extension: str = "jpg",
+        content_type: str = "image/jpeg",
+        cache_control: Optional[str] = None
+    ) -> str:
         """Upload thumbnail and return public URL."""
-        remote_key = f"thumbnails/{episode_id}.jpg"
-        return self.upload_file(local_path, remote_key, 'image/jpeg')
+        remote_key = self.thumbnail_key(name, extension)
+        return self.upload_file(local_path, remote_key, content_type, cache_control)
+
+    @staticmethod
+    def thumbnail_key(name: str, extension: str = "jpg") -> str:
+        return f"thumbnails/{name}.{extension}"
 
     def upload_cropped_audio(
         self,
         local_path: str,
         episode_id: str,
-        version: int = 1
+        version: int = 1,
+        extension: str = "mp3",
+        content_type: str = "audio/mpeg"
     ) -> str:
         """Upload cropped audio version."""
-        remote_key = f"audio/{episode_id}_v{version}.mp3"
-        return self.upload_file(local_path, remote_key, 'audio/mpeg')
+        remote_key = f"audio/{episode_id}_v{version}.{extension}"
+        return self.upload_file(local_path, remote_key, content_type)
 
     def delete_file(self, remote_key: str) -> bool:
         """Delete a file from storage."""
@@ -94,6 +228,31 @@ class StorageService:
         except Exception:
             return False
 
+    def get_metadata(self, remote_key: str) -> Dict[str, str]:
+        """A file's user metadata; empty if it does not exist."""
+        try:
+            return self.client.head_object(
+                Bucket=self.bucket_name,
+                Key=remote_key
+            ).get('Metadata', {})
+        except Exception:
+            return {}
+
+    def list_keys(self, prefix: str) -> List[str]:
+        """Keys of every file whose key starts with prefix."""
+        keys = []
+        page = {}
+        while True:
+            response = self.client.list_objects_v2(
+                Bucket=self.bucket_name,
+                Prefix=prefix,
+                **page
+            )
+            keys.extend(item['Key'] for item in response.get('Contents', []))
+            if not response.get('IsTruncated'):
+                return keys
+            page = {'ContinuationToken': response['NextContinuationToken']}
+
     def get_public_url(self, remote_key: str) -> str:
         """Get the public URL for a file."""
         return f"{self.public_url}/{remote_key}"
@@ -0,0 +1,105 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from app.services.audio import FFMPEG
+from app.services.metrics import run_measured
+from app.services.storage import StorageService
+
+
+@dataclass(frozen=True)
+class ThumbnailVariant:
+    """One square rendering of an episode's artwork."""
+    name: str
+    size: int  # pixels per side
+    extension: str
+    content_type: str
+    options: Tuple[str, ...]
+
+
+# Podcast apps want square JPEG/PNG artwork between 1400 and 3000 px; the
+# feed uses "artwork". The previews are for the UI's 128 px (2x) cards.
+THUMBNAIL_VARIANTS: Tuple[ThumbnailVariant, ...] = (
+    ThumbnailVariant('artwork', 3000, 'jpg', 'image/jpeg', ('-q:v', '3')),
+    ThumbnailVariant('artwork-1400', 1400, 'jpg', 'image/jpeg', ('-q:v', '3')),
+    ThumbnailVariant('preview', 256, 'webp', 'image/webp', ('-c:v', 'libwebp', '-quality', '75')),
+    ThumbnailVariant('preview-jpg', 256, 'jpg', 'image/jpeg', ('-q:v', '5')),
+)
+
+# Content-hashed keys never change, so they can be cached forever
+THUMBNAIL_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class ThumbnailService:
+    """
+    Renders a thumbnail into THUMBNAIL_VARIANTS and uploads them under a
+    key derived from the source image and the variant settings, so the
+    same artwork is only processed and uploaded once.
+    """
+
+    def __init__(self, storage: StorageService):
+        self.storage = storage
+
+    def publish(self, source_path: str, work_dir: str) -> Dict[str, str]:
+        """
+        Publish every variant of a thumbnail (any format FFmpeg reads).
+        Returns {variant: url}.
+        """
+        digest = self.content_hash(source_path)
+        names = {variant.name: f"{digest}/{variant.name}" for variant in THUMBNAIL_VARIANTS}
+        urls = {
+            variant.name: self.storage.get_public_url(
+                self.storage.thumbnail_key(names[variant.name], variant.extension)
+            )
+            for variant in THUMBNAIL_VARIANTS
+        }
+
+        # Variants are uploaded in order, so the last one marks a complete set
+        last = THUMBNAIL_VARIANTS[-1]
+        if self.storage.file_exists(self.storage.thumbnail_key(names[last.name], last.extension)):
+            return urls
+
+        paths = self.render(source_path, work_dir)
+        for variant in THUMBNAIL_VARIANTS:
+            self.storage.upload_thumbnail(
+                paths[variant.name],
+                names[variant.name],
+                variant.extension,
+                variant.content_type,
+                cache_control=THUMBNAIL_CACHE_CONTROL,
+            )
+        return urls
+
+    @staticmethod
+    def render(source_path: str, work_dir: str) -> Dict[str, str]:
+        """
+        Centre-crop the image to a square and scale it to every variant in
+        one FFmpeg run. Returns {variant: path}.
+        """
+        labels = [f'[v{index}]' for index in range(len(THUMBNAIL_VARIANTS))]
+        graph = [f"crop='min(iw,ih)':'min(iw,ih)',split={len(labels)}{''.join(labels)}"]
+        outputs = []
+        paths = {}
+        for index, variant in enumerate(THUMBNAIL_VARIANTS):
+            graph.append(
+                f'{labels[index]}scale={variant.size}:{variant.size}:flags=lanczos[out{index}]'
+            )
+            paths[variant.name] = os.path.join(work_dir, f'thumbnail-{variant.name}.{variant.extension}')
+            outputs += ['-map', f'[out{index}]', '-frames:v', '1', '-map_metadata', '-1', *variant.options]
+            if variant.extension == 'jpg':
+                outputs += ['-pix_fmt', 'yuvj420p']
+            outputs.append(paths[variant.name])
+
+        cmd = [FFMPEG, '-y', '-i', source_path, '-filter_complex', ';'.join(graph), *outputs]
+        run_measured(cmd, 'ffmpeg', capture_output=True, check=True)
+        return paths
+
+    @staticmethod
+    def content_hash(source_path: str) -> str:
+        """Hash of the source image and the variant settings."""
+        digest = hashlib.sha256(repr(THUMBNAIL_VARIANTS).encode())
+        with open(source_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()[:32]
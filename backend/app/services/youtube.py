@@ -1,10 +1,25 @@
-import yt_dlp
 import tempfile
 import os
 import re
-from typing import Optional
+import subprocess
+import sys
+import time
+from typing import Optional, Callable, List
 from dataclasses import dataclass
 
+from app.config import get_settings
+from app.services.extractors import ExtractorStrategy, get_extractor_selector, is_video_error
+from app.services.metrics import record_attempt, record_usage, wait_measured
+
+# Times a download is tried before giving up, falling back from one player
+# client to the next; each try resumes the last
+DOWNLOAD_ATTEMPTS = 3
+DOWNLOAD_RETRY_SECONDS = 5
+# Per attempt: a failing client costs at most a few timeouts before the
+# next one is tried
+SOCKET_TIMEOUT = 30
+HTTP_RETRIES = 3
+
 
 @dataclass
 class YouTubeMetadata:
@@ -37,6 +52,8 @@ class YouTubeService:
     @staticmethod
     def get_metadata(url: str) -> YouTubeMetadata:
         """Fetch video metadata without downloading."""
+        import yt_dlp
+
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
@@ -68,79 +85,227 @@ class YouTubeService:
         )
 
     @staticmethod
-    def download_audio(url: str, output_dir: str = None) -> tuple[str, str]:
+    def expand_url(url: str, limit: int) -> List[str]:
         """
-        Download audio from YouTube video.
-        Returns tuple of (audio_path, thumbnail_path)
+        Resolve a video, playlist or channel URL to video URLs, at most
+        `limit` of them. Playlists are listed with extract_flat, which
+        reads the listing pages without visiting each video.
         """
-        if output_dir is None:
-            output_dir = tempfile.mkdtemp()
+        if YouTubeService.extract_video_id(url):
+            return [url]
 
-        video_id = YouTubeService.extract_video_id(url)
-        audio_path = os.path.join(output_dir, f"{video_id}.mp3")
-        thumbnail_path = os.path.join(output_dir, f"{video_id}.jpg")
+        import yt_dlp
 
         ydl_opts = {
-            'format': 'worstaudio/worst',  # Start with worst quality to get any working stream
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+            'playlistend': limit,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+
+        urls = []
+        for entry in info.get('entries') or []:
+            if len(urls) >= limit:
+                break
+            if not entry:
+                continue
+            entry_url = entry.get('url') or ''
+            if entry.get('id') and len(entry['id']) == 11 and entry.get('ie_key', 'Youtube') == 'Youtube':
+                urls.append(f"https://www.youtube.com/watch?v={entry['id']}")
+            elif entry_url:
+                # A channel lists its tabs (Videos, Live, ...) as playlists
+                urls += YouTubeService.expand_url(entry_url, limit - len(urls))
+
+        # A single video under a URL form extract_video_id does not know
+        if info.get('_type', 'video') == 'video':
+            urls.append(info.get('webpage_url') or url)
+        return urls
+
+    @staticmethod
+    def _download_opts(output_dir: str, video_id: str, strategy: ExtractorStrategy) -> dict:
+        """yt-dlp options shared by audio and thumbnail downloads."""
+        return {
             'outtmpl': os.path.join(output_dir, f'{video_id}.%(ext)s'),
-            'postprocessors': [
-                {
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                },
-            ],
-            'writethumbnail': True,
             'quiet': False,
             'no_warnings': False,
-            # Use android client which often works without PO token
+            # Clients differ in which need a PO token; the selector picks
+            # whichever has been working
             'extractor_args': {
                 'youtube': {
-                    'player_client': ['android', 'web_embedded'],
+                    'player_client': [strategy.player_client],
                 }
             },
-            'socket_timeout': 60,
-            'retries': 10,
+            'socket_timeout': SOCKET_TIMEOUT,
+            'retries': HTTP_RETRIES,
             'fragment_retries': 10,
             'nocheckcertificate': True,
             'http_headers': {
-                'User-Agent': 'com.google.android.youtube/19.02.39 (Linux; U; Android 14) gzip',
+                'User-Agent': strategy.user_agent,
             },
             # ffmpeg_location not needed - yt-dlp finds it in PATH
         }
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
+    @staticmethod
+    def download_audio(
+        url: str,
+        output_dir: str = None,
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ) -> tuple[str, str]:
+        """
+        Download audio from YouTube video.
+        The native audio stream (Opus/AAC) is kept as-is so that
+        AudioService.process_audio performs the only encode.
+        progress_callback, if given, receives the downloaded fraction (0-1).
+        Player clients are tried best first (see ExtractorSelector). A
+        download that fails part way leaves a .part file in output_dir,
+        which the next attempt (here, or a later call) resumes.
+        Returns tuple of (audio_path, thumbnail_path)
+        """
+        import yt_dlp
 
-        # Find the actual thumbnail file (could be .jpg, .webp, etc.)
-        actual_thumbnail = None
-        for ext in ['.jpg', '.webp', '.png']:
-            possible_path = os.path.join(output_dir, f"{video_id}{ext}")
-            if os.path.exists(possible_path):
-                actual_thumbnail = possible_path
-                break
+        if output_dir is None:
+            output_dir = tempfile.mkdtemp()
+
+        settings = get_settings()
+        video_id = YouTubeService.extract_video_id(url)
 
-        # Convert thumbnail to jpg if needed
-        if actual_thumbnail and actual_thumbnail != thumbnail_path:
-            import subprocess
-            import shutil
-            ffmpeg_path = shutil.which('ffmpeg') or 'ffmpeg'
-            subprocess.run([
-                ffmpeg_path, '-y', '-i', actual_thumbnail,
-                '-vf', 'scale=1400:1400:force_original_aspect_ratio=decrease',
-                thumbnail_path
-            ], capture_output=True)
-            if os.path.exists(actual_thumbnail) and actual_thumbnail != thumbnail_path:
-                os.remove(actual_thumbnail)
+        progress_hooks = []
+        if progress_callback is not None:
+            def progress_hook(d: dict) -> None:
+                total = d.get('total_bytes') or d.get('total_bytes_estimate')
+                if d.get('status') == 'downloading' and total:
+                    progress_callback(d.get('downloaded_bytes', 0) / total)
 
+            progress_hooks.append(progress_hook)
+
+        def attempt(strategy: ExtractorStrategy) -> str:
+            ydl_opts = YouTubeService._download_opts(output_dir, video_id, strategy)
+            ydl_opts.update({
+                'format': settings.youtube_audio_format,
+                'writethumbnail': True,
+                'continuedl': True,
+                'progress_hooks': progress_hooks,
+            })
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=True)
+                return YouTubeService._downloaded_path(ydl, info)
+
+        cpu_start = time.thread_time()
+        try:
+            audio_path = get_extractor_selector().run(
+                attempt, settings.youtube_audio_format, yt_dlp.utils.DownloadError,
+                DOWNLOAD_ATTEMPTS, DOWNLOAD_RETRY_SECONDS
+            )
+        finally:
+            # yt-dlp runs in-process, so only this thread's CPU time is its own
+            record_usage('yt-dlp', time.thread_time() - cpu_start)
+
+        thumbnail_path = YouTubeService._find_thumbnail(output_dir, video_id)
         return audio_path, thumbnail_path
 
+    @staticmethod
+    def download_thumbnail(url: str, output_dir: str) -> str:
+        """Download only the thumbnail. Returns its path ("" if there is none)."""
+        import yt_dlp
+
+        video_id = YouTubeService.extract_video_id(url)
+
+        def attempt(strategy: ExtractorStrategy) -> None:
+            ydl_opts = YouTubeService._download_opts(output_dir, video_id, strategy)
+            ydl_opts.update({
+                'skip_download': True,
+                'writethumbnail': True,
+            })
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([url])
+
+        get_extractor_selector().run(
+            attempt, get_settings().youtube_audio_format, yt_dlp.utils.DownloadError,
+            DOWNLOAD_ATTEMPTS, DOWNLOAD_RETRY_SECONDS
+        )
+
+        return YouTubeService._find_thumbnail(output_dir, video_id)
+
+    @staticmethod
+    def open_audio_stream(url: str, log_path: str) -> subprocess.Popen:
+        """
+        Start yt-dlp writing the native audio stream to stdout.
+        The caller reads from (or hands off) process.stdout and must call
+        wait_audio_stream() afterwards. yt-dlp's log goes to log_path.
+        The stream cannot fall back to another player client once it has
+        started, so it uses the best one and records how it went.
+        """
+        settings = get_settings()
+        strategy = get_extractor_selector().ranked(settings.youtube_audio_format)[0]
+        cmd = [
+            sys.executable, '-m', 'yt_dlp',
+            '--format', settings.youtube_audio_format,
+            '--output', '-',
+            '--quiet', '--no-progress',
+            '--extractor-args', f"youtube:player_client={strategy.player_client}",
+            '--socket-timeout', str(SOCKET_TIMEOUT),
+            '--retries', str(HTTP_RETRIES),
+            '--fragment-retries', '10',
+            '--no-check-certificates',
+            '--add-header', f'User-Agent:{strategy.user_agent}',
+            url,
+        ]
+
+        with open(log_path, 'wb') as log:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=log)
+        process.strategy = strategy
+        process.started = time.perf_counter()
+        return process
+
+    @staticmethod
+    def wait_audio_stream(process: subprocess.Popen, log_path: str) -> None:
+        """Wait for a stream started by open_audio_stream; raise on failure."""
+        returncode = wait_measured(process, 'yt-dlp')
+        message = ""
+        if returncode != 0:
+            with open(log_path, 'r', errors='replace') as f:
+                message = f.read().strip()[-500:]
+        strategy = getattr(process, 'strategy', None)
+        # A private or removed video says nothing about the player client
+        if strategy is not None and not is_video_error(message):
+            seconds = time.perf_counter() - process.started
+            get_extractor_selector().record(
+                strategy, get_settings().youtube_audio_format, returncode == 0, seconds
+            )
+            record_attempt({"client": strategy.name, "ok": returncode == 0, "seconds": round(seconds, 3)})
+        if returncode != 0:
+            raise RuntimeError(f"yt-dlp exited with status {returncode}: {message}")
+
+    @staticmethod
+    def _find_thumbnail(output_dir: str, video_id: str) -> str:
+        """
+        Path of whichever thumbnail yt-dlp wrote, as is ("" if none).
+        ThumbnailService turns it into the published artwork.
+        """
+        for ext in ['.jpg', '.jpeg', '.webp', '.png']:
+            possible_path = os.path.join(output_dir, f"{video_id}{ext}")
+            if os.path.exists(possible_path):
+                return possible_path
+        return ""
+
+    @staticmethod
+    def _downloaded_path(ydl: "yt_dlp.YoutubeDL", info: dict) -> str:
+        """Resolve the path of the file yt-dlp actually wrote."""
+        for download in info.get('requested_downloads') or []:
+            if download.get('filepath'):
+                return download['filepath']
+        return ydl.prepare_filename(info)
+
     @staticmethod
     def get_transcript(url: str) -> Optional[str]:
         """
         Attempt to get video transcript/captions.
         Returns transcript text or None if unavailable.
         """
+        import yt_dlp
+
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
@@ -0,0 +1,94 @@
+"""
+Extraction worker: claims pending jobs from the database and runs them.
+
+    cd backend
+    EXTRACTION_RUNNER=worker python -m app.worker
+
+Run any number of these, on any number of machines sharing the database
+and storage; set EXTRACTION_RUNNER=worker on the API too so it leaves jobs
+to them. SIGTERM/SIGINT stop claiming and let running jobs finish.
+
+Each worker runs WORKER_CONCURRENCY jobs at once and claims interactive and
+bulk jobs weighted-fair, keeping INTERACTIVE_RESERVED_SLOTS for interactive
+ones (see app.services.scheduler).
+"""
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.episode import ExtractionJob
+from app.routers.extract import process_extraction
+from app.services.jobqueue import NODE_ID, get_job_queue
+from app.services.scheduler import get_job_scheduler
+from app.services.scratch import get_scratch_space
+
+
+def run_job(job_id: str) -> None:
+    db = SessionLocal()
+    try:
+        youtube_url = db.get(ExtractionJob, job_id).youtube_url
+    finally:
+        db.close()
+    if not youtube_url:
+        # Created before jobs recorded their URL; only its API process can run it
+        print(f"Job {job_id} has no youtube_url, skipping")
+        get_job_queue().release(job_id, retry_in=get_settings().job_retry_delay)
+        return
+    process_extraction(job_id, youtube_url, get_settings().database_url, scheduled=True)
+
+
+def main() -> None:
+    settings = get_settings()
+    queue = get_job_queue()
+    scheduler = get_job_scheduler()
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        print("Stopping: finishing running jobs")
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    get_scratch_space().sweep()
+    print(f"Worker {NODE_ID} running {settings.worker_concurrency} jobs at a time")
+
+    def run(job_id: str, priority) -> None:
+        try:
+            run_job(job_id)
+        except Exception as e:
+            print(f"Job {job_id} crashed the worker thread: {e}")
+        finally:
+            scheduler.finish(priority)
+
+    # Jobs that yielded their slot at a stage boundary keep their thread
+    with ThreadPoolExecutor(max_workers=settings.worker_concurrency * 2,
+                            thread_name_prefix="worker") as pool:
+        while not stopping.is_set():
+            startable = scheduler.startable()
+            if not startable:
+                scheduler.wait(settings.worker_poll_interval)
+                continue
+            claimed = None
+            try:
+                for priority in startable:
+                    job_id = queue.claim_next(priority)
+                    if job_id is not None:
+                        claimed = (job_id, priority)
+                        break
+            except Exception as e:
+                print(f"Could not claim a job: {e}")
+            if claimed is None:
+                scheduler.idle()
+                stopping.wait(settings.worker_poll_interval)
+                continue
+            job_id, priority = claimed
+            scheduler.start(priority)
+            print(f"Claimed {priority.value} job {job_id}")
+            pool.submit(run, job_id, priority)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Request bursts against admission control, in-process over ASGI.
+
+A burst of concurrent POST /api/analyze requests (Claude stubbed with
+CLAUDE_SECONDS of latency) with no in-flight cap and with one, reporting
+latency of admitted and refused requests and what GET /ready said during
+the burst. Then one client over its rate limit, with the buckets in the
+process and in the database, and the cost of a bucket update in each.
+"""
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from benchmarks import stubs
+from benchmarks.timing import percentiles
+
+BURST = 100
+CLAUDE_SECONDS = 0.2
+MAX_IN_FLIGHT = 8
+# Seconds between readiness probes during a burst
+READY_PROBE_INTERVAL = 0.05
+# Per-client limit for the rate limit runs
+RATE_PER_MINUTE = 10
+RATE_BURST = 5
+RATE_REQUESTS = 50
+BUCKET_UPDATES = 500
+
+ANALYZE = ("/api/analyze", {"url": "https://www.youtube.com/watch?v=benchmark00"})
+
+
+def _configure(**values) -> None:
+    """Change settings and start the admission control over with them."""
+    from app.config import get_settings
+    from app.services import admission, ratelimit
+
+    settings = get_settings()
+    for name, value in values.items():
+        setattr(settings, name, value)
+    ratelimit.get_client_rate_limiter.cache_clear()
+    admission.get_admission_control.cache_clear()
+
+
+async def _burst(client: httpx.AsyncClient) -> dict:
+    path, body = ANALYZE
+    admitted: List[float] = []
+    refused: List[float] = []
+    other = 0
+    ready = {"probes": 0, "saturated": 0}
+
+    async def request():
+        nonlocal other
+        start = time.perf_counter()
+        response = await client.post(path, json=body)
+        elapsed = time.perf_counter() - start
+        if response.status_code == 200:
+            admitted.append(elapsed)
+        elif response.status_code == 429 and response.headers.get("retry-after"):
+            refused.append(elapsed)
+        else:
+            other += 1
+
+    async def probe():
+        while True:
+            response = await client.get("/ready")
+            ready["probes"] += 1
+            if response.status_code == 503:
+                ready["saturated"] += 1
+            await asyncio.sleep(READY_PROBE_INTERVAL)
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(BURST)))
+    elapsed = time.perf_counter() - start
+    prober.cancel()
+
+    return {
+        "admitted": percentiles(admitted) if admitted else {"count": 0},
+        "refused": percentiles(refused) if refused else {"count": 0},
+        "errors": other,
+        "burst_seconds": elapsed,
+        "ready_probes": ready,
+    }
+
+
+async def _one_client(client: httpx.AsyncClient) -> dict:
+    path, body = ANALYZE
+    codes = {}
+    for _ in range(RATE_REQUESTS):
+        response = await client.post(path, json=body)
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+    # Another client is not held up by the first one's limit
+    response = await client.post(path, json=body, headers={"X-Forwarded-For": "198.51.100.7"})
+    return {"status_codes": codes, "other_client_status": response.status_code}
+
+
+def _bucket_updates(backend: str) -> dict:
+    from app.services.ratelimit import ClientRateLimiter, DatabaseRateLimiter
+
+    limiter_class = DatabaseRateLimiter if backend == "database" else ClientRateLimiter
+    limiter = limiter_class(60_000, 1_000_000)
+    latencies = []
+    for n in range(BUCKET_UPDATES):
+        start = time.perf_counter()
+        limiter.take(f"bench:203.0.113.{n % 50}")
+        latencies.append(time.perf_counter() - start)
+    return percentiles(latencies)
+
+
+def run() -> dict:
+    from app.config import get_settings
+    from app.main import app
+
+    stubs.FakeAnthropic.latency = CLAUDE_SECONDS
+    settings = get_settings()
+    names = ("admission_max_in_flight", "client_rate_per_minute", "client_rate_burst",
+             "rate_limit_backend", "trusted_proxy_hops")
+    saved = {name: getattr(settings, name) for name in names}
+
+    async def main():
+        results = {"burst": {}, "rate_limit": {}}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for mode, cap in (("unlimited", 0), (f"max_in_flight_{MAX_IN_FLIGHT}", MAX_IN_FLIGHT)):
+                _configure(admission_max_in_flight=cap, client_rate_per_minute=0)
+                result = await _burst(client)
+                results["burst"][mode] = result
+                admitted, refused = result["admitted"], result["refused"]
+                print(f"  admission burst {mode}: {admitted['count']} admitted "
+                      f"(p95 {admitted.get('p95_ms', 0):.0f}ms), {refused['count']} refused "
+                      f"(p95 {refused.get('p95_ms', 0):.1f}ms), /ready 503 on "
+                      f"{result['ready_probes']['saturated']}/{result['ready_probes']['probes']} probes")
+
+            stubs.FakeAnthropic.latency = 0.0
+            for backend in ("memory", "database"):
+                # The second client is told apart by X-Forwarded-For
+                _configure(admission_max_in_flight=0, client_rate_per_minute=RATE_PER_MINUTE,
+                           client_rate_burst=RATE_BURST, rate_limit_backend=backend,
+                           trusted_proxy_hops=1)
+                result = await _one_client(client)
+                result["bucket_update"] = await asyncio.to_thread(_bucket_updates, backend)
+                results["rate_limit"][backend] = result
+                print(f"  admission rate limit {backend}: {result['status_codes']} from one client, "
+                      f"other client {result['other_client_status']}, bucket update "
+                      f"p50 {result['bucket_update']['p50_ms']:.3f}ms")
+        return results
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        stubs.FakeAnthropic.latency = 0.0
+        _configure(**saved)
+
+    return {
+        "burst_requests": BURST,
+        "claude_seconds": CLAUDE_SECONDS,
+        "max_in_flight": MAX_IN_FLIGHT,
+        "rate_per_minute": RATE_PER_MINUTE,
+        "rate_burst": RATE_BURST,
+        **results,
+    }
@@ -0,0 +1,126 @@
+"""
+API latency and throughput under concurrent load, in-process over ASGI.
+
+Also records the longest event loop stall during each run (a handler that
+blocks the loop stalls every other request), and throughput of a database
+bound endpoint as the async engine's pool size grows.
+"""
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from benchmarks import fixtures
+from benchmarks.timing import percentiles
+
+ENDPOINTS = [
+    ("GET", "/health", None),
+    ("GET", "/api/episodes?limit=20", None),
+    ("GET", "/api/episodes?status=published&fields=id,title,thumbnail_url", None),
+    ("GET", "/api/feed/info", None),
+    ("GET", "/feed.xml", None),
+    ("POST", "/api/analyze", {"url": "https://www.youtube.com/watch?v=benchmark00"}),
+]
+
+# Endpoint and concurrency for the pool size sweep
+POOL_ENDPOINT = ("GET", "/api/episodes?limit=20", None)
+POOL_CONCURRENCY = 50
+# Seconds between event loop stall probes
+STALL_PROBE_INTERVAL = 0.005
+
+
+async def _load(client: httpx.AsyncClient, method: str, path: str, body,
+                concurrency: int, requests: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    stalls = []
+
+    async def probe():
+        # Sleeps that overrun mean something held the loop
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(STALL_PROBE_INTERVAL)
+            stalls.append(time.perf_counter() - before - STALL_PROBE_INTERVAL)
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    prober.cancel()
+
+    return {
+        **percentiles(latencies),
+        "errors": errors,
+        "requests_per_second": requests / elapsed,
+        "loop_stall_max_ms": max(stalls, default=0.0) * 1000,
+    }
+
+
+async def _run(app, concurrency: List[int], requests: int) -> list:
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for method, path, body in ENDPOINTS:
+            for level in concurrency:
+                result = await _load(client, method, path, body, level, requests)
+                results.append({"method": method, "path": path, "concurrency": level, **result})
+                print(f"  {method} {path} c={level}: p50 {result['p50_ms']:.1f}ms "
+                      f"p99 {result['p99_ms']:.1f}ms, {result['requests_per_second']:.0f} req/s, "
+                      f"max loop stall {result['loop_stall_max_ms']:.0f}ms")
+    return results
+
+
+async def _run_pool_sizes(app, pool_sizes: List[int], requests: int) -> list:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app import database
+
+    method, path, body = POOL_ENDPOINT
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for size in pool_sizes:
+            engine = create_async_engine(database.async_engine.url, pool_size=size, max_overflow=0)
+            if database.is_sqlite:
+                database.configure_sqlite(engine.sync_engine)
+            database.AsyncSessionLocal.configure(bind=engine)
+            try:
+                result = await _load(client, method, path, body, POOL_CONCURRENCY, requests)
+            finally:
+                await engine.dispose()
+            results.append({"method": method, "path": path, "concurrency": POOL_CONCURRENCY,
+                            "pool_size": size, **result})
+            print(f"  {method} {path} c={POOL_CONCURRENCY} pool={size}: "
+                  f"p50 {result['p50_ms']:.1f}ms, {result['requests_per_second']:.0f} req/s")
+        database.AsyncSessionLocal.configure(bind=database.async_engine)
+    return results
+
+
+def run(episodes: int, concurrency: List[int], requests: int, pool_sizes: List[int] = ()) -> dict:
+    from app.database import engine
+    from app.main import app
+
+    fixtures.seed_episodes(engine, episodes)
+
+    async def main():
+        # One event loop: pooled async connections belong to the loop that made them
+        return await _run(app, concurrency, requests), await _run_pool_sizes(app, pool_sizes, requests)
+
+    runs, pool_runs = asyncio.run(main())
+    return {
+        "episodes": episodes,
+        "requests_per_level": requests,
+        "runs": runs,
+        "pool_sizes": pool_runs,
+    }
@@ -0,0 +1,189 @@
+"""
+Throughput of AudioService.process_audio, crop_audio, assemble_episode and
+_generate_waveform, the size and encode cost of each encoding profile, and
+the cost of processing the native download against an MP3 transcode of it.
+"""
+import os
+import tempfile
+from typing import List
+
+from benchmarks import fixtures
+from benchmarks.timing import measure
+
+
+def _rates(result: dict, audio_seconds: float) -> dict:
+    hours = audio_seconds / 3600
+    cpu = result["cpu_seconds"] + result["child_cpu_seconds"]
+    return {
+        **result,
+        "cpu_seconds_per_audio_hour": cpu / hours,
+        "realtime_factor": audio_seconds / result["wall_seconds"],
+    }
+
+
+# Profile the savings are reported against: the original stereo CBR MP3
+BASELINE_PROFILE = "mp3-stereo"
+# What yt-dlp's FFmpegExtractAudio postprocessor (mp3, quality 192) ran on
+# every download before process_audio got the native stream
+MP3_TRANSCODE_ARGS = ['-vn', '-c:a', 'libmp3lame', '-b:a', '192k']
+
+
+def run(
+    cache_dir: str,
+    durations: List[float],
+    workers: List[int],
+    profiles: List[str],
+) -> dict:
+    from app.config import get_settings
+    from app.services.audio import AudioService, get_encoding_profile
+
+    settings = get_settings()
+    results = []
+
+    for duration in durations:
+        source = fixtures.speech_audio(cache_dir, duration)
+
+        with tempfile.TemporaryDirectory() as work:
+            entry = {"audio_seconds": duration, "process_audio": {}}
+
+            primary = get_encoding_profile(settings.encoding_profile)
+            for count in workers:
+                settings.encode_workers = count
+                output = os.path.join(work, f"processed_{count}.{primary.extension}")
+                service = AudioService()
+                with measure() as result:
+                    processed = service.process_audio(source, output)
+                entry["process_audio"][str(count)] = {
+                    **_rates(result, duration),
+                    "segmented": service._use_segmented_encode(processed.duration, primary),
+                    "output_seconds": processed.duration,
+                    "output_bytes": os.path.getsize(output),
+                }
+                print(f"  process_audio {duration:.0f}s workers={count}: "
+                      f"{result['wall_seconds']:.2f}s")
+
+            service = AudioService()
+            # Crop away the first and last tenth, as an editor typically would
+            with measure() as result:
+                service.crop_audio(
+                    output, duration * 0.1, duration * 0.9,
+                    os.path.join(work, f"cropped.{primary.extension}"), profile=primary,
+                )
+            entry["crop_audio"] = _rates(result, duration * 0.8)
+
+            # Intro/outro by stream copy: the first run also encodes the
+            # clips, later ones find them cached and should not grow with
+            # the speech
+            clip = fixtures.speech_audio(cache_dir, 15)
+            settings.clip_cache_dir = os.path.join(work, "clips")
+            for run_name in ("assemble_first", "assemble_cached"):
+                with measure() as result:
+                    service.assemble_episode(
+                        output, primary, clip, clip,
+                        os.path.join(work, f"assembled.{primary.extension}"),
+                    )
+                entry[run_name] = result
+            print(f"  assemble_episode {duration:.0f}s: "
+                  f"{entry['assemble_first']['wall_seconds']:.2f}s, "
+                  f"cached clips {entry['assemble_cached']['wall_seconds']:.3f}s")
+
+            with measure() as result:
+                service._generate_waveform(output)
+            entry["generate_waveform"] = _rates(result, duration)
+
+            print(f"  crop_audio {duration:.0f}s: {entry['crop_audio']['wall_seconds']:.2f}s, "
+                  f"waveform: {entry['generate_waveform']['wall_seconds']:.2f}s")
+
+            settings.encode_workers = 1
+            entry["native_source"] = _native_source(service, source, duration, work)
+            entry["profiles"] = _profiles(service, source, duration, work, profiles)
+            results.append(entry)
+
+    return {"runs": results}
+
+
+def _native_source(service, source: str, duration: float, work: str) -> dict:
+    """
+    CPU per audio hour from download to episode: processing the native
+    Opus stream directly, against transcoding it to MP3 first and
+    processing that.
+    """
+    from app.services.audio import FFMPEG
+    from app.services.metrics import run_measured
+
+    with measure() as native:
+        service.process_audio(source, os.path.join(work, "native"))
+
+    transcoded = os.path.join(work, "download.mp3")
+    with measure() as transcode:
+        run_measured(
+            [FFMPEG, '-y', '-v', 'error', '-i', source, *MP3_TRANSCODE_ARGS, transcoded],
+            'ffmpeg', check=True,
+        )
+    with measure() as from_mp3:
+        service.process_audio(transcoded, os.path.join(work, "from_mp3"))
+
+    native = _rates(native, duration)
+    before = {
+        "transcode": _rates(transcode, duration),
+        "process_audio": _rates(from_mp3, duration),
+    }
+    before_cpu = sum(stage["cpu_seconds_per_audio_hour"] for stage in before.values())
+    entry = {
+        "native": native,
+        "via_mp3": before,
+        "cpu_saving": 1 - native["cpu_seconds_per_audio_hour"] / before_cpu,
+    }
+    print(f"  native source {duration:.0f}s: {native['cpu_seconds_per_audio_hour']:.0f} "
+          f"cpu s/audio h, via mp3 {before_cpu:.0f} "
+          f"(transcode {before['transcode']['cpu_seconds_per_audio_hour']:.0f}), "
+          f"saving {entry['cpu_saving']:.0%}")
+    return entry
+
+
+def _profiles(service, source: str, duration: float, work: str, names: List[str]) -> dict:
+    """
+    Encode the source once per profile, then all of them in one run, and
+    report size and encode CPU against BASELINE_PROFILE.
+    """
+    names = [BASELINE_PROFILE] + [name for name in names if name != BASELINE_PROFILE]
+    entries = {}
+    for name in names:
+        with measure() as result:
+            processed = service.process_audio(
+                source, os.path.join(work, f"profile_{name}"), profiles=[name]
+            )
+        entries[name] = {
+            **_rates(result, duration),
+            "output_bytes": os.path.getsize(processed.output_path),
+            "kbps": os.path.getsize(processed.output_path) * 8 / 1000 / processed.duration,
+        }
+
+    baseline = entries[BASELINE_PROFILE]
+    baseline_cpu = baseline["cpu_seconds"] + baseline["child_cpu_seconds"]
+    for name, entry in entries.items():
+        cpu = entry["cpu_seconds"] + entry["child_cpu_seconds"]
+        entry["size_saving"] = 1 - entry["output_bytes"] / baseline["output_bytes"]
+        entry["cpu_saving"] = 1 - cpu / baseline_cpu
+        entry["wall_saving"] = 1 - entry["wall_seconds"] / baseline["wall_seconds"]
+        print(f"  profile {name} {duration:.0f}s: {entry['kbps']:.0f} kbps, "
+              f"{entry['wall_seconds']:.2f}s, size {-entry['size_saving']:+.0%}, "
+              f"cpu {-entry['cpu_saving']:+.0%} vs {BASELINE_PROFILE}")
+
+    # Every rendition out of one FFmpeg run, against encoding them one by one
+    renditions = names[1:]
+    if len(renditions) > 1:
+        with measure() as result:
+            service.process_audio(
+                source, os.path.join(work, "renditions"), profiles=renditions
+            )
+        separate = sum(entries[name]["wall_seconds"] for name in renditions)
+        entries["combined"] = {
+            **_rates(result, duration),
+            "profiles": renditions,
+            "wall_saving": 1 - result["wall_seconds"] / separate,
+        }
+        print(f"  profiles {','.join(renditions)} in one run {duration:.0f}s: "
+              f"{result['wall_seconds']:.2f}s vs {separate:.2f}s separately")
+
+    return entries
@@ -0,0 +1,159 @@
+"""
+Job claiming under contention: many processes (nodes), each with several
+claimer threads, drain a queue of extraction jobs through JobQueue. Checks
+that no job runs twice and that no two jobs for the same video overlap, and
+reports claims per second.
+
+Against PostgreSQL this exercises FOR UPDATE SKIP LOCKED and the per-video
+advisory locks; against SQLite, the compare-and-set fallback.
+"""
+import multiprocessing
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import create_engine, delete
+
+# Jobs per run; every DUPLICATE_EVERY-th job repeats an earlier video
+JOBS = 400
+DUPLICATE_EVERY = 5
+THREADS_PER_PROCESS = 4
+# Simulated work per job
+WORK_SECONDS = 0.01
+
+
+def _node(url: str, results) -> None:
+    """One worker node: threads claiming and "running" jobs until none are left."""
+    import threading
+
+    os.environ["DATABASE_URL"] = url
+    os.environ["JOB_RETRY_DELAY"] = "0"
+    from app.database import SessionLocal
+    from app.models.episode import ExtractionJob, JobStatus
+    from app.services.jobqueue import JobClaimError, get_job_queue
+
+    queue = get_job_queue()
+    runs = []
+    counts = {"claims": 0, "conflicts": 0}
+    lock = threading.Lock()
+
+    def pending() -> int:
+        db = SessionLocal()
+        try:
+            return db.query(ExtractionJob).filter(ExtractionJob.status == JobStatus.PENDING).count()
+        finally:
+            db.close()
+
+    def loop():
+        while True:
+            job_id = queue.claim_next()
+            if job_id is None:
+                # Others may still be running jobs for videos we skipped
+                if not pending():
+                    return
+                time.sleep(0.05)
+                continue
+            db = SessionLocal()
+            try:
+                job = db.get(ExtractionJob, job_id)
+                try:
+                    lease = queue.acquire(job_id, job.youtube_id)
+                except JobClaimError:
+                    with lock:
+                        counts["conflicts"] += 1
+                    continue
+                try:
+                    start = time.time()
+                    time.sleep(WORK_SECONDS)
+                    job.status = JobStatus.COMPLETED
+                    db.commit()
+                    with lock:
+                        counts["claims"] += 1
+                        runs.append((job_id, job.youtube_id, start, time.time()))
+                finally:
+                    lease.release()
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=loop) for _ in range(THREADS_PER_PROCESS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put({"runs": runs, **counts})
+
+
+def _seed(url: str) -> None:
+    from app.database import Base
+    from app.models.episode import ExtractionJob, JobStatus
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(delete(ExtractionJob))
+        conn.execute(ExtractionJob.__table__.insert(), [
+            {
+                "id": str(uuid.uuid4()),
+                "youtube_id": f"video{(i // DUPLICATE_EVERY if i % DUPLICATE_EVERY == 0 else i):06d}",
+                "status": JobStatus.PENDING,
+                "attempts": 0,
+            }
+            for i in range(JOBS)
+        ])
+    engine.dispose()
+
+
+def _check(runs: List[tuple]) -> Dict[str, int]:
+    """Count jobs run more than once, and same-video runs that overlapped."""
+    per_job = defaultdict(int)
+    per_video = defaultdict(list)
+    for job_id, youtube_id, start, end in runs:
+        per_job[job_id] += 1
+        per_video[youtube_id].append((start, end))
+
+    overlaps = 0
+    for spans in per_video.values():
+        spans.sort()
+        overlaps += sum(1 for (_, end), (start, _) in zip(spans, spans[1:]) if start < end)
+    return {
+        "jobs_run": len(per_job),
+        "duplicate_runs": sum(count - 1 for count in per_job.values()),
+        "same_video_overlaps": overlaps,
+    }
+
+
+def run(urls: Dict[str, str], processes: List[int]) -> dict:
+    # Fresh interpreters, so each node imports app.database for its URL
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for backend, url in urls.items():
+        runs = []
+        for count in processes:
+            _seed(url)
+            queue = context.Queue()
+            nodes = [context.Process(target=_node, args=(url, queue)) for _ in range(count)]
+            start = time.perf_counter()
+            for node in nodes:
+                node.start()
+            reports = [queue.get() for _ in nodes]
+            for node in nodes:
+                node.join()
+            elapsed = time.perf_counter() - start
+
+            result = {
+                "processes": count,
+                "claimers": count * THREADS_PER_PROCESS,
+                "claims_per_second": sum(r["claims"] for r in reports) / elapsed,
+                "video_conflicts": sum(r["conflicts"] for r in reports),
+                **_check([run for r in reports for run in r["runs"]]),
+            }
+            runs.append(result)
+            print(f"  claims {backend} x{result['claimers']}: {result['claims_per_second']:.0f} claims/s, "
+                  f"{result['jobs_run']}/{JOBS} jobs, {result['duplicate_runs']} duplicate runs, "
+                  f"{result['same_video_overlaps']} same-video overlaps, "
+                  f"{result['video_conflicts']} advisory lock conflicts")
+        results[backend] = runs
+
+    return {"jobs": JOBS, "threads_per_process": THREADS_PER_PROCESS, "backends": results}
@@ -0,0 +1,86 @@
+"""
+Episode listing, feed and count queries over a large table, with and
+without the composite status indexes.
+"""
+import time
+from typing import Dict
+
+from sqlalchemy import create_engine, func, select
+
+from benchmarks import fixtures
+
+REPEATS = 5
+STATUS_INDEXES = ("ix_episodes_status_published_at", "ix_episodes_status_created_at")
+
+
+def _queries():
+    from app.models.episode import Episode, EpisodeStatus
+
+    return {
+        "feed": select(Episode).where(Episode.status == EpisodeStatus.PUBLISHED)
+        .order_by(Episode.published_at.desc()),
+        "list_published_page": select(Episode.id, Episode.title, Episode.created_at)
+        .where(Episode.status == EpisodeStatus.PUBLISHED)
+        .order_by(Episode.created_at.desc(), Episode.id.desc()).limit(20),
+        "list_draft_page": select(Episode.id, Episode.title, Episode.created_at)
+        .where(Episode.status == EpisodeStatus.DRAFT)
+        .order_by(Episode.created_at.desc(), Episode.id.desc()).limit(20),
+        "count_per_status": [
+            select(func.count(Episode.id)).where(Episode.status == status)
+            for status in EpisodeStatus
+        ],
+        "count_grouped": select(Episode.status, func.count(Episode.id))
+        .group_by(Episode.status),
+    }
+
+
+def _time_queries(engine) -> Dict[str, float]:
+    timings = {}
+    with engine.connect() as conn:
+        for name, statements in _queries().items():
+            if not isinstance(statements, list):
+                statements = [statements]
+            best = float("inf")
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                for statement in statements:
+                    conn.execute(statement).fetchall()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best * 1000
+    return timings
+
+
+def run(urls: Dict[str, str], count: int) -> dict:
+    from app.database import Base
+    from app.models.episode import Episode
+
+    results = {}
+    for backend, url in urls.items():
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        start = time.perf_counter()
+        fixtures.seed_episodes(engine, count)
+        seed_seconds = time.perf_counter() - start
+
+        indexes = [i for i in Episode.__table__.indexes if i.name in STATUS_INDEXES]
+        with_indexes = _time_queries(engine)
+        for index in indexes:
+            index.drop(engine)
+        try:
+            without_indexes = _time_queries(engine)
+        finally:
+            for index in indexes:
+                index.create(engine)
+
+        results[backend] = {
+            "episodes": count,
+            "seed_seconds": seed_seconds,
+            "with_status_indexes_ms": with_indexes,
+            "without_status_indexes_ms": without_indexes,
+        }
+        for name in with_indexes:
+            print(f"  {backend} {name}: {with_indexes[name]:.2f}ms indexed, "
+                  f"{without_indexes[name]:.2f}ms without")
+        engine.dispose()
+
+    return {"repeats": REPEATS, "backends": results}
@@ -0,0 +1,122 @@
+"""
+Player client fallback with broken clients: a run of downloads through
+YouTubeService.download_audio, with the stubbed YoutubeDL failing some
+player clients after FAILURE_SECONDS (standing in for timeouts and
+retries). Compares a selector that starts from scratch for every download
+(the fixed client order) with one that remembers outcomes, reporting
+attempts and time per download. Then a few private videos followed by a
+normal download, which should find every client still trusted.
+"""
+import statistics
+import tempfile
+import time
+
+from benchmarks import fixtures, stubs
+
+DOWNLOADS = 30
+PRIVATE_VIDEOS = 3
+FAILURE_SECONDS = 0.2
+SCENARIOS = {
+    "first_client_broken": frozenset({"android"}),
+    "all_clients_broken": frozenset({"android", "web_embedded", "ios"}),
+}
+
+
+def _download_run(broken: frozenset, adaptive: bool) -> dict:
+    from app.services import extractors
+    from app.services.metrics import StageTimings
+    from app.services.youtube import YouTubeService
+
+    stubs.FakeYoutubeDL.failing_clients = broken
+    stubs.FakeYoutubeDL.failure_seconds = FAILURE_SECONDS
+    extractors.get_extractor_selector.cache_clear()
+
+    attempts, failed, seconds, errors = [], 0, [], 0
+    try:
+        for _ in range(DOWNLOADS):
+            if not adaptive:
+                extractors.get_extractor_selector.cache_clear()
+            timings = StageTimings()
+            start = time.perf_counter()
+            with tempfile.TemporaryDirectory() as output_dir:
+                try:
+                    with timings.stage("download"):
+                        YouTubeService.download_audio(
+                            "https://www.youtube.com/watch?v=benchmark00", output_dir
+                        )
+                except stubs.DownloadError:
+                    errors += 1
+            seconds.append(time.perf_counter() - start)
+            tried = timings.stages["download"].get("attempts", [])
+            attempts.append(len(tried))
+            failed += sum(1 for attempt in tried if not attempt["ok"])
+    finally:
+        stubs.FakeYoutubeDL.failing_clients = frozenset()
+
+    return {
+        "downloads": DOWNLOADS,
+        "failed_downloads": errors,
+        "attempts": sum(attempts),
+        "failed_attempts": failed,
+        "attempts_last_download": attempts[-1],
+        "mean_seconds": statistics.mean(seconds),
+        "total_seconds": sum(seconds),
+    }
+
+
+def run(cache_dir: str) -> dict:
+    # The delay between rounds of retries would dominate the simulated failures
+    from app.services import youtube
+
+    youtube.DOWNLOAD_RETRY_SECONDS = 0
+    stubs.use_source(fixtures.speech_audio(cache_dir, 60), 60, fixtures.thumbnail_image(cache_dir))
+
+    results = {}
+    for scenario, broken in SCENARIOS.items():
+        results[scenario] = {}
+        for mode, adaptive in (("fixed_order", False), ("adaptive", True)):
+            result = _download_run(broken, adaptive)
+            results[scenario][mode] = result
+            print(f"  extractors {scenario} {mode}: {result['attempts']} attempts "
+                  f"({result['failed_attempts']} failed) for {DOWNLOADS} downloads, "
+                  f"{result['total_seconds']:.1f}s, last download {result['attempts_last_download']} attempts")
+    return {"failure_seconds": FAILURE_SECONDS, "scenarios": results, "video_errors": _video_errors()}
+
+
+def _video_errors() -> dict:
+    """PRIVATE_VIDEOS failing downloads, then a good one."""
+    from app.config import get_settings
+    from app.services import extractors
+    from app.services.metrics import StageTimings
+    from app.services.youtube import YouTubeService
+
+    extractors.get_extractor_selector.cache_clear()
+    stubs.FakeYoutubeDL.video_error = "Private video. Sign in if you've been granted access to this video"
+    stubs.FakeYoutubeDL.failure_seconds = FAILURE_SECONDS
+    errors = 0
+    try:
+        for _ in range(PRIVATE_VIDEOS):
+            with tempfile.TemporaryDirectory() as output_dir:
+                try:
+                    YouTubeService.download_audio("https://www.youtube.com/watch?v=benchmark00", output_dir)
+                except stubs.DownloadError:
+                    errors += 1
+    finally:
+        stubs.FakeYoutubeDL.video_error = ""
+
+    selector = extractors.get_extractor_selector()
+    timings = StageTimings()
+    with tempfile.TemporaryDirectory() as output_dir:
+        with timings.stage("download"):
+            YouTubeService.download_audio("https://www.youtube.com/watch?v=benchmark00", output_dir)
+    ranked = selector.ranked(get_settings().youtube_audio_format)
+    result = {
+        "private_videos": PRIVATE_VIDEOS,
+        "failed_downloads": errors,
+        "clients_available_after": len(ranked),
+        "attempts_next_download": len(timings.stages["download"].get("attempts", [])),
+    }
+    print(f"  extractors {PRIVATE_VIDEOS} private videos: {errors} failed, then "
+          f"{result['clients_available_after']}/{len(selector.strategies)} clients available")
+    return result
+
@@ -0,0 +1,150 @@
+"""
+RSS feed render time as the number of published episodes grows, with the
+item cache empty (every <item> rendered) and full; the main feed and every
+speaker and topic feed rendered without the cache (each feed renders its
+own items) and with it, empty and full; and the static feed: a burst of
+episode edits against the debounced publisher (renders and uploads per
+burst), and the cost of one publish.
+"""
+import time
+from typing import List
+
+from benchmarks import fixtures
+from benchmarks.timing import measure
+
+REPEATS = 3
+# Edits in the burst, the gap between them, and the publisher's debounce
+STATIC_EDITS = 50
+STATIC_EDIT_GAP = 0.01
+STATIC_DEBOUNCE = 0.25
+
+
+def _episodes(count: int) -> list:
+    from app.models.episode import Episode
+
+    episodes = [
+        Episode(id=i + 1, **row)
+        for i, row in enumerate(fixtures.episode_rows(count, published_ratio=1.0))
+    ]
+    episodes.reverse()
+    return episodes
+
+
+def run(counts: List[int]) -> dict:
+    from app.services.feed import FeedService, get_feed_item_cache
+
+    cache = get_feed_item_cache()
+    results = []
+    for count in counts:
+        episodes = _episodes(count)
+
+        cold, warm = [], []
+        for _ in range(REPEATS):
+            cache.clear()
+            with measure() as result:
+                xml = FeedService().generate_feed(episodes)
+            cold.append(result["wall_seconds"])
+            with measure() as result:
+                FeedService().generate_feed(episodes)
+            warm.append(result["wall_seconds"])
+
+        best = min(cold)
+        results.append({
+            "episodes": count,
+            "render_seconds": best,
+            "per_episode_ms": best / count * 1000,
+            "cached_render_seconds": min(warm),
+            "feed_bytes": len(xml.encode("utf-8") if isinstance(xml, str) else xml),
+        })
+        print(f"  feed {count} episodes: {best * 1000:.1f}ms, items cached {min(warm) * 1000:.1f}ms")
+
+    return {
+        "repeats": REPEATS,
+        "runs": results,
+        "sub_feeds": _sub_feeds(max(counts)),
+        "static": _static_feed(max(counts)),
+    }
+
+
+def _sub_feeds(count: int) -> dict:
+    """Render the main feed and every speaker and topic feed of `count` episodes."""
+    from app.services.feed import FeedPublisher, get_feed_item_cache
+
+    episodes = _episodes(count)
+    publisher = FeedPublisher()
+    cache = get_feed_item_cache()
+
+    # Keeping nothing, every feed renders all of its items
+    max_items, cache.max_items = cache.max_items, 0
+    cache.clear()
+    try:
+        with measure() as uncached:
+            feeds = publisher.render(episodes)
+    finally:
+        cache.max_items = max_items
+
+    with measure() as shared:
+        publisher.render(episodes)
+    with measure() as shared_full:
+        publisher.render(episodes)
+
+    print(f"  feed {count} episodes, {len(feeds)} feeds: uncached "
+          f"{uncached['wall_seconds'] * 1000:.0f}ms, shared cache {shared['wall_seconds'] * 1000:.0f}ms, "
+          f"shared cache full {shared_full['wall_seconds'] * 1000:.0f}ms")
+    return {
+        "episodes": count,
+        "feeds": len(feeds),
+        "uncached_seconds": uncached["wall_seconds"],
+        "shared_cache_seconds": shared["wall_seconds"],
+        "shared_cache_full_seconds": shared_full["wall_seconds"],
+    }
+
+
+def _static_feed(count: int) -> dict:
+    """Publish a feed of `count` episodes after a burst of edits."""
+    from app.config import get_settings
+    from app.database import engine
+    from app.services.feed import FeedPublisher, get_feed_item_cache
+
+    class CountingPublisher(FeedPublisher):
+        def __init__(self):
+            super().__init__(debounce=STATIC_DEBOUNCE)
+            self.publishes = []
+
+        def publish(self) -> int:
+            with measure() as result:
+                uploaded = super().publish()
+            self.publishes.append((uploaded, result["wall_seconds"]))
+            return uploaded
+
+    fixtures.seed_episodes(engine, count)
+    get_feed_item_cache().clear()
+    settings = get_settings()
+    enabled = settings.static_feed
+    settings.static_feed = True
+    try:
+        publisher = CountingPublisher()
+        for _ in range(STATIC_EDITS):
+            publisher.schedule()
+            time.sleep(STATIC_EDIT_GAP)
+        deadline = time.monotonic() + 60
+        while (publisher.pending() or not publisher.publishes) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        burst = list(publisher.publishes)
+        # Nothing changed since: rendered, not uploaded
+        publisher.publish()
+    finally:
+        settings.static_feed = enabled
+
+    uploaded, publish_seconds = burst[0]
+    unchanged = publisher.publishes[-1]
+    print(f"  static feed {count} episodes: {STATIC_EDITS} edits -> {len(burst)} publish, "
+          f"{publish_seconds * 1000:.0f}ms; unchanged {unchanged[1] * 1000:.0f}ms, uploaded {unchanged[0]}")
+    return {
+        "episodes": count,
+        "edits": STATIC_EDITS,
+        "publishes": len(burst),
+        "publish_seconds": publish_seconds,
+        "unchanged_publish_seconds": unchanged[1],
+        "unchanged_uploaded": unchanged[0],
+    }
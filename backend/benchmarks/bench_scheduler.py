@@ -0,0 +1,76 @@
+"""
+Job scheduling under a backfill: a bulk import queues hundreds of jobs, then
+interactive jobs arrive one by one. Each simulated job runs three stages
+(download, encode, upload) in a JobScheduler slot, calling checkpoint()
+between them like process_extraction does. Compares first-come first-served
+(one class) with the priority classes, reporting queue wait per class.
+"""
+import statistics
+import threading
+import time
+from typing import Dict, List
+
+BULK_JOBS = 300
+INTERACTIVE_JOBS = 20
+# Seconds between interactive arrivals, once the backfill is queued
+INTERACTIVE_EVERY = 0.1
+STAGES = 3
+STAGE_SECONDS = 0.01
+SLOTS = 2
+
+
+def _simulate(prioritized: bool) -> Dict[str, dict]:
+    from app.models.episode import JobPriority
+    from app.services.scheduler import JobScheduler
+
+    scheduler = JobScheduler(slots=SLOTS, reserved=1 if prioritized else 0)
+    waits: Dict[str, List[float]] = {"interactive": [], "bulk": []}
+    lock = threading.Lock()
+
+    def job(kind: str) -> None:
+        priority = JobPriority.INTERACTIVE if prioritized and kind == "interactive" else JobPriority.BULK
+        queued = time.perf_counter()
+        with scheduler.slot(priority):
+            with lock:
+                waits[kind].append(time.perf_counter() - queued)
+            for stage in range(STAGES):
+                if stage:
+                    scheduler.checkpoint(priority)
+                time.sleep(STAGE_SECONDS)
+
+    threads = [threading.Thread(target=job, args=("bulk",)) for _ in range(BULK_JOBS)]
+    for thread in threads:
+        thread.start()
+    for _ in range(INTERACTIVE_JOBS):
+        time.sleep(INTERACTIVE_EVERY)
+        thread = threading.Thread(target=job, args=("interactive",))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    return {
+        kind: {
+            "jobs": len(values),
+            "wait_p50_s": statistics.median(values),
+            "wait_p95_s": sorted(values)[int(len(values) * 0.95) - 1],
+            "wait_max_s": max(values),
+        }
+        for kind, values in waits.items()
+    }
+
+
+def run() -> dict:
+    results = {}
+    for mode, prioritized in (("fifo", False), ("priority", True)):
+        results[mode] = _simulate(prioritized)
+        for kind, stats in results[mode].items():
+            print(f"  scheduler {mode} {kind}: wait p50 {stats['wait_p50_s'] * 1000:.0f} ms, "
+                  f"p95 {stats['wait_p95_s'] * 1000:.0f} ms, max {stats['wait_max_s'] * 1000:.0f} ms")
+    return {
+        "bulk_jobs": BULK_JOBS,
+        "interactive_jobs": INTERACTIVE_JOBS,
+        "slots": SLOTS,
+        "stage_seconds": STAGE_SECONDS,
+        "modes": results,
+    }
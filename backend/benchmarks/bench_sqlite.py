@@ -0,0 +1,133 @@
+"""
+SQLite under concurrent writers: several processes (as with multi-worker
+uvicorn) each run job-style read-modify-write transactions next to episode
+listing reads, with the rollback journal and with WAL plus the single
+writer connection (SQLITE_WAL).
+"""
+import multiprocessing
+import os
+import random
+import time
+from typing import List
+
+from sqlalchemy import create_engine
+
+from benchmarks import fixtures
+
+EPISODES = 2000
+JOBS = 200
+# Share of operations that write
+WRITE_RATIO = 0.2
+THREADS_PER_PROCESS = 4
+
+
+def _worker(url: str, wal: bool, seconds: float, results) -> None:
+    """One "uvicorn worker": threads mixing listing reads and job updates."""
+    import threading
+
+    os.environ["DATABASE_URL"] = url
+    os.environ["SQLITE_WAL"] = "true" if wal else "false"
+    from sqlalchemy import select
+    from app.database import SessionLocal
+    from app.models.episode import Episode, ExtractionJob, JobStatus
+
+    counts = {"reads": 0, "writes": 0, "errors": 0, "read_seconds": 0.0}
+    lock = threading.Lock()
+
+    def loop():
+        rng = random.Random()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            db = SessionLocal()
+            start = time.perf_counter()
+            try:
+                if rng.random() < WRITE_RATIO:
+                    job = db.get(ExtractionJob, f"bench-{rng.randrange(JOBS)}")
+                    job.status = rng.choice([JobStatus.PROCESSING, JobStatus.COMPLETED])
+                    job.duration = (job.duration or 0) + 1
+                    db.commit()
+                    kind = "writes"
+                else:
+                    db.execute(
+                        select(Episode.id, Episode.title)
+                        .order_by(Episode.created_at.desc()).limit(20)
+                    ).all()
+                    kind = "reads"
+                elapsed = time.perf_counter() - start
+                with lock:
+                    counts[kind] += 1
+                    if kind == "reads":
+                        counts["read_seconds"] += elapsed
+            except Exception:
+                db.rollback()
+                with lock:
+                    counts["errors"] += 1
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=loop) for _ in range(THREADS_PER_PROCESS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(counts)
+
+
+def _seed(url: str) -> None:
+    from app.database import Base
+    from app.models.episode import ExtractionJob, JobStatus
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    fixtures.seed_episodes(engine, EPISODES)
+    with engine.begin() as conn:
+        conn.execute(ExtractionJob.__table__.insert(), [
+            {"id": f"bench-{i}", "youtube_id": "benchmark00", "status": JobStatus.PENDING}
+            for i in range(JOBS)
+        ])
+    engine.dispose()
+
+
+def run(work_dir: str, processes: List[int], seconds: float) -> dict:
+    # Fresh interpreters, so each imports app.database with its own settings
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for wal in (False, True):
+        path = os.path.join(work_dir, f"bench_sqlite_{'wal' if wal else 'journal'}.db")
+        url = f"sqlite:///{path}"
+        _seed(url)
+        for count in processes:
+            results = context.Queue()
+            workers = [
+                context.Process(target=_worker, args=(url, wal, seconds, results))
+                for _ in range(count)
+            ]
+            for worker in workers:
+                worker.start()
+            totals = {"reads": 0, "writes": 0, "errors": 0, "read_seconds": 0.0}
+            for _ in workers:
+                for key, value in results.get().items():
+                    totals[key] += value
+            for worker in workers:
+                worker.join()
+
+            mode = "wal" if wal else "journal"
+            result = {
+                "mode": mode,
+                "processes": count,
+                "reads_per_second": totals["reads"] / seconds,
+                "writes_per_second": totals["writes"] / seconds,
+                "errors": totals["errors"],
+                "mean_read_ms": totals["read_seconds"] / max(totals["reads"], 1) * 1000,
+            }
+            runs.append(result)
+            print(f"  sqlite {mode} x{count}: {result['reads_per_second']:.0f} reads/s, "
+                  f"{result['writes_per_second']:.0f} writes/s, {result['errors']} errors, "
+                  f"read {result['mean_read_ms']:.1f}ms")
+
+    return {
+        "seconds": seconds,
+        "threads_per_process": THREADS_PER_PROCESS,
+        "write_ratio": WRITE_RATIO,
+        "runs": runs,
+    }
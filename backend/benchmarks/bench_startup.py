@@ -0,0 +1,135 @@
+"""
+API cold start: how long `import app.main` takes for each replica shape,
+measured with `python -X importtime` in a fresh interpreter.
+
+Also runs on its own as a regression check, exiting non-zero when a replica's
+import goes over its budget or pulls in a heavy dependency. Budgets are
+multiples of the time FastAPI itself took to import in the same interpreter:
+every replica pays that, and both it and our own imports scale with the
+machine, so the check means the same on a laptop and a loaded CI runner:
+
+    cd backend
+    python -m benchmarks.bench_startup --budget feed=2.0
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.timing import measure
+
+# API_ROUTERS values to time: every router, a feed-only replica, health only
+REPLICAS = {"all": "", "feed": "feed", "health": "none"}
+# How long each replica may take to import app.main, as a multiple of its
+# FastAPI import. The feed replica adds SQLAlchemy (about as slow again as
+# FastAPI) and little else; health-only adds next to nothing
+BUDGETS = {"all": 2.5, "feed": 2.2, "health": 1.2}
+# Only the extraction and AI code paths need these; importing the app must not
+HEAVY_MODULES = ("yt_dlp", "anthropic", "boto3", "numpy", "feedgen", "alembic")
+REPEATS = 3
+TOP_MODULES = 10
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(api_routers: str) -> dict:
+    """Import app.main in a new interpreter and parse its -X importtime report."""
+    env = dict(os.environ, API_ROUTERS=api_routers, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"import app.main failed:\n{proc.stderr[-2000:]}")
+
+    # "import time: self [us] | cumulative | imported package", nesting by indent
+    cumulative: Dict[str, int] = {}
+    top_level: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        cumulative[module] = int(total)
+        if not name[1:].startswith(" "):
+            top_level[module] = int(total)
+
+    return {
+        "wall_seconds": wall,
+        "import_seconds": cumulative.get("app.main", 0) / 1e6,
+        # The floor every replica pays, and what the budgets are relative to
+        "fastapi_seconds": cumulative.get("fastapi", 0) / 1e6,
+        "fastapi_multiple": cumulative.get("app.main", 0) / max(cumulative.get("fastapi", 0), 1),
+        "heavy_modules": sorted(module for module in cumulative if module in HEAVY_MODULES),
+        "top_modules": [
+            {"module": module, "seconds": micros / 1e6}
+            for module, micros in sorted(top_level.items(), key=lambda kv: -kv[1])[:TOP_MODULES]
+        ],
+    }
+
+
+def parse_budgets(entries: List[str]) -> Dict[str, float]:
+    """BUDGETS updated from REPLICA=MULTIPLE entries."""
+    budgets = dict(BUDGETS)
+    for entry in entries:
+        replica, _, multiple = entry.partition("=")
+        if replica not in REPLICAS or not multiple:
+            raise argparse.ArgumentTypeError(
+                f"expected REPLICA=MULTIPLE with REPLICA one of {', '.join(REPLICAS)}, got {entry!r}"
+            )
+        budgets[replica] = float(multiple)
+    return budgets
+
+
+def run(budgets: Optional[Dict[str, float]] = None, replicas: Optional[List[str]] = None) -> dict:
+    budgets = BUDGETS if budgets is None else budgets
+    results = []
+    for replica in replicas or list(REPLICAS):
+        # The fastest of a few runs, so disk cache misses don't count
+        profiles = [import_profile(REPLICAS[replica]) for _ in range(REPEATS)]
+        best = min(profiles, key=lambda profile: profile["fastapi_multiple"])
+        best["replica"] = replica
+        best["api_routers"] = REPLICAS[replica]
+        best["budget_multiple"] = budgets.get(replica)
+        best["over_budget"] = replica in budgets and best["fastapi_multiple"] > budgets[replica]
+        results.append(best)
+
+        heavy = ", ".join(best["heavy_modules"]) or "none"
+        print(
+            f"  startup {replica}: import {best['import_seconds'] * 1000:.0f}ms "
+            f"({best['fastapi_multiple']:.2f}x fastapi's {best['fastapi_seconds'] * 1000:.0f}ms), "
+            f"process {best['wall_seconds'] * 1000:.0f}ms, heavy imports: {heavy}"
+        )
+
+    return {"repeats": REPEATS, "budget_multiples": budgets, "runs": results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", nargs="+", default=[], metavar="REPLICA=MULTIPLE",
+                        help="a replica's import time as a multiple of FastAPI's (default: "
+                             + ", ".join(f"{name}={multiple}" for name, multiple in BUDGETS.items()) + ")")
+    parser.add_argument("--replica", nargs="+", choices=list(REPLICAS), default=list(REPLICAS))
+    args = parser.parse_args(argv)
+
+    try:
+        budgets = parse_budgets(args.budget)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    with measure() as total:
+        report = run(budgets, args.replica)
+    failed = [result for result in report["runs"] if result["over_budget"] or result["heavy_modules"]]
+    for failure in failed:
+        print(f"FAIL {failure['replica']}: {failure['fastapi_multiple']:.2f}x FastAPI's import "
+              f"(budget {failure['budget_multiple']:.2f}x), heavy imports: {failure['heavy_modules']}")
+    print(f"Checked {len(report['runs'])} replicas in {total['wall_seconds']:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
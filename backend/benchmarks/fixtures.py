@@ -0,0 +1,127 @@
+"""
+Synthesized inputs for the benchmark suite.
+
+Audio fixtures approximate a recorded speech: pink noise plus a low voiced
+tone, modulated at a syllable rate, with a pause every few seconds and
+dead air at the head and tail for silence trimming to find. They are
+encoded to Opus in WebM, the container YouTube serves, and cached by
+duration so repeated runs skip the synthesis. The thumbnail fixture is a
+test pattern at YouTube's thumbnail size.
+"""
+import os
+import random
+import subprocess
+from datetime import datetime, timedelta, timezone
+
+from app.services import audio as audio_module
+
+LEAD_SILENCE = 4.0
+TAIL_SILENCE = 6.0
+PAUSE_EVERY = 7.0
+PAUSE_LENGTH = 1.2
+
+SPEAKERS = [
+    "Jane Doe", "John Roe", "Maria Garcia", "Wei Chen", "Amara Okafor",
+    "Liam Murphy", "Priya Patel", "Noah Cohen",
+]
+TOPICS = [
+    "State of the Union", "Climate Policy", "Healthcare Reform",
+    "Economic Outlook", "Education Funding", "Foreign Relations",
+]
+
+
+def speech_audio(cache_dir: str, duration: float) -> str:
+    """Return the path of a speech-like Opus file `duration` seconds long."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"speech_{int(duration)}s.webm")
+    if os.path.exists(path):
+        return path
+
+    body = duration - LEAD_SILENCE - TAIL_SILENCE
+    envelope = (
+        f"if(lt(mod(t,{PAUSE_EVERY}),{PAUSE_EVERY - PAUSE_LENGTH}),"
+        f"0.55+0.45*sin(2*PI*3.3*t),0)"
+    )
+    filter_graph = (
+        "[0][1]amix=inputs=2:normalize=0,"
+        f"volume='{envelope}':eval=frame,"
+        f"adelay={int(LEAD_SILENCE * 1000)},"
+        f"apad=pad_dur={TAIL_SILENCE}"
+    )
+
+    partial = path + ".part"
+    subprocess.run([
+        audio_module.FFMPEG, '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f"anoisesrc=color=pink:amplitude=0.25:seed=7:duration={body}",
+        '-f', 'lavfi', '-i', f"sine=frequency=165:sample_rate=48000:duration={body}",
+        '-filter_complex', filter_graph,
+        '-ar', '48000', '-ac', '1',
+        '-c:a', 'libopus', '-b:a', '64k',
+        '-f', 'webm', partial,
+    ], check=True, capture_output=True)
+    os.replace(partial, path)
+    return path
+
+
+def thumbnail_image(cache_dir: str) -> str:
+    """Return the path of a 1280x720 WebP, the size YouTube serves."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, "thumbnail_1280x720.webp")
+    if os.path.exists(path):
+        return path
+
+    partial = path + ".part"
+    subprocess.run([
+        audio_module.FFMPEG, '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', 'testsrc2=size=1280x720:rate=1',
+        '-frames:v', '1', '-c:v', 'libwebp', '-f', 'webp', partial,
+    ], check=True, capture_output=True)
+    os.replace(partial, path)
+    return path
+
+
+def episode_rows(count: int, published_ratio: float = 0.8, seed: int = 1) -> list:
+    """Column dicts for `count` synthetic episodes, newest last."""
+    from app.models.episode import EpisodeStatus, slugify
+
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        created = start + timedelta(minutes=37 * i)
+        published = rng.random() < published_ratio
+        speaker = rng.choice(SPEAKERS)
+        topic = rng.choice(TOPICS)
+        rows.append({
+            "youtube_id": f"bench{i:06d}",
+            "youtube_url": f"https://www.youtube.com/watch?v=bench{i:06d}",
+            "original_title": f"{speaker} on {topic}",
+            "original_description": "Synthesized episode for benchmarks.",
+            "title": f"{speaker}: {topic} #{i}",
+            "speaker": speaker,
+            "speaker_slug": slugify(speaker),
+            "speech_date": created.strftime("%B %d, %Y"),
+            "venue": "City Hall",
+            "topic": topic,
+            "topic_slug": slugify(topic),
+            "summary": f"{speaker} speaks about {topic.lower()}. " * 4,
+            "audio_url": f"https://media.example.com/episodes/{i}/audio.mp3",
+            "audio_duration": rng.uniform(600, 7200),
+            "thumbnail_url": f"https://media.example.com/episodes/{i}/thumbnail.jpg",
+            "crop_start": 0.0,
+            "status": EpisodeStatus.PUBLISHED if published else EpisodeStatus.DRAFT,
+            "created_at": created,
+            "published_at": created + timedelta(hours=1) if published else None,
+        })
+    return rows
+
+
+def seed_episodes(engine, count: int, batch_size: int = 5000) -> None:
+    """Replace the episodes table contents with `count` synthetic rows."""
+    from app.models.episode import Episode
+
+    with engine.begin() as conn:
+        conn.execute(Episode.__table__.delete())
+        rows = episode_rows(count)
+        for i in range(0, len(rows), batch_size):
+            conn.execute(Episode.__table__.insert(), rows[i:i + batch_size])
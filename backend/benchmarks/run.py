@@ -0,0 +1,169 @@
+"""
+Run the offline benchmark suite and write the results as JSON.
+
+    cd backend
+    python -m benchmarks.run --suite audio feed --durations 10,60 --output /tmp/results.json
+
+Everything runs against a throwaway SQLite database, a local directory in
+place of R2 and stubbed yt-dlp/Anthropic clients, so no credentials or
+network access are needed. FFmpeg and ffprobe must be on PATH.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks import stubs
+
+SUITES = ("audio", "pipeline", "extractors", "feed", "db", "sqlite", "claims", "scheduler",
+          "api", "admission", "startup")
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def _environment(work_dir: str) -> dict:
+    """Point the app at throwaway resources. Must run before app imports."""
+    env = {
+        "DATABASE_URL": f"sqlite:///{os.path.join(work_dir, 'speech2pod.db')}",
+        "DOWNLOAD_CACHE_DIR": os.path.join(work_dir, "downloads"),
+        "R2_ACCOUNT_ID": "benchmark",
+        "R2_ACCESS_KEY_ID": "benchmark",
+        "R2_SECRET_ACCESS_KEY": "benchmark",
+        "R2_PUBLIC_URL": "https://media.example.com",
+        "ANTHROPIC_API_KEY": "benchmark",
+        "PODCAST_BASE_URL": "https://podcast.example.com",
+        "PODCAST_IMAGE_URL": "https://media.example.com/cover.jpg",
+        # Admission control would refuse most of the load; the admission
+        # suite turns it on itself
+        "CLIENT_RATE_PER_MINUTE": "0",
+        "ADMISSION_MAX_IN_FLIGHT": "0",
+    }
+    os.environ.update(env)
+    return env
+
+
+def _meta() -> dict:
+    from app.services import audio
+
+    def output(cmd):
+        try:
+            return subprocess.run(cmd, capture_output=True, text=True).stdout.splitlines()[0]
+        except (OSError, IndexError):
+            return None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": output(["git", "rev-parse", "HEAD"]),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": output([audio.FFMPEG, "-version"]),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--durations", type=_int_list, default=[10, 60, 180],
+                        help="audio fixture lengths in minutes (default: 10,60,180)")
+    parser.add_argument("--workers", type=_int_list, default=[1, 2, 4, 8],
+                        help="encode_workers values for process_audio (default: 1,2,4,8)")
+    parser.add_argument("--profiles", type=lambda value: value.split(","),
+                        default=["speech-mp3", "speech-aac", "speech-opus"],
+                        help="encoding profiles to compare with mp3-stereo "
+                             "(default: speech-mp3,speech-aac,speech-opus)")
+    parser.add_argument("--feed-episodes", type=_int_list, default=[10, 100, 1000, 5000])
+    parser.add_argument("--db-episodes", type=int, default=100_000)
+    parser.add_argument("--postgres-url", default=os.getenv("BENCH_POSTGRES_URL"),
+                        help="also run the db suite against this (empty) database")
+    parser.add_argument("--sqlite-processes", type=_int_list, default=[1, 2, 4],
+                        help="concurrent worker processes for the sqlite suite (default: 1,2,4)")
+    parser.add_argument("--sqlite-seconds", type=float, default=10.0)
+    parser.add_argument("--claim-processes", type=_int_list, default=[1, 4, 8],
+                        help="concurrent worker nodes for the claims suite (default: 1,4,8)")
+    parser.add_argument("--api-episodes", type=int, default=1000)
+    parser.add_argument("--api-concurrency", type=_int_list, default=[1, 10, 50])
+    parser.add_argument("--api-requests", type=int, default=200,
+                        help="requests per endpoint and concurrency level")
+    parser.add_argument("--api-pool-sizes", type=_int_list, default=[1, 5, 20],
+                        help="async engine pool sizes for the episode listing (default: 1,5,20)")
+    parser.add_argument("--startup-budget", nargs="+", default=[], metavar="REPLICA=MULTIPLE",
+                        help="a replica's import of app.main as a multiple of FastAPI's "
+                             "(default: bench_startup.BUDGETS)")
+    parser.add_argument("--cache-dir",
+                        default=os.path.join(tempfile.gettempdir(), "speech2pod-benchmarks"),
+                        help="where synthesized audio fixtures are kept between runs")
+    parser.add_argument("--output", default="benchmark-results.json",
+                        help="where to write the results (default: benchmark-results.json, git-ignored)")
+    args = parser.parse_args(argv)
+
+    durations = [minutes * 60 for minutes in args.durations]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        _environment(work_dir)
+        stubs.install(os.path.join(work_dir, "storage"))
+
+        from app.database import init_db
+        init_db()
+
+        for suite in args.suite:
+            print(f"[{suite}]")
+            if suite == "audio":
+                from benchmarks import bench_audio
+                results[suite] = bench_audio.run(args.cache_dir, durations, args.workers, args.profiles)
+            elif suite == "pipeline":
+                from benchmarks import bench_pipeline
+                results[suite] = bench_pipeline.run(args.cache_dir, durations)
+            elif suite == "extractors":
+                from benchmarks import bench_extractors
+                results[suite] = bench_extractors.run(args.cache_dir)
+            elif suite == "feed":
+                from benchmarks import bench_feed
+                results[suite] = bench_feed.run(args.feed_episodes)
+            elif suite == "db":
+                from benchmarks import bench_db
+                urls = {"sqlite": f"sqlite:///{os.path.join(work_dir, 'bench_db.sqlite')}"}
+                if args.postgres_url:
+                    urls["postgresql"] = args.postgres_url
+                results[suite] = bench_db.run(urls, args.db_episodes)
+            elif suite == "sqlite":
+                from benchmarks import bench_sqlite
+                results[suite] = bench_sqlite.run(work_dir, args.sqlite_processes, args.sqlite_seconds)
+            elif suite == "claims":
+                from benchmarks import bench_claims
+                urls = {"sqlite": f"sqlite:///{os.path.join(work_dir, 'bench_claims.sqlite')}"}
+                if args.postgres_url:
+                    urls["postgresql"] = args.postgres_url
+                results[suite] = bench_claims.run(urls, args.claim_processes)
+            elif suite == "scheduler":
+                from benchmarks import bench_scheduler
+                results[suite] = bench_scheduler.run()
+            elif suite == "api":
+                from benchmarks import bench_api
+                results[suite] = bench_api.run(
+                    args.api_episodes, args.api_concurrency, args.api_requests, args.api_pool_sizes
+                )
+            elif suite == "admission":
+                from benchmarks import bench_admission
+                results[suite] = bench_admission.run()
+            elif suite == "startup":
+                from benchmarks import bench_startup
+                results[suite] = bench_startup.run(bench_startup.parse_budgets(args.startup_budget))
+
+        report = {"meta": _meta(), "results": results}
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
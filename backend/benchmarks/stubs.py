@@ -0,0 +1,193 @@
+"""
+Offline stand-ins for yt-dlp, the Anthropic API and R2/S3.
+
+install() registers them in sys.modules, so it must run before any app
+module imports yt_dlp, anthropic or boto3.
+"""
+import json
+import os
+import shutil
+import sys
+import time
+import types
+from types import SimpleNamespace
+from typing import Optional
+
+
+class DownloadError(Exception):
+    """yt_dlp.utils.DownloadError"""
+
+
+class FakeYoutubeDL:
+    """
+    yt_dlp.YoutubeDL that 'downloads' a local fixture file. Player clients
+    in failing_clients raise DownloadError after failure_seconds; with
+    video_error set, every client raises it (a private video, say).
+    """
+
+    source_path: str = ""
+    thumbnail_path: str = ""
+    duration: int = 0
+    failing_clients: frozenset = frozenset()
+    failure_seconds: float = 0.0
+    video_error: str = ""
+
+    def __init__(self, params: Optional[dict] = None):
+        self.params = params or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url: str, download: bool = True) -> dict:
+        clients = self.params.get('extractor_args', {}).get('youtube', {}).get('player_client', [])
+        if download and self.video_error:
+            time.sleep(self.failure_seconds)
+            raise DownloadError(f"ERROR: [youtube] {url}: {self.video_error}")
+        if download and self.failing_clients.intersection(clients):
+            time.sleep(self.failure_seconds)
+            raise DownloadError(f"ERROR: [youtube] {url}: client {clients[0]} is broken")
+
+        info = {
+            'id': 'benchmark00',
+            'title': 'Benchmark speech',
+            'description': 'Synthesized speech-like audio for benchmarks.',
+            'thumbnails': [],
+            'duration': self.duration,
+            'upload_date': '20260101',
+            'uploader': 'Benchmarks',
+            'view_count': 0,
+            'ext': os.path.splitext(self.source_path)[1].lstrip('.'),
+        }
+
+        if download and not self.params.get('skip_download'):
+            path = self.prepare_filename(info)
+            shutil.copyfile(self.source_path, path)
+            size = os.path.getsize(path)
+            for hook in self.params.get('progress_hooks', []):
+                hook({'status': 'downloading', 'downloaded_bytes': size, 'total_bytes': size})
+            info['requested_downloads'] = [{'filepath': path}]
+
+        if self.params.get('writethumbnail') and self.thumbnail_path:
+            extension = os.path.splitext(self.thumbnail_path)[1].lstrip('.')
+            shutil.copyfile(self.thumbnail_path, self.prepare_filename({'ext': extension}))
+
+        return info
+
+    def download(self, urls) -> int:
+        for url in urls:
+            self.extract_info(url)
+        return 0
+
+    def prepare_filename(self, info: dict) -> str:
+        return self.params['outtmpl'] % {'ext': info['ext']}
+
+
+class FakeAnthropic:
+    """anthropic.Anthropic returning canned metadata after a fixed latency."""
+
+    latency: float = 0.0
+
+    def __init__(self, api_key: Optional[str] = None, **kwargs):
+        self.messages = self
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        text = json.dumps({
+            "speaker": "Jane Doe",
+            "date": "January 1, 2026",
+            "venue": "City Hall",
+            "topic": "Benchmark Address",
+            "summary": "A synthesized speech used for benchmarking.",
+            "suggested_title": "Jane Doe benchmark address, 1/1/26",
+        })
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+class LocalS3Client:
+    """The subset of the boto3 S3 client StorageService uses, on local disk."""
+
+    root: str = ""
+    metadata: dict = {}  # key -> user metadata
+
+    def __init__(self, *args, **kwargs):
+        self._uploads = {}
+
+    def _path(self, key: str) -> str:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, CacheControl=None, Metadata=None):
+        data = Body.read() if hasattr(Body, 'read') else Body
+        with open(self._path(Key), 'wb') as f:
+            f.write(data)
+        self.metadata[Key] = Metadata or {}
+        return {'ETag': str(len(data))}
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None):
+        upload_id = f"upload-{len(self._uploads) + 1}"
+        self._uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._uploads[UploadId][PartNumber] = Body
+        return {'ETag': str(PartNumber)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self._uploads.pop(UploadId)
+        with open(self._path(Key), 'wb') as f:
+            for part in MultipartUpload['Parts']:
+                f.write(parts[part['PartNumber']])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._uploads.pop(UploadId, None)
+
+    def head_object(self, Bucket, Key):
+        path = os.path.join(self.root, Key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(Key)
+        return {'ContentLength': os.path.getsize(path), 'Metadata': self.metadata.get(Key, {})}
+
+    def list_objects_v2(self, Bucket, Prefix=''):
+        keys = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                key = os.path.relpath(os.path.join(directory, name), self.root)
+                if key.startswith(Prefix):
+                    keys.append({'Key': key})
+        return {'Contents': sorted(keys, key=lambda item: item['Key']), 'IsTruncated': False}
+
+    def delete_object(self, Bucket, Key):
+        path = os.path.join(self.root, Key)
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def install(storage_root: str, anthropic_latency: float = 0.0) -> None:
+    """Register the stubs as the yt_dlp, anthropic and boto3 modules."""
+    LocalS3Client.root = storage_root
+    FakeAnthropic.latency = anthropic_latency
+
+    yt_dlp = types.ModuleType('yt_dlp')
+    yt_dlp.YoutubeDL = FakeYoutubeDL
+    yt_dlp.utils = SimpleNamespace(DownloadError=DownloadError)
+
+    anthropic = types.ModuleType('anthropic')
+    anthropic.Anthropic = FakeAnthropic
+
+    boto3 = types.ModuleType('boto3')
+    boto3.client = LocalS3Client
+
+    sys.modules['yt_dlp'] = yt_dlp
+    sys.modules['anthropic'] = anthropic
+    sys.modules['boto3'] = boto3
+
+
+def use_source(path: str, duration: int, thumbnail: str = "") -> None:
+    """Serve `path` (and `thumbnail`) from the next FakeYoutubeDL downloads."""
+    FakeYoutubeDL.source_path = path
+    FakeYoutubeDL.thumbnail_path = thumbnail
+    FakeYoutubeDL.duration = duration
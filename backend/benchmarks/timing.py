@@ -0,0 +1,50 @@
+"""Wall-clock and CPU measurement shared by the benchmark suites."""
+import resource
+import statistics
+import time
+from contextlib import contextmanager
+from typing import List
+
+
+@contextmanager
+def measure():
+    """
+    Time the enclosed block. Yields a dict that receives wall_seconds,
+    cpu_seconds (this process) and child_cpu_seconds (reaped subprocesses,
+    i.e. FFmpeg) once the block exits.
+    """
+    result = {}
+    self_before = resource.getrusage(resource.RUSAGE_SELF)
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["wall_seconds"] = time.perf_counter() - start
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+        children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        result["cpu_seconds"] = (
+            self_after.ru_utime + self_after.ru_stime
+            - self_before.ru_utime - self_before.ru_stime
+        )
+        result["child_cpu_seconds"] = (
+            children_after.ru_utime + children_after.ru_stime
+            - children_before.ru_utime - children_before.ru_stime
+        )
+
+
+def percentiles(samples: List[float]) -> dict:
+    """Summarize latency samples (seconds) as milliseconds."""
+    ordered = sorted(samples)
+
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read once, so the environment is set before the app is imported
+_work = tempfile.mkdtemp(prefix="speech2pod-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_work}/test.db"
+os.environ["SCRATCH_DIR"] = os.path.join(_work, "scratch")
+os.environ["EXTRACTION_RUNNER"] = "local"
+os.environ["JOB_RETRY_DELAY"] = "0"
+os.environ["JOB_MAX_ATTEMPTS"] = "2"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from app.database import init_db
+
+    init_db()
+
+
+@pytest.fixture
+def db():
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.models.episode import Episode
+
+
+def test_cursor_pages_through_episodes_created_in_the_same_second(db):
+    # CURRENT_TIMESTAMP defaults have whole seconds, Python values fractions
+    second = datetime(2001, 2, 3, 4, 5, 6)
+    episodes = [
+        Episode(youtube_id="pagevideo1", speaker="Page Test"),
+        Episode(youtube_id="pagevideo2", speaker="Page Test", created_at=second.replace(microsecond=250000)),
+        Episode(youtube_id="pagevideo3", speaker="Page Test", created_at=second.replace(microsecond=750000)),
+        Episode(youtube_id="pagevideo4", speaker="Page Test", created_at=second.replace(microsecond=750000)),
+    ]
+    db.add_all(episodes)
+    db.commit()
+    db.execute(text(
+        "UPDATE episodes SET created_at = '2001-02-03 04:05:06' WHERE youtube_id = 'pagevideo1'"
+    ))
+    db.commit()
+
+    seen = []
+    cursor = None
+    with TestClient(app) as client:
+        while True:
+            params = {"speaker": "page-test", "fields": "youtube_id", "limit": 1}
+            if cursor:
+                params["cursor"] = cursor
+            page = client.get("/api/episodes", params=params).json()
+            seen += [item["youtube_id"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+    assert seen == ["pagevideo4", "pagevideo3", "pagevideo2", "pagevideo1"]
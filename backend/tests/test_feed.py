@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+
+import boto3
+
+from app.models.episode import Episode, EpisodeStatus
+from app.services.feed import FeedPublisher, sub_feed_key
+from app.services.storage import StorageService
+from benchmarks.stubs import LocalS3Client
+
+
+def test_new_publisher_deletes_sub_feeds_left_without_episodes(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(LocalS3Client, "root", str(tmp_path))
+    monkeypatch.setattr(LocalS3Client, "metadata", {})
+    monkeypatch.setattr(boto3, "client", LocalS3Client)
+
+    episode = Episode(
+        youtube_id="feedvideo1",
+        title="A speech",
+        speaker="José Díaz",
+        topic="Climate Policy",
+        audio_url="https://media.example.com/audio/1.mp3",
+        audio_duration=60.0,
+        status=EpisodeStatus.PUBLISHED,
+        published_at=datetime.now(timezone.utc),
+    )
+    db.add(episode)
+    db.commit()
+    keys = [sub_feed_key("speaker", "jose-diaz"), sub_feed_key("topic", "climate-policy")]
+
+    FeedPublisher().publish()
+    assert all(StorageService().file_exists(key) for key in keys)
+
+    db.delete(episode)
+    db.commit()
+    # A restarted process, or another replica, knows nothing of the first publish
+    FeedPublisher().publish()
+    assert not any(StorageService().file_exists(key) for key in keys)
@@ -0,0 +1,56 @@
+import uuid
+
+import pytest
+
+from app.config import get_settings
+from app.models.episode import ExtractionJob, JobStatus
+from app.routers.extract import process_extraction
+from app.services.jobqueue import JobClaimError, VideoBusy, get_job_queue
+
+
+def _job(db, youtube_id: str) -> str:
+    job_id = str(uuid.uuid4())
+    db.add(ExtractionJob(
+        id=job_id,
+        youtube_id=youtube_id,
+        youtube_url=f"https://www.youtube.com/watch?v={youtube_id}",
+        status=JobStatus.PENDING,
+    ))
+    db.commit()
+    return job_id
+
+
+def test_local_job_for_a_busy_video_fails_naming_the_video(db):
+    first, second = _job(db, "busyvideo1"), _job(db, "busyvideo1")
+    lease = get_job_queue().acquire(first, "busyvideo1")
+    try:
+        process_extraction(
+            second, "https://www.youtube.com/watch?v=busyvideo1", get_settings().database_url
+        )
+    finally:
+        lease.release()
+
+    job = db.get(ExtractionJob, second)
+    assert job.status == JobStatus.FAILED
+    assert "Video busyvideo1 is being processed by another job" in job.error_message
+    assert job.completed_at is not None
+    assert job.attempts == 0
+
+
+def test_busy_video_and_claimed_job_are_told_apart(db):
+    first, second = _job(db, "busyvideo2"), _job(db, "busyvideo2")
+    queue = get_job_queue()
+    lease = queue.acquire(first, "busyvideo2")
+    try:
+        with pytest.raises(VideoBusy):
+            queue.acquire(second, "busyvideo2")
+        with pytest.raises(JobClaimError) as claimed:
+            type(queue)(node_id="other:1").acquire(first, "busyvideo2")
+        assert not isinstance(claimed.value, VideoBusy)
+    finally:
+        lease.release()
+
+    # Once the first job is done with the video, the second can run
+    db.get(ExtractionJob, first).status = JobStatus.COMPLETED
+    db.commit()
+    queue.acquire(second, "busyvideo2").release()
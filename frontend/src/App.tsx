@@ -48,7 +48,7 @@ export default function App() {
   const createEpisodeMutation = useCreateEpisode();
   const cropMutation = useCropAudio();
 
-  const { data: jobData } = useJobStatus(
+  const { data: jobData, progress: jobProgress } = useJobStatus(
     state.jobId,
     state.step === 'extracting'
   );
@@ -135,6 +135,7 @@ export default function App() {
       // If cropped differently from original, create new audio
       let audioUrl = state.jobStatus.audio_url;
       let duration = state.jobStatus.duration || 0;
+      let renditions = state.jobStatus.renditions;
 
       const needsCrop =
         state.cropStart > 0 ||
@@ -148,6 +149,7 @@ export default function App() {
         });
         audioUrl = cropResult.audio_url;
         duration = cropResult.duration;
+        renditions = cropResult.renditions;
       }
 
       await createEpisodeMutation.mutateAsync({
@@ -163,7 +165,9 @@ export default function App() {
         summary: state.metadata.summary,
         audio_url: audioUrl,
         audio_duration: duration,
+        renditions,
         thumbnail_url: state.jobStatus.thumbnail_url || state.analyzeData.thumbnail_url,
+        thumbnails: state.jobStatus.thumbnails,
         crop_start: state.cropStart,
         crop_end: state.cropEnd,
         status: publish ? 'published' : 'draft',
@@ -307,7 +311,7 @@ export default function App() {
 
             {/* Step: Extracting */}
             {state.step === 'extracting' && (
-              <ProcessingIndicator />
+              <ProcessingIndicator progress={jobProgress} />
             )}
 
             {/* Step: Editing */}
@@ -315,6 +319,7 @@ export default function App() {
               <>
                 <MetadataPreview
                   thumbnailUrl={state.jobStatus.thumbnail_url || state.analyzeData.thumbnail_url}
+                  thumbnails={state.jobStatus.thumbnails}
                   metadata={state.metadata}
                   youtubeUrl={state.youtubeUrl}
                   duration={state.cropEnd - state.cropStart}
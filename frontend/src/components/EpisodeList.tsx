@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { format } from 'date-fns';
 import {
   ArrowLeft,
@@ -9,6 +9,7 @@ import {
   Archive,
   ExternalLink,
   Clock,
+  Search,
 } from 'lucide-react';
 import {
   useEpisodes,
@@ -16,8 +17,25 @@ import {
   usePublishEpisode,
   useUnpublishEpisode,
 } from '../hooks/useApi';
-import type { Episode } from '../types';
+import type { EpisodeListItem } from '../types';
 import { LoadingSpinner } from './LoadingSpinner';
+import { Thumbnail } from './Thumbnail';
+
+// Only the columns the cards render; summary is the largest of them
+const EPISODE_LIST_FIELDS: (keyof EpisodeListItem)[] = [
+  'id',
+  'title',
+  'speaker',
+  'speech_date',
+  'summary',
+  'audio_url',
+  'audio_duration',
+  'thumbnail_url',
+  'thumbnails',
+  'youtube_url',
+  'status',
+  'created_at',
+];
 
 interface EpisodeListProps {
   onBack: () => void;
@@ -38,14 +56,50 @@ export function EpisodeList({ onBack }: EpisodeListProps) {
   const [playingId, setPlayingId] = useState<number | null>(null);
   const [audioRef, setAudioRef] = useState<HTMLAudioElement | null>(null);
 
-  const { data: episodes, isLoading } = useEpisodes(
-    filter === 'all' ? undefined : filter
-  );
+  const [searchInput, setSearchInput] = useState('');
+  const [search, setSearch] = useState('');
+  const loadMoreRef = useRef<HTMLDivElement | null>(null);
+
+  // Debounce the search box so typing doesn't fire a request per keystroke
+  useEffect(() => {
+    const timer = setTimeout(() => setSearch(searchInput.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchInput]);
+
+  const {
+    data,
+    isLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useEpisodes<EpisodeListItem>({
+    status: filter === 'all' ? undefined : filter,
+    q: search || undefined,
+    fields: EPISODE_LIST_FIELDS,
+  });
+  const episodes = data?.pages.flatMap((page) => page.items);
+
+  // Infinite scroll: load the next page when the sentinel comes into view
+  useEffect(() => {
+    const sentinel = loadMoreRef.current;
+    if (!sentinel || !hasNextPage) return;
+
+    const observer = new IntersectionObserver(
+      (entries) => {
+        if (entries[0].isIntersecting && !isFetchingNextPage) {
+          fetchNextPage();
+        }
+      },
+      { rootMargin: '400px' }
+    );
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [fetchNextPage, hasNextPage, isFetchingNextPage]);
   const deleteMutation = useDeleteEpisode();
   const publishMutation = usePublishEpisode();
   const unpublishMutation = useUnpublishEpisode();
 
-  const handlePlay = (episode: Episode) => {
+  const handlePlay = (episode: EpisodeListItem) => {
     if (playingId === episode.id) {
       audioRef?.pause();
       setPlayingId(null);
@@ -105,6 +159,18 @@ export function EpisodeList({ onBack }: EpisodeListProps) {
         </div>
       </div>
 
+      {/* Search */}
+      <div className="relative">
+        <Search className="absolute left-3 top-1/2 -translate-y-1/2 w-4 h-4 text-gray-400" />
+        <input
+          type="search"
+          value={searchInput}
+          onChange={(e) => setSearchInput(e.target.value)}
+          placeholder="Search by title, speaker or topic"
+          className="w-full pl-10 pr-4 py-2.5 bg-white border border-gray-200 rounded-xl focus:outline-none focus:ring-2 focus:ring-purple-500 focus:border-transparent"
+        />
+      </div>
+
       {/* Loading */}
       {isLoading && (
         <div className="bg-white rounded-2xl shadow-lg p-12 text-center">
@@ -119,7 +185,9 @@ export function EpisodeList({ onBack }: EpisodeListProps) {
           <div className="w-16 h-16 mx-auto rounded-full bg-gray-100 flex items-center justify-center mb-4">
             <Archive className="w-8 h-8 text-gray-400" />
           </div>
-          <h3 className="text-lg font-semibold text-gray-900">No episodes yet</h3>
+          <h3 className="text-lg font-semibold text-gray-900">
+            {search ? 'No matching episodes' : 'No episodes yet'}
+          </h3>
           <p className="text-gray-500 mt-1">
             Create your first episode by converting a YouTube video.
           </p>
@@ -146,12 +214,20 @@ export function EpisodeList({ onBack }: EpisodeListProps) {
           />
         ))}
       </div>
+
+      {/* Infinite scroll sentinel */}
+      <div ref={loadMoreRef} />
+      {isFetchingNextPage && (
+        <div className="flex justify-center py-4">
+          <LoadingSpinner />
+        </div>
+      )}
     </div>
   );
 }
 
 interface EpisodeCardProps {
-  episode: Episode;
+  episode: EpisodeListItem;
   isPlaying: boolean;
   onPlay: () => void;
   onDelete: () => void;
@@ -174,8 +250,9 @@ function EpisodeCard({
       <div className="flex">
         {/* Thumbnail */}
         <div className="relative flex-shrink-0">
-          <img
+          <Thumbnail
             src={episode.thumbnail_url}
+            thumbnails={episode.thumbnails}
             alt={episode.title}
             className="w-32 h-32 object-cover"
           />
@@ -1,7 +1,10 @@
 import { ExternalLink, Clock, Calendar, MapPin, Tag } from 'lucide-react';
+import type { Thumbnails } from '../types';
+import { Thumbnail } from './Thumbnail';
 
 interface MetadataPreviewProps {
   thumbnailUrl: string;
+  thumbnails?: Thumbnails | null;
   metadata: {
     title: string;
     speaker: string;
@@ -27,6 +30,7 @@ function formatDuration(seconds: number): string {
 
 export function MetadataPreview({
   thumbnailUrl,
+  thumbnails,
   metadata,
   youtubeUrl,
   duration,
@@ -38,8 +42,9 @@ export function MetadataPreview({
         <div className="flex gap-6">
           {/* Thumbnail */}
           <div className="flex-shrink-0">
-            <img
+            <Thumbnail
               src={thumbnailUrl}
+              thumbnails={thumbnails}
               alt={metadata.title}
               className="w-32 h-32 rounded-2xl object-cover shadow-2xl"
             />
@@ -1,4 +1,20 @@
-export function ProcessingIndicator() {
+import type { JobProgressEvent } from '../types';
+
+interface ProcessingIndicatorProps {
+  progress?: JobProgressEvent | null;
+}
+
+const STAGE_LABELS: Record<NonNullable<JobProgressEvent['stage']>, string> = {
+  download: 'Downloading audio...',
+  encode: 'Processing audio...',
+  upload: 'Uploading...',
+  stream: 'Downloading and processing...',
+};
+
+export function ProcessingIndicator({ progress }: ProcessingIndicatorProps) {
+  const label = progress?.stage ? STAGE_LABELS[progress.stage] : 'Processing audio...';
+  const percent = progress?.progress != null ? Math.round(progress.progress * 100) : null;
+
   return (
     <div className="bg-white rounded-2xl shadow-lg p-8">
       {/* Spinning ring with static icon */}
@@ -16,14 +32,26 @@ export function ProcessingIndicator() {
         </div>
       </div>
 
-      {/* Static message */}
+      {/* Stage and progress */}
       <div className="text-center">
         <p className="text-lg font-semibold text-gray-800">
-          Processing audio...
-        </p>
-        <p className="text-sm text-gray-400 mt-1">
-          This may take a minute or two
+          {label}
         </p>
+        {percent != null ? (
+          <div className="mt-3 mx-auto max-w-xs">
+            <div className="h-2 bg-gray-100 rounded-full overflow-hidden">
+              <div
+                className="h-full bg-gradient-to-r from-purple-500 to-pink-500 transition-all"
+                style={{ width: `${percent}%` }}
+              />
+            </div>
+            <p className="text-sm text-gray-400 mt-1">{percent}%</p>
+          </div>
+        ) : (
+          <p className="text-sm text-gray-400 mt-1">
+            This may take a minute or two
+          </p>
+        )}
       </div>
     </div>
   );
@@ -0,0 +1,22 @@
+import type { Thumbnails } from '../types';
+
+interface ThumbnailProps {
+  src: string;
+  // Published variants; the small previews are used when present
+  thumbnails?: Thumbnails | null;
+  alt: string;
+  className?: string;
+}
+
+export function Thumbnail({ src, thumbnails, alt, className }: ThumbnailProps) {
+  if (!thumbnails?.['preview-jpg']) {
+    return <img src={src} alt={alt} className={className} loading="lazy" />;
+  }
+
+  return (
+    <picture>
+      {thumbnails.preview && <source srcSet={thumbnails.preview} type="image/webp" />}
+      <img src={thumbnails['preview-jpg']} alt={alt} className={className} loading="lazy" />
+    </picture>
+  );
+}
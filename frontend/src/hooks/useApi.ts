@@ -1,6 +1,17 @@
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useEffect, useState } from 'react';
+import {
+  useQuery,
+  useInfiniteQuery,
+  useMutation,
+  useQueryClient,
+} from '@tanstack/react-query';
 import * as api from '../lib/api';
-import type { EpisodeCreate, Episode } from '../types';
+import type {
+  EpisodeCreate,
+  Episode,
+  EpisodeQuery,
+  JobProgressEvent,
+} from '../types';
 
 // Analyze video
 export function useAnalyzeVideo() {
@@ -17,20 +28,52 @@ export function useStartExtraction() {
   });
 }
 
-// Poll job status
+// Job status, pushed over Server-Sent Events. The full status (with the
+// waveform) is fetched once when the job finishes; polling is only used
+// if the event stream can't be opened.
 export function useJobStatus(jobId: string | null, enabled: boolean = true) {
-  return useQuery({
+  const queryClient = useQueryClient();
+  const [progress, setProgress] = useState<JobProgressEvent | null>(null);
+  const [streamFailed, setStreamFailed] = useState(false);
+
+  useEffect(() => {
+    if (!jobId || !enabled) return;
+
+    setProgress(null);
+    setStreamFailed(false);
+    const source = new EventSource(api.jobEventsUrl(jobId));
+
+    source.onmessage = (message) => {
+      const event: JobProgressEvent = JSON.parse(message.data);
+      setProgress(event);
+      if (event.status === 'completed' || event.status === 'failed') {
+        source.close();
+        queryClient.invalidateQueries({ queryKey: ['job', jobId] });
+      }
+    };
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        setStreamFailed(true);
+      }
+    };
+
+    return () => source.close();
+  }, [jobId, enabled, queryClient]);
+
+  const statusQuery = useQuery({
     queryKey: ['job', jobId],
     queryFn: () => api.getJobStatus(jobId!),
     enabled: !!jobId && enabled,
     refetchInterval: (query) => {
       const data = query.state.data;
-      if (data?.status === 'completed' || data?.status === 'failed') {
+      if (!streamFailed || data?.status === 'completed' || data?.status === 'failed') {
         return false;
       }
       return 2000; // Poll every 2 seconds
     },
   });
+
+  return { ...statusQuery, progress };
 }
 
 // Crop audio
@@ -44,11 +87,14 @@ export function useCropAudio() {
   });
 }
 
-// Episodes
-export function useEpisodes(status?: string) {
-  return useQuery({
-    queryKey: ['episodes', status],
-    queryFn: () => api.getEpisodes(status),
+// Episodes (paginated; fetchNextPage loads the next page)
+export function useEpisodes<T = Episode>(query: Omit<EpisodeQuery, 'cursor'> = {}) {
+  return useInfiniteQuery({
+    queryKey: ['episodes', query],
+    queryFn: ({ pageParam }) =>
+      api.getEpisodes<T>({ ...query, cursor: pageParam }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
   });
 }
 
@@ -5,7 +5,10 @@ import type {
   JobStatusResponse,
   Episode,
   EpisodeCreate,
-  FeedInfo
+  EpisodePage,
+  EpisodeQuery,
+  FeedInfo,
+  Renditions
 } from '../types';
 
 const API_BASE = import.meta.env.VITE_API_URL || '';
@@ -41,12 +44,17 @@ export async function getJobStatus(jobId: string): Promise<JobStatusResponse> {
   return response.data;
 }
 
+// Server-Sent Events stream of job status and progress
+export function jobEventsUrl(jobId: string): string {
+  return `${API_BASE}/api/extract/${jobId}/events`;
+}
+
 // Crop audio
 export async function cropAudio(
   jobId: string,
   startTime: number,
   endTime: number
-): Promise<{ audio_url: string; duration: number }> {
+): Promise<{ audio_url: string; duration: number; renditions?: Renditions }> {
   const response = await api.post('/api/crop', {
     job_id: jobId,
     start_time: startTime,
@@ -61,9 +69,12 @@ export async function createEpisode(episode: EpisodeCreate): Promise<Episode> {
   return response.data;
 }
 
-export async function getEpisodes(status?: string): Promise<Episode[]> {
-  const params = status ? { status } : {};
-  const response = await api.get<Episode[]>('/api/episodes', { params });
+export async function getEpisodes<T = Episode>(
+  query: EpisodeQuery = {}
+): Promise<EpisodePage<T>> {
+  const { fields, ...rest } = query;
+  const params = fields ? { ...rest, fields: fields.join(',') } : rest;
+  const response = await api.get<EpisodePage<T>>('/api/episodes', { params });
   return response.data;
 }
 
@@ -23,20 +23,53 @@ export interface ExtractResponse {
   status: string;
 }
 
+export interface SilenceSegment {
+  start: number;
+  end: number;
+  kind: 'silence' | 'applause';
+}
+
+// One encoded file per encoding profile (speech-mp3, speech-opus, ...)
+export interface Rendition {
+  url: string;
+  content_type: string;
+  bytes: number;
+  // Set by POST /api/episodes/{id}/assemble: the file with intro/outro
+  assembled?: { url: string; bytes: number };
+}
+
+export type Renditions = Record<string, Rendition>;
+
+// Artwork variants: 'artwork' (3000 px, the feed image), 'artwork-1400',
+// and 256 px 'preview' (WebP) / 'preview-jpg' for the UI
+export type Thumbnails = Record<string, string>;
+
 export interface JobStatusResponse {
   job_id: string;
   status: 'pending' | 'processing' | 'completed' | 'failed';
   audio_url?: string;
   thumbnail_url?: string;
+  thumbnails?: Thumbnails;
   duration?: number;
   waveform_data?: number[];
+  renditions?: Renditions;
   detected_silence?: {
     start_trim: number;
     end_trim: number;
+    // Every silence/applause run, in seconds on the source timeline
+    segments?: SilenceSegment[];
   };
   error_message?: string;
 }
 
+// Pushed by GET /api/extract/{job_id}/events
+export interface JobProgressEvent {
+  status: JobStatusResponse['status'];
+  stage?: 'download' | 'encode' | 'upload' | 'stream';
+  progress?: number;
+  error_message?: string;
+}
+
 export interface Episode {
   id: number;
   youtube_id: string;
@@ -51,6 +84,8 @@ export interface Episode {
   audio_url: string;
   audio_duration: number;
   thumbnail_url: string;
+  thumbnails: Thumbnails | null;
+  renditions: Renditions | null;
   crop_start: number;
   crop_end: number | null;
   intro_audio_url: string | null;
@@ -62,6 +97,38 @@ export interface Episode {
   published_at: string | null;
 }
 
+// Columns EpisodeList asks the API for (see EPISODE_LIST_FIELDS)
+export type EpisodeListItem = Pick<
+  Episode,
+  | 'id'
+  | 'title'
+  | 'speaker'
+  | 'speech_date'
+  | 'summary'
+  | 'audio_url'
+  | 'audio_duration'
+  | 'thumbnail_url'
+  | 'thumbnails'
+  | 'youtube_url'
+  | 'status'
+  | 'created_at'
+>;
+
+export interface EpisodePage<T = Episode> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+export interface EpisodeQuery {
+  status?: string;
+  speaker?: string;
+  topic?: string;
+  q?: string;
+  fields?: string[];
+  cursor?: string;
+  limit?: number;
+}
+
 export interface EpisodeCreate {
   youtube_id: string;
   youtube_url: string;
@@ -76,17 +143,27 @@ export interface EpisodeCreate {
   audio_url: string;
   audio_duration: number;
   thumbnail_url: string;
+  thumbnails?: Thumbnails;
+  renditions?: Renditions;
   crop_start?: number;
   crop_end?: number;
   status: 'draft' | 'published';
 }
 
+export interface SubFeed {
+  name: string;
+  feed_url: string;
+  episodes: number;
+}
+
 export interface FeedInfo {
   title: string;
   description: string;
   feed_url: string;
   published_episodes: number;
   draft_episodes: number;
+  speaker_feeds: SubFeed[];
+  topic_feeds: SubFeed[];
 }
 
 export type AppStep =